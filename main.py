@@ -1,13 +1,44 @@
+import argparse
 import logging
+import multiprocessing
+import signal
 import subprocess
+import threading
 
 from service.automation_service import IPCLOrderAutomation
 from service.draft_launch import launch_draft_page
+from service.watch_service import WatchService
 from utils.config_manager import load_config
 from utils.log_rotation import setup_logging
 
 
-def main():
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description='CSVファイルからIPCLの注文を自動入力します')
+    parser.add_argument(
+        '--watch', action='store_true', help='ブラウザを起動したまま常駐し、新しく置かれたCSVファイルを処理します'
+    )
+    args, _ = parser.parse_known_args(argv)
+    return args
+
+
+def run_watch(automation: IPCLOrderAutomation, config):
+    logger = logging.getLogger(__name__)
+    stop_event = threading.Event()
+
+    def request_stop(signum, frame):
+        # 処理中のファイルは最後まで処理してから終了する
+        logger.info("終了要求を受け付けました。処理中のファイルが終わり次第終了します")
+        stop_event.set()
+
+    for name in ('SIGINT', 'SIGTERM', 'SIGBREAK'):
+        if hasattr(signal, name):
+            signal.signal(getattr(signal, name), request_stop)
+
+    WatchService.from_config(automation, config).run(stop_event)
+
+
+def main(argv: list[str] | None = None):
+    args = parse_args(argv)
     config = load_config()
 
     log_directory = config.get('LOGGING', 'log_directory', fallback='logs')
@@ -18,6 +49,9 @@ def main():
 
     try:
         automation = IPCLOrderAutomation()
+        if args.watch:
+            run_watch(automation, config)
+            return
         automation.process_all_csv_files()
         launch_draft_page()
         subprocess.Popen(['explorer', str(automation.pdf_dir)])
@@ -27,4 +61,5 @@ def main():
 
 
 if __name__ == "__main__":
+    multiprocessing.freeze_support()
     main()
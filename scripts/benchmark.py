@@ -0,0 +1,322 @@
+import argparse
+import csv
+import json
+import logging
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from datetime import date, timedelta
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from scripts.mock_ipcl_site import MockIPCLServer  # noqa: E402
+
+# ベンチマークの実行モードと、config.iniの[Settings]に設定する値の対応
+MODES = {
+    'serial': {'engine': 'thread', 'workers': 1},
+    'pooled': {'engine': 'thread', 'workers': None},
+    'async': {'engine': 'async', 'workers': None},
+    'process': {'engine': 'process', 'workers': None},
+}
+
+CSV_HEADER = [
+    'name', 'ID', 'sex', 'birthday', 'surgerydate', 'eye',
+    'R_SPH', 'R_Cyl', 'R_Axis', 'R_ACD', 'R_Pachy(CCT)', 'R_CLR', 'R_K1(Kf)', 'R_K1Axis', 'R_K2(Kf)', 'R_SIA',
+    'R_Ins',
+    'L_SPH', 'L_Cyl', 'L_Axis', 'L_ACD', 'L_Pachy(CCT)', 'L_CLR', 'L_K1(Kf)', 'L_K1Axis', 'L_K2(Kf)', 'L_SIA',
+    'L_Ins',
+    'R_\tATA', 'R_CASIA_WTW_M', 'R_Caliper_WTW', 'L_\tATA', 'L_CASIA_WTW_M', 'L_Caliper_WTW',
+]
+
+
+def synthetic_row(rng: random.Random, index: int) -> dict:
+    birthday = date(1970, 1, 1) + timedelta(days=rng.randrange(0, 365 * 30))
+    surgery_date = date.today() + timedelta(days=rng.randrange(7, 90))
+    row = {
+        'name': f'テスト患者{index:05d}',
+        'ID': f'{900000 + index}',
+        'sex': rng.choice(['男性', '女性']),
+        'birthday': birthday.strftime('%Y%m%d'),
+        'surgerydate': surgery_date.strftime('%Y%m%d'),
+        'eye': rng.choice(['両眼', '右眼', '左眼']),
+    }
+    for side in ['R', 'L']:
+        row.update({
+            f'{side}_SPH': f'{rng.uniform(-12, -1):.2f}',
+            f'{side}_Cyl': rng.choice(['0', f'{rng.uniform(-3, -0.5):.2f}']),
+            f'{side}_Axis': str(rng.randrange(0, 180)),
+            f'{side}_ACD': f'{rng.uniform(2.8, 3.6):.2f}',
+            f'{side}_Pachy(CCT)': str(rng.randrange(480, 600)),
+            f'{side}_CLR': f'{rng.uniform(0.0, 1.0):.2f}',
+            f'{side}_K1(Kf)': f'{rng.uniform(41, 46):.2f}',
+            f'{side}_K1Axis': str(rng.randrange(0, 180)),
+            f'{side}_K2(Kf)': f'{rng.uniform(42, 47):.2f}',
+            f'{side}_SIA': f'{rng.uniform(0.1, 0.5):.2f}',
+            f'{side}_Ins': f'{rng.uniform(10, 12):.1f}',
+            f'{side}_\tATA': f'{rng.uniform(11, 12.5):.1f}',
+            f'{side}_CASIA_WTW_M': f'{rng.uniform(11, 12.5):.1f}',
+            f'{side}_Caliper_WTW': f'{rng.uniform(11, 12.5):.1f}',
+        })
+    return row
+
+
+def write_synthetic_csvs(csv_dir: Path, files: int, records_per_file: int, seed: int = 0) -> list[Path]:
+    rng = random.Random(seed)
+    csv_dir.mkdir(parents=True, exist_ok=True)
+    paths = []
+    index = 0
+    for file_number in range(1, files + 1):
+        path = csv_dir / f'IPCLdata_bench{file_number:03d}.csv'
+        with open(path, 'w', encoding='cp932', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=CSV_HEADER)
+            writer.writeheader()
+            for _ in range(records_per_file):
+                index += 1
+                writer.writerow(synthetic_row(rng, index))
+        paths.append(path)
+    return paths
+
+
+def write_benchmark_config(work_dir: Path, server: MockIPCLServer, mode: str, workers: int) -> Path:
+    from utils.config_manager import load_config
+
+    config = load_config()
+    settings = MODES[mode]
+    csv_dir = work_dir / 'csv'
+
+    config['URL']['base_url'] = server.base_url
+    config['URL']['draft_url'] = server.draft_url
+    config['Paths']['csv_dir'] = str(csv_dir)
+    config['Paths']['calculated_dir'] = str(csv_dir / 'calculated')
+    config['Paths']['error_dir'] = str(csv_dir / 'error')
+    config['Paths']['pdf_dir'] = str(csv_dir / 'pdf')
+    config['Paths']['log_dir'] = str(work_dir / 'logs')
+    config['LOGGING']['log_directory'] = str(work_dir / 'logs')
+    config['Settings']['headless'] = 'True'
+    config['Settings']['engine'] = settings['engine']
+    config['Settings']['workers'] = str(settings['workers'] or workers)
+    if config.has_section('AssetCache'):
+        config['AssetCache']['cache_dir'] = str(work_dir / 'cache' / 'assets')
+    if config.has_section('Strategies'):
+        config['Strategies']['state_file'] = str(work_dir / 'cache' / 'strategies.json')
+    if config.has_section('Journal'):
+        # 合成データは毎回同じ内容になるため、本番のジャーナルとは分けて毎回空から始める
+        config['Journal']['db_file'] = str(work_dir / 'cache' / 'journal.sqlite3')
+    if config.has_section('RateLimit'):
+        # 代替サイトに対する計測のため、接続先保護のためのレート制限はかけない
+        config.remove_section('RateLimit')
+
+    config_path = work_dir / 'config.ini'
+    with open(config_path, 'w', encoding='utf-8') as f:
+        config.write(f)
+    return config_path
+
+
+class HeadlessProgress:
+    # 計測対象から画面描画を除くため、進捗表示は何もしない
+    progress_window = None
+
+    def create(self):
+        pass
+
+    def update(self, message: str):
+        pass
+
+    def close(self, delay: float = 0.0):
+        pass
+
+
+class MemorySampler:
+    # psutilがあればブラウザを含む子プロセスまで合計したRSSの最大値を記録する
+    def __init__(self, interval: float = 0.5):
+        self.interval = interval
+        self.peak_rss_mb: float | None = None
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        try:
+            import psutil
+        except ImportError:
+            self._process = None
+        else:
+            self._process = psutil.Process()
+
+    def _sample(self):
+        total = 0
+        for process in [self._process, *self._process.children(recursive=True)]:
+            try:
+                total += process.memory_info().rss
+            except Exception:
+                continue
+        self.peak_rss_mb = max(self.peak_rss_mb or 0, total / 1024 / 1024)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+    def start(self):
+        if self._process is None:
+            return
+        self._sample()
+        self._thread = threading.Thread(target=self._run, name='MemorySampler', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+
+def own_peak_rss_mb() -> float | None:
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOSはバイト、Linuxはキロバイト単位
+    return peak / 1024 / 1024 if sys.platform == 'darwin' else peak / 1024
+
+
+def run_mode(args) -> dict:
+    work_dir = Path(args.work_dir)
+    server = MockIPCLServer(0, args.latency_ms, args.calculate_latency_ms)
+    server.start()
+
+    try:
+        write_synthetic_csvs(work_dir / 'csv', args.files, args.records, args.seed)
+        os.environ['IPCLCALC_CONFIG'] = str(write_benchmark_config(work_dir, server, args.mode, args.workers))
+        os.environ.setdefault('EMAIL', 'benchmark@example.com')
+        os.environ.setdefault('PASSWORD', 'benchmark')
+
+        (work_dir / 'logs').mkdir(parents=True, exist_ok=True)
+        logging.basicConfig(
+            level=logging.INFO,
+            filename=work_dir / 'logs' / 'benchmark.log',
+            encoding='utf-8',
+            format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+        )
+
+        import service.automation_service as automation_service
+
+        automation_service.ProgressWindow = HeadlessProgress
+        automation = automation_service.IPCLOrderAutomation()
+
+        sampler = MemorySampler()
+        tracemalloc.start()
+        sampler.start()
+        started = time.monotonic()
+        automation.process_all_csv_files()
+        elapsed = time.monotonic() - started
+        sampler.stop()
+        _, python_heap_peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    finally:
+        server.stop()
+
+    records = args.files * args.records
+    self_peak_rss_mb = own_peak_rss_mb()
+    step_reports = sorted((work_dir / 'logs').glob('step_timings_*.json'))
+    steps = json.loads(step_reports[-1].read_text(encoding='utf-8'))['summary'] if step_reports else {}
+    return {
+        'mode': args.mode,
+        'workers': MODES[args.mode]['workers'] or args.workers,
+        'records': records,
+        'elapsed_seconds': round(elapsed, 2),
+        'records_per_minute': round(records * 60 / elapsed, 2) if elapsed > 0 else 0,
+        'drafts_saved': server.stats.drafts,
+        'logins': server.stats.logins,
+        'steps': steps,
+        'memory': {
+            'peak_rss_mb_with_children': round(sampler.peak_rss_mb, 1) if sampler.peak_rss_mb else None,
+            'peak_rss_mb_self': round(self_peak_rss_mb, 1) if self_peak_rss_mb else None,
+            'python_heap_peak_mb': round(python_heap_peak / 1024 / 1024, 1),
+        },
+    }
+
+
+def print_report(results: list[dict]):
+    print()
+    print(f"{'モード':<10}{'並列数':>6}{'件数':>6}{'保存':>6}{'秒':>9}{'件/分':>9}{'RSS(MB)':>10}")
+    for result in results:
+        memory = result['memory']
+        rss = memory['peak_rss_mb_with_children'] or memory['peak_rss_mb_self']
+        print(
+            f"{result['mode']:<10}{result['workers']:>6}{result['records']:>6}{result['drafts_saved']:>6}"
+            f"{result['elapsed_seconds']:>9}{result['records_per_minute']:>9}{rss if rss else '-':>10}"
+        )
+
+    for result in results:
+        if not result['steps']:
+            continue
+        print(f"\n[{result['mode']}] ステップ所要時間 (秒)")
+        for name, stats in result['steps'].items():
+            print(f"  {name:<16} p50 {stats['p50']:>6.2f}  p95 {stats['p95']:>6.2f}  最大 {stats['max']:>6.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='代替サイトに対してIPCLOrderAutomationのスループットを計測します')
+    parser.add_argument('--modes', default='serial,pooled,async', help=f"計測するモード ({', '.join(MODES)})")
+    parser.add_argument('--workers', type=int, default=4, help='pooled/async/processの並列数')
+    parser.add_argument('--files', type=int, default=2, help='生成するCSVファイル数')
+    parser.add_argument('--records', type=int, default=10, help='1ファイルあたりのレコード数')
+    parser.add_argument('--latency-ms', type=int, default=50, help='代替サイトの応答遅延(ミリ秒)')
+    parser.add_argument('--calculate-latency-ms', type=int, default=500, help='レンズ計算APIの追加遅延(ミリ秒)')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', type=Path, default=PROJECT_ROOT / 'benchmark_results', help='結果JSONの出力先')
+    parser.add_argument('--mode', help=argparse.SUPPRESS)
+    parser.add_argument('--work-dir', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode:
+        # 子プロセスとして1モード分を計測し、結果を標準出力の最終行に書き出す
+        print(json.dumps(run_mode(args), ensure_ascii=False))
+        return
+
+    modes = [mode.strip() for mode in args.modes.split(',') if mode.strip()]
+    unknown = [mode for mode in modes if mode not in MODES]
+    if unknown:
+        parser.error(f"不明なモードです: {', '.join(unknown)}")
+
+    results = []
+    for mode in modes:
+        print(f"計測中: {mode} ...", flush=True)
+        with tempfile.TemporaryDirectory(prefix=f'ipcl_bench_{mode}_') as work_dir:
+            # モードごとに別プロセスで実行し、メモリ使用量やグローバルな集計を分離する
+            completed = subprocess.run(
+                [
+                    sys.executable, str(Path(__file__).resolve()),
+                    '--mode', mode, '--work-dir', work_dir,
+                    '--workers', str(args.workers), '--files', str(args.files), '--records', str(args.records),
+                    '--latency-ms', str(args.latency_ms), '--calculate-latency-ms', str(args.calculate_latency_ms),
+                    '--seed', str(args.seed),
+                ],
+                capture_output=True, text=True, encoding='utf-8',
+            )
+            if completed.returncode != 0:
+                print(f"[ERROR] {mode} の計測に失敗しました\n{completed.stderr}")
+                continue
+            results.append(json.loads(completed.stdout.strip().splitlines()[-1]))
+
+    print_report(results)
+
+    args.output.mkdir(parents=True, exist_ok=True)
+    output_path = args.output / f"benchmark_{time.strftime('%Y%m%d_%H%M%S')}.json"
+    output_path.write_text(json.dumps({
+        'parameters': {
+            'workers': args.workers, 'files': args.files, 'records': args.records,
+            'latency_ms': args.latency_ms, 'calculate_latency_ms': args.calculate_latency_ms,
+        },
+        'results': results,
+    }, ensure_ascii=False, indent=2), encoding='utf-8')
+    print(f"\n結果を出力しました: {output_path}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,106 @@
+import argparse
+import csv
+import gc
+import json
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from scripts.benchmark import write_synthetic_csvs  # noqa: E402
+from service.csv_handler import CSVHandler  # noqa: E402
+from service.patient_record import EYE_COLUMNS, EYE_PREFIXES, PATIENT_COLUMNS, RECORD_KEYS  # noqa: E402
+
+# 従来の辞書形式のキーとCSV列名の対応
+LEGACY_COLUMNS = {
+    **{name: column for name, column in PATIENT_COLUMNS},
+    **{
+        f'{prefix}_{name}': f'{column_prefix}{column}'
+        for prefix, column_prefix in EYE_PREFIXES.items()
+        for name, column in EYE_COLUMNS
+    },
+}
+
+
+def read_as_dicts(csv_path: Path) -> list[dict]:
+    # 比較用に、1行ごとに34キーの辞書を作る従来の読み込み方
+    encoding = CSVHandler.detect_encoding(csv_path)
+    with open(csv_path, encoding=encoding, newline='') as f:
+        return [{key: row[LEGACY_COLUMNS[key]] for key in RECORD_KEYS} for row in csv.DictReader(f)]
+
+
+LOADERS = {
+    'dict': read_as_dicts,
+    'record': CSVHandler.read_csv_file,
+}
+
+
+def measure(loader, csv_path: Path, repeat: int) -> dict:
+    timings = []
+    for _ in range(repeat):
+        gc.collect()
+        started = time.perf_counter()
+        records = loader(csv_path)
+        timings.append(time.perf_counter() - started)
+        del records
+
+    # 時間計測に影響しないよう、メモリはtracemallocを有効にした別の読み込みで計測する
+    gc.collect()
+    tracemalloc.start()
+    records = loader(csv_path)
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        'records': len(records),
+        'best_seconds': round(min(timings), 3),
+        'retained_mb': round(retained / 1024 / 1024, 1),
+        'peak_mb': round(peak / 1024 / 1024, 1),
+        'bytes_per_record': round(retained / len(records)) if records else 0,
+    }
+
+
+def print_report(results: dict[str, dict]):
+    print()
+    print(f"{'形式':<8}{'件数':>9}{'秒':>9}{'保持(MB)':>11}{'最大(MB)':>11}{'B/件':>8}")
+    for name, result in results.items():
+        print(
+            f"{name:<8}{result['records']:>9}{result['best_seconds']:>9}"
+            f"{result['retained_mb']:>11}{result['peak_mb']:>11}{result['bytes_per_record']:>8}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description='CSV読み込みの所要時間とメモリ使用量を、辞書形式とPatientRecordで比較します')
+    parser.add_argument('--rows', type=int, default=100_000, help='生成するCSVの行数')
+    parser.add_argument('--repeat', type=int, default=3, help='所要時間の計測回数(最短値を採用)')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', type=Path, default=PROJECT_ROOT / 'benchmark_results', help='結果JSONの出力先')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix='ipcl_csv_bench_') as work_dir:
+        print(f"{args.rows}行のCSVを生成中 ...", flush=True)
+        csv_path = write_synthetic_csvs(Path(work_dir), 1, args.rows, args.seed)[0]
+        results = {}
+        for name, loader in LOADERS.items():
+            print(f"計測中: {name} ...", flush=True)
+            results[name] = measure(loader, csv_path, args.repeat)
+
+    print_report(results)
+
+    args.output.mkdir(parents=True, exist_ok=True)
+    output_path = args.output / f"csv_parse_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    output_path.write_text(
+        json.dumps({'rows': args.rows, 'results': results}, ensure_ascii=False, indent=2), encoding='utf-8'
+    )
+    print(f"\n結果を出力しました: {output_path}")
+
+
+if __name__ == '__main__':
+    main()
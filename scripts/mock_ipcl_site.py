@@ -0,0 +1,251 @@
+import argparse
+import secrets
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse
+
+# ベンチマーク用のIPCL注文システムの代替サイト。
+# 各サービスが操作する要素(ログインフォーム、select2の性別欄、計算用iframe、PDFリンク、下書き保存)だけを再現する
+
+ORDER_PATH = '/awsystem/order/create'
+DRAFTS_PATH = '/awsystem/order/drafts'
+# 下書き保存のPOST先。service.readiness.is_draft_save_responseが一致と判定するパスにする
+DRAFT_SAVE_PATH = '/api/draft'
+SESSION_COOKIE = 'mock_session'
+
+MEASUREMENT_INPUTS = [
+    'spherical', 'cylinder', 'axis', 'acd', 'pachy', 'clr', 'k1', 'k1_axis', 'k2', 'sia', 'ins',
+    'ata', 'casia_manual', 'caliper_manual',
+]
+
+LOGIN_PAGE = '''<!DOCTYPE html>
+<html lang="ja"><head><meta charset="utf-8"><title>ログイン</title>
+<link rel="stylesheet" href="/static/app.css"><script src="/static/app.js"></script></head>
+<body>
+<form method="post" action="/login">
+  <input name="login_id" placeholder="ログインID">
+  <label for="password">パスワード</label><input id="password" name="password" type="password">
+  <button type="submit">サインイン</button>
+</form>
+<img src="/static/logo.png" alt="">
+</body></html>'''
+
+ORDER_PAGE_TEMPLATE = '''<!DOCTYPE html>
+<html lang="ja"><head><meta charset="utf-8"><title>注文作成</title>
+<link rel="stylesheet" href="/static/app.css"><script src="/static/app.js"></script></head>
+<body>
+<label for="patient_id">患者ID</label><input id="patient_id" name="patient_id">
+<label for="sex">性別*</label>
+<span id="select2-order-sex-container" tabindex="0"
+      onclick="document.getElementById('sex-options').style.display='block'">選択してください</span>
+<ul id="sex-options" style="display:none">
+  <li class="select2-results__option" onclick="pickSex(this)">男性</li>
+  <li class="select2-results__option" onclick="pickSex(this)">女性</li>
+</ul>
+<input id="sex" name="sex" type="hidden">
+<label for="surgery_date">手術日</label>
+<input id="surgery_date" name="surgery_date" placeholder="dd/mm/yyyy">
+<button type="button" onclick="openCalculator()">レンズ計算・注文</button>
+<div id="calculator"></div>
+<button type="button" id="btn-save-draft" style="display:none" onclick="saveDraft()">下書き保存</button>
+<script>
+function pickSex(option) {
+    document.getElementById('sex').value = option.textContent;
+    document.getElementById('select2-order-sex-container').textContent = option.textContent;
+    document.getElementById('sex-options').style.display = 'none';
+}
+function openCalculator() {
+    document.getElementById('calculator').innerHTML =
+        '<iframe id="calculatorFrame" src="/calculator" width="900" height="700"></iframe>';
+}
+function showDraftButton() {
+    document.getElementById('btn-save-draft').style.display = 'inline-block';
+}
+function saveDraft() {
+    fetch('{draft_save_path}', { method: 'POST', body: document.getElementById('patient_id').value });
+}
+</script>
+<img src="/static/banner.png" alt="">
+</body></html>'''
+ORDER_PAGE = ORDER_PAGE_TEMPLATE.replace('{draft_save_path}', DRAFT_SAVE_PATH)
+
+CALCULATOR_PAGE_TEMPLATE = '''<!DOCTYPE html>
+<html lang="ja"><head><meta charset="utf-8"><title>レンズ計算</title>
+<link rel="stylesheet" href="/static/app.css"><script src="/static/app.js"></script></head>
+<body>
+<a href="#" onclick="return false">両眼</a> <a href="#" onclick="return false">右眼</a>
+<a href="#" onclick="return false">左眼</a>
+<label><input type="checkbox" name="OrderDetail[include_backup]">バックアップ</label>
+<input placeholder="dd/mm/yyyy" name="OrderDetail[birthday]">
+{inputs}
+<button type="button" id="btn-calculate" onclick="calculate()">計算</button>
+<a id="pdf-link" href="/api/pdf" download="result.pdf" style="display:none"><i class="far fa-file-pdf"></i>PDF</a>
+<button type="button" id="btn-save-draft-modal" onclick="parent.showDraftButton()">入力を保存</button>
+<script>
+function calculate() {
+    fetch('/api/calculate', { method: 'POST' }).then(function () {
+        document.getElementById('pdf-link').style.display = 'inline';
+    });
+}
+</script>
+</body></html>'''
+
+PDF_BODY = b'%PDF-1.4\n1 0 obj<<>>endobj\ntrailer<<>>\n%%EOF\n'
+PNG_BODY = bytes.fromhex(
+    '89504e470d0a1a0a0000000d4948445200000001000000010806000000'
+    '1f15c4890000000d49444154789c63000100000500010d0a2db40000000049454e44ae426082'
+)
+
+
+def calculator_page() -> str:
+    inputs = []
+    for prefix in ['r', 'l']:
+        for field in MEASUREMENT_INPUTS:
+            inputs.append(f'<input name="OrderDetail[{prefix}_{field}]">')
+        for lens in ['IPCL V2.0 Mono', 'IPCL V2.0 Toric']:
+            inputs.append(f'<label><input type="radio" name="OrderDetail[ipcl_{prefix}]" value="{lens}">{lens}</label>')
+    return CALCULATOR_PAGE_TEMPLATE.replace('{inputs}', '\n'.join(inputs))
+
+
+class MockSiteStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.logins = 0
+        self.calculations = 0
+        self.drafts = 0
+
+    def increment(self, name: str):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+
+class MockIPCLHandler(BaseHTTPRequestHandler):
+    server_version = 'MockIPCL/1.0'
+
+    def log_message(self, format, *args):
+        pass
+
+    def _delay(self, extra_ms: int = 0):
+        latency_ms = self.server.latency_ms + extra_ms
+        if latency_ms > 0:
+            time.sleep(latency_ms / 1000)
+
+    def _logged_in(self) -> bool:
+        cookies = self.headers.get('Cookie', '')
+        return any(
+            part.strip() == f'{SESSION_COOKIE}={token}'
+            for part in cookies.split(';')
+            for token in self.server.sessions
+        )
+
+    def _send(self, status: int, body: bytes, content_type: str, headers: dict | None = None):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_html(self, html: str):
+        self._send(200, html.encode('utf-8'), 'text/html; charset=utf-8')
+
+    def _redirect(self, location: str, headers: dict | None = None):
+        self._send(302, b'', 'text/plain', {'Location': location, **(headers or {})})
+
+    def do_GET(self):
+        path = urlparse(self.path).path
+        self._delay()
+
+        if path == ORDER_PATH:
+            self._send_html(ORDER_PAGE if self._logged_in() else LOGIN_PAGE)
+        elif path == DRAFTS_PATH:
+            self._send_html('<!DOCTYPE html><html><body>下書き一覧</body></html>')
+        elif path == '/calculator':
+            self._send_html(calculator_page())
+        elif path == '/api/pdf':
+            self._send(200, PDF_BODY, 'application/pdf', {'Content-Disposition': 'attachment; filename="result.pdf"'})
+        elif path == '/static/app.js':
+            self._send(200, b'window.mockIpcl = true;\n', 'application/javascript',
+                       {'Cache-Control': 'max-age=3600', 'ETag': '"app-js-1"'})
+        elif path == '/static/app.css':
+            self._send(200, b'body { font-family: sans-serif; }\n', 'text/css',
+                       {'Cache-Control': 'max-age=3600', 'ETag': '"app-css-1"'})
+        elif path.endswith('.png'):
+            self._send(200, PNG_BODY, 'image/png')
+        else:
+            self._send(404, b'not found', 'text/plain')
+
+    def do_POST(self):
+        path = urlparse(self.path).path
+        length = int(self.headers.get('Content-Length', 0))
+        if length:
+            self.rfile.read(length)
+        self._delay()
+
+        if path == '/login':
+            token = secrets.token_hex(8)
+            self.server.sessions.add(token)
+            self.server.stats.increment('logins')
+            self._redirect(ORDER_PATH, {'Set-Cookie': f'{SESSION_COOKIE}={token}; Path=/'})
+        elif path == '/api/calculate':
+            self._delay(self.server.calculate_latency_ms)
+            self.server.stats.increment('calculations')
+            self._send(200, b'{"result": "ok"}', 'application/json')
+        elif path == DRAFT_SAVE_PATH:
+            self.server.stats.increment('drafts')
+            self._send(200, b'{"saved": true}', 'application/json')
+        else:
+            self._send(404, b'not found', 'text/plain')
+
+
+class MockIPCLServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, port: int = 0, latency_ms: int = 0, calculate_latency_ms: int = 0):
+        super().__init__(('127.0.0.1', port), MockIPCLHandler)
+        self.latency_ms = latency_ms
+        self.calculate_latency_ms = calculate_latency_ms
+        self.sessions: set[str] = set()
+        self.stats = MockSiteStats()
+        self._thread: threading.Thread | None = None
+
+    @property
+    def base_url(self) -> str:
+        return f'http://127.0.0.1:{self.server_address[1]}{ORDER_PATH}'
+
+    @property
+    def draft_url(self) -> str:
+        return f'http://127.0.0.1:{self.server_address[1]}{DRAFTS_PATH}'
+
+    def start(self):
+        self._thread = threading.Thread(target=self.serve_forever, name='MockIPCLServer', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='ベンチマーク用のIPCL代替サイトを起動します')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency-ms', type=int, default=50, help='各リクエストの応答遅延(ミリ秒)')
+    parser.add_argument('--calculate-latency-ms', type=int, default=500, help='レンズ計算APIの追加遅延(ミリ秒)')
+    args = parser.parse_args()
+
+    server = MockIPCLServer(args.port, args.latency_ms, args.calculate_latency_ms)
+    print(f"代替サイトを起動しました: {server.base_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,247 @@
+import configparser
+import hashlib
+import json
+import logging
+import os
+import threading
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from playwright.sync_api import Error as PlaywrightError
+
+from utils.log_rotation import get_project_root
+
+logger = logging.getLogger(__name__)
+
+# 保存してよいContent-Type(前方一致)。ログイン画面などのHTMLがアセットとして保存されないようにする
+CACHEABLE_CONTENT_TYPES = (
+    'text/css',
+    'text/javascript',
+    'application/javascript',
+    'application/x-javascript',
+    'application/ecmascript',
+    'font/',
+    'application/font-',
+    'image/',
+)
+
+
+def is_cacheable(url: str, final_url: str, headers: dict) -> bool:
+    # リダイレクトされた応答や、想定外のContent-Typeの応答は保存しない
+    if final_url != url:
+        return False
+    content_type = headers.get('content-type', '').split(';')[0].strip().lower()
+    return content_type.startswith(CACHEABLE_CONTENT_TYPES)
+
+
+class AssetCache:
+    # JS/CSSなどの静的アセットをURL単位でディスクに保存し、route.fulfillで返す。
+    # 最終アクセス日時は本体ファイルのmtimeで管理し、容量超過時は古いものから削除する
+    def __init__(self, cache_dir: Path, max_bytes: int, resource_types: list[str]):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.resource_types = set(resource_types)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._revalidator: ThreadPoolExecutor | None = None
+        self._revalidated: set[str] = set()
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def from_config(cls, config: configparser.ConfigParser) -> 'AssetCache | None':
+        if not config.getboolean('AssetCache', 'enabled', fallback=False):
+            return None
+
+        cache_dir = Path(config.get('AssetCache', 'cache_dir', fallback='cache/assets'))
+        if not cache_dir.is_absolute():
+            cache_dir = get_project_root() / cache_dir
+        max_size_mb = config.getint('AssetCache', 'max_size_mb', fallback=50)
+        resource_types = config.get('AssetCache', 'resource_types', fallback='script, stylesheet')
+
+        return cls(
+            cache_dir,
+            max_size_mb * 1024 * 1024,
+            [item.strip().lower() for item in resource_types.split(',') if item.strip()],
+        )
+
+    def _paths(self, url: str) -> tuple[Path, Path]:
+        key = hashlib.sha256(url.encode('utf-8')).hexdigest()
+        return self.cache_dir / f'{key}.bin', self.cache_dir / f'{key}.json'
+
+    def should_handle(self, request) -> bool:
+        return request.method == 'GET' and request.resource_type in self.resource_types
+
+    def get(self, url: str) -> tuple[dict, bytes] | None:
+        body_path, meta_path = self._paths(url)
+        try:
+            meta = json.loads(meta_path.read_text(encoding='utf-8'))
+            body = body_path.read_bytes()
+            os.utime(body_path)
+        except (OSError, ValueError):
+            return None
+
+        if meta.get('url') != url:
+            return None
+        return meta, body
+
+    def put(self, url: str, headers: dict, body: bytes):
+        if len(body) > self.max_bytes:
+            return
+
+        body_path, meta_path = self._paths(url)
+        meta = {
+            'url': url,
+            'etag': headers.get('etag'),
+            'last_modified': headers.get('last-modified'),
+            'content_type': headers.get('content-type', 'application/octet-stream'),
+        }
+        try:
+            self._write_atomic(body_path, body)
+            self._write_atomic(meta_path, json.dumps(meta, ensure_ascii=False).encode('utf-8'))
+        except OSError as e:
+            logger.warning(f"アセットキャッシュの保存に失敗しました: {url}: {e}")
+            return
+
+        self._evict()
+
+    @staticmethod
+    def _write_atomic(path: Path, data: bytes):
+        temp_path = path.with_name(f'{path.name}.{os.getpid()}.{threading.get_ident()}.tmp')
+        temp_path.write_bytes(data)
+        os.replace(temp_path, path)
+
+    def _evict(self):
+        with self._lock:
+            entries = []
+            for body_path in self.cache_dir.glob('*.bin'):
+                try:
+                    stat = body_path.stat()
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, body_path))
+
+            total = sum(size for _, size, _ in entries)
+            for _, size, body_path in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                body_path.unlink(missing_ok=True)
+                body_path.with_suffix('.json').unlink(missing_ok=True)
+                total -= size
+
+    @staticmethod
+    def _fulfill_headers(meta: dict) -> dict:
+        headers = {'content-type': meta['content_type']}
+        if meta.get('etag'):
+            headers['etag'] = meta['etag']
+        return headers
+
+    def _record(self, hit: bool):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def handle(self, route):
+        request = route.request
+        if not self.should_handle(request):
+            route.fallback()
+            return
+
+        cached = self.get(request.url)
+        if cached is not None:
+            meta, body = cached
+            self._record(hit=True)
+            route.fulfill(status=200, headers=self._fulfill_headers(meta), body=body)
+            self._schedule_revalidation(request.url, meta)
+            return
+
+        self._record(hit=False)
+        try:
+            response = route.fetch()
+            if response.status == 200 and is_cacheable(request.url, response.url, response.headers):
+                self.put(request.url, response.headers, response.body())
+        except PlaywrightError as e:
+            # 取得に失敗したリクエストを止めたままにしないよう、ブラウザ側の処理に任せる
+            logger.debug(f"アセットの取得に失敗したためキャッシュを使わずに読み込みます: {request.url}: {e}")
+            route.fallback()
+            return
+        route.fulfill(response=response)
+
+    async def handle_async(self, route):
+        request = route.request
+        if not self.should_handle(request):
+            await route.fallback()
+            return
+
+        cached = self.get(request.url)
+        if cached is not None:
+            meta, body = cached
+            self._record(hit=True)
+            await route.fulfill(status=200, headers=self._fulfill_headers(meta), body=body)
+            self._schedule_revalidation(request.url, meta)
+            return
+
+        self._record(hit=False)
+        try:
+            response = await route.fetch()
+            if response.status == 200 and is_cacheable(request.url, response.url, response.headers):
+                self.put(request.url, response.headers, await response.body())
+        except PlaywrightError as e:
+            logger.debug(f"アセットの取得に失敗したためキャッシュを使わずに読み込みます: {request.url}: {e}")
+            await route.fallback()
+            return
+        await route.fulfill(response=response)
+
+    def _schedule_revalidation(self, url: str, meta: dict):
+        # 再検証は1回の実行につきURLごとに1回だけ、ブラウザとは別スレッドで行う
+        with self._lock:
+            if url in self._revalidated:
+                return
+            self._revalidated.add(url)
+            if self._revalidator is None:
+                self._revalidator = ThreadPoolExecutor(max_workers=2, thread_name_prefix='AssetRevalidate')
+            self._revalidator.submit(self._revalidate, url, meta)
+
+    def _revalidate(self, url: str, meta: dict):
+        headers = {}
+        if meta.get('etag'):
+            headers['If-None-Match'] = meta['etag']
+        if meta.get('last_modified'):
+            headers['If-Modified-Since'] = meta['last_modified']
+
+        try:
+            with urllib.request.urlopen(urllib.request.Request(url, headers=headers), timeout=10) as response:
+                body = response.read()
+                final_url = response.geturl()
+                response_headers = {key.lower(): value for key, value in response.headers.items()}
+            # セッションのCookieを送らないため、ログイン画面へリダイレクトされることがある
+            if not is_cacheable(url, final_url, response_headers):
+                logger.debug(f"アセットの再検証結果を保存しませんでした: {url} -> {final_url}")
+                return
+            self.put(url, response_headers, body)
+            logger.debug(f"アセットキャッシュを更新しました: {url}")
+        except urllib.error.HTTPError as e:
+            if e.code != 304:
+                logger.debug(f"アセットの再検証に失敗しました: {url}: HTTP {e.code}")
+        except (urllib.error.URLError, OSError) as e:
+            logger.debug(f"アセットの再検証に失敗しました: {url}: {e}")
+
+    def close(self):
+        with self._lock:
+            revalidator, self._revalidator = self._revalidator, None
+            self._revalidated.clear()
+        if revalidator is not None:
+            revalidator.shutdown(wait=True, cancel_futures=True)
+
+    def log_summary(self):
+        with self._lock:
+            hits, misses = self.hits, self.misses
+            self.hits = self.misses = 0
+
+        requests = hits + misses
+        hit_rate = hits / requests * 100 if requests else 0
+        logger.info(f"アセットキャッシュ: ヒット {hits}件, ミス {misses}件 (ヒット率 {hit_rate:.1f}%)")
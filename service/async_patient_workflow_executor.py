@@ -0,0 +1,132 @@
+import asyncio
+import logging
+from pathlib import Path
+from typing import Any, Awaitable, Callable
+
+from playwright.async_api import Page, TimeoutError as PlaywrightTimeoutError
+
+from service.async_services import AsyncAuthService, AsyncLensCalculatorService, AsyncPatientService, AsyncSaveService
+from service.circuit_breaker import CircuitOpenError
+from service.concurrency_controller import CONGESTION_TIMEOUT, watch_server_errors
+from service.record_journal import RecordJournal
+from service.save_service import discard_pdf
+from service.step_timer import RecordTimer, step_timings
+from service.workflow_steps import RetryDecision, RetryPolicy, WorkflowState, step_message
+from widgets.progress_window import ProgressWindow
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncPatientWorkflowExecutor:
+    def __init__(
+        self,
+        auth_service: AsyncAuthService,
+        patient_service: AsyncPatientService,
+        lens_calculator_service: AsyncLensCalculatorService,
+        save_service: AsyncSaveService,
+        progress_window: ProgressWindow,
+        timeout: int = 5000,
+        record_journal: RecordJournal | None = None,
+        retry_policies: dict[str, RetryPolicy] | None = None,
+    ):
+        self.auth_service = auth_service
+        self.patient_service = patient_service
+        self.lens_calculator_service = lens_calculator_service
+        self.save_service = save_service
+        self.progress_window = progress_window
+        self.timeout = timeout
+        self.record_journal = record_journal
+        self.retry_policies = retry_policies
+
+    def _step_actions(self, data: dict) -> dict[str, Callable[[Page], Awaitable[Any]]]:
+        eye = data['eye']
+        return {
+            'login': self.auth_service.ensure_logged_in,
+            'patient_info': lambda page: self.patient_service.fill_patient_info(page, data),
+            'open_calculator': self.lens_calculator_service.open_lens_calculator,
+            'eye_tab': lambda page: self.lens_calculator_service.select_eye_tab(page, eye),
+            'birthday': lambda page: self.patient_service.fill_birthday(page, data['birthday']),
+            'measurements': lambda page: self.lens_calculator_service.fill_measurement_data(page, data, eye),
+            'lens_type': lambda page: self.lens_calculator_service.select_lens_type(page, data, eye),
+            'ata_wtw': lambda page: self.lens_calculator_service.fill_ata_wtw_data(page, data, eye),
+            'calculate': self.lens_calculator_service.click_calculate_button,
+            'save_pdf': lambda page: self.save_service.click_save_pdf_button(page, data['id'], data['name']),
+            'save_input': self.save_service.save_input,
+            'save_draft': self.save_service.save_draft,
+        }
+
+    def _report_retry(self, idx: int, total: int, name: str, retry: RetryDecision, error: Exception):
+        resume = "ページを開き直して" if retry.renavigate else ""
+        message = f"[{idx}/{total}] {name}でエラーが発生したため{resume}再試行します ({retry.attempt}/{retry.attempts}回目): {error}"
+        logger.warning(message)
+        self.progress_window.update(message)
+
+    async def execute(self, page: Page, idx: int, total: int, data: dict) -> tuple[bool, Path | None]:
+        pdf_path = None
+        save_success = False
+        timer = RecordTimer()
+        page.set_default_timeout(self.timeout)
+        watch_server_errors(page, timer)
+
+        state = WorkflowState(self.retry_policies)
+
+        try:
+            actions = self._step_actions(data)
+            while not state.finished:
+                name = state.current_step
+                self.progress_window.update(f"[{idx}/{total}] {step_message(name, data)}")
+                try:
+                    with timer.span(name):
+                        result = await actions[name](page)
+                except Exception as e:
+                    if isinstance(e, PlaywrightTimeoutError):
+                        timer.congestion = CONGESTION_TIMEOUT
+                    retry = state.fail(e)
+                    if retry is None:
+                        raise
+                    timer.record_retry(name, retry.attempt, e, retry.renavigate)
+                    self._report_retry(idx, total, name, retry, e)
+                    if retry.renavigate and pdf_path:
+                        # 開き直した後に保存し直すため、1レコードにつきPDFが1つだけ残るようにする
+                        discard_pdf(pdf_path)
+                        pdf_path = None
+                    await asyncio.sleep(retry.delay)
+                    continue
+
+                if name == 'save_pdf':
+                    pdf_path = result
+                elif name == 'save_draft':
+                    save_success = result
+                state.advance()
+
+            if save_success:
+                self.progress_window.update(f"[{idx}/{total}] 注文の下書きが保存されました")
+                if pdf_path:
+                    logger.info(f"PDF保存先: {pdf_path}")
+            else:
+                logger.warning("下書き保存に失敗しました。手動で確認してください。")
+
+            return save_success, pdf_path
+
+        except CircuitOpenError as e:
+            # 接続先の障害による失敗はレコードの問題ではないため、スタックトレースは出さない
+            message = f"[{idx}/{total}] {e}"
+            logger.warning(message)
+            self.progress_window.update(f"[ERROR] {message}")
+            return False, None
+
+        except Exception as e:
+            if isinstance(e, PlaywrightTimeoutError):
+                timer.congestion = CONGESTION_TIMEOUT
+            error_msg = f"[{idx}/{total}] 処理中にエラーが発生しました: {e}"
+            logger.exception(error_msg)
+            self.progress_window.update(f"[ERROR] {error_msg}")
+            logger.error(
+                f"エラー発生時の患者情報 - ID: {data.get('id')}, 名前: {data.get('name')}, 眼: {data.get('eye')}"
+            )
+            return False, None
+
+        finally:
+            step_timings.add(data, timer, save_success)
+            if self.record_journal is not None:
+                self.record_journal.record(data, save_success, pdf_path)
@@ -0,0 +1,147 @@
+import asyncio
+import logging
+from typing import Callable
+
+from playwright.async_api import Browser, Error as PlaywrightError, Playwright, async_playwright
+
+from service.async_patient_workflow_executor import AsyncPatientWorkflowExecutor
+from service.asset_cache import AssetCache
+from service.async_services import AsyncAuthService
+from service.circuit_breaker import CircuitOpenError
+from service.concurrency_controller import ConcurrencyController
+from service.resource_blocker import ResourceBlocker
+
+logger = logging.getLogger(__name__)
+
+SLOT_POLL_SECONDS = 0.05
+
+
+class AsyncRecordRunner:
+    # 1つのイベントループ上で複数レコードを同時に処理する。
+    # ループとブラウザは実行中のファイル間で共有し、stop()で終了する
+    def __init__(
+        self,
+        concurrency: int,
+        headless: bool,
+        auth_service: AsyncAuthService,
+        workflow_executor: AsyncPatientWorkflowExecutor,
+        resource_blocker: ResourceBlocker | None = None,
+        asset_cache: AssetCache | None = None,
+        limiter: ConcurrencyController | None = None,
+    ):
+        self.concurrency = max(1, concurrency)
+        self.headless = headless
+        self.auth_service = auth_service
+        self.workflow_executor = workflow_executor
+        self.resource_blocker = resource_blocker
+        self.asset_cache = asset_cache
+        self.limiter = limiter
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._playwright: Playwright | None = None
+        self._browser: Browser | None = None
+        self._browser_lock: asyncio.Lock | None = None
+
+    def run(self, records: list[dict], on_result: Callable[[int, bool], None] | None = None) -> list[bool]:
+        if self._loop is None:
+            self._loop = asyncio.new_event_loop()
+            self._browser_lock = asyncio.Lock()
+        return self._loop.run_until_complete(self._run_all(records, on_result))
+
+    def stop(self):
+        if self._loop is None:
+            return
+        try:
+            self._loop.run_until_complete(self._shutdown())
+        finally:
+            self._loop.close()
+            self._loop = None
+            self._browser_lock = None
+
+    async def _ensure_browser(self) -> Browser:
+        browser = self._browser
+        if browser is not None and browser.is_connected():
+            return browser
+
+        # 同時に開始したレコードがそれぞれドライバやブラウザを起動しないよう、最初の1件だけが起動する
+        async with self._browser_lock:
+            if self._playwright is None:
+                self._playwright = await async_playwright().start()
+                logger.info("Playwrightドライバを起動しました(async)")
+
+            if self._browser is None or not self._browser.is_connected():
+                if self._browser is not None:
+                    logger.warning("ブラウザとの接続が切れたため再起動します")
+                self._browser = await self._playwright.chromium.launch(headless=self.headless)
+                logger.info("ブラウザを起動しました(async)")
+            return self._browser
+
+    async def _shutdown(self):
+        if self._browser is not None:
+            try:
+                await self._browser.close()
+            except PlaywrightError as e:
+                logger.warning(f"ブラウザの終了中にエラーが発生しました: {e}")
+            self._browser = None
+
+        if self._playwright is not None:
+            await self._playwright.stop()
+            self._playwright = None
+            logger.info("Playwrightドライバを停止しました(async)")
+
+    async def _run_all(self, records: list[dict], on_result: Callable[[int, bool], None] | None = None) -> list[bool]:
+        semaphore = asyncio.Semaphore(self.concurrency)
+        total = len(records)
+
+        async def run_one(idx: int, data: dict) -> bool:
+            async with semaphore:
+                if self.limiter is None:
+                    success = await self._process_record(idx, total, data)
+                else:
+                    # 同時実行数の枠はスレッド用のため、イベントループを止めないよう空くまで待機を繰り返す
+                    while not self.limiter.try_acquire():
+                        await asyncio.sleep(SLOT_POLL_SECONDS)
+                    try:
+                        success = await self._process_record(idx, total, data)
+                    finally:
+                        self.limiter.release()
+            if on_result:
+                on_result(idx - 1, success)
+            return success
+
+        results = await asyncio.gather(*(run_one(idx, data) for idx, data in enumerate(records, 1)))
+        return list(results)
+
+    async def _process_record(self, idx: int, total: int, data: dict) -> bool:
+        logger.info(f"[{idx}/{total}件目を処理中…] 患者ID: {data['id']}, 名前: {data['name']}, 眼: {data['eye']}")
+        context = None
+
+        try:
+            # 接続先が落ちている間は、ブラウザやコンテキストを用意する前に失敗させる
+            if self.auth_service.circuit_breaker is not None:
+                self.auth_service.circuit_breaker.check()
+            browser = await self._ensure_browser()
+            context = await browser.new_context(accept_downloads=True, storage_state=self.auth_service.storage_state)
+            if self.asset_cache is not None:
+                await context.route('**/*', self.asset_cache.handle_async)
+            if self.resource_blocker is not None:
+                await context.route('**/*', self.resource_blocker.handle_async)
+                context.on('response', self.resource_blocker.record_response)
+            page = await context.new_page()
+            save_success, _ = await self.workflow_executor.execute(page, idx, total, data)
+            return save_success
+
+        except CircuitOpenError as e:
+            # 接続先の障害による失敗はレコードの問題ではないため、スタックトレースは出さない
+            logger.warning(f"[{idx}/{total}] {e}")
+            return False
+
+        except Exception as e:
+            logger.exception(f"エラーが発生しました: {e}")
+            return False
+
+        finally:
+            if context is not None:
+                try:
+                    await context.close()
+                except PlaywrightError as e:
+                    logger.warning(f"ブラウザコンテキストの終了中にエラーが発生しました: {e}")
@@ -0,0 +1,257 @@
+import asyncio
+import logging
+from pathlib import Path
+
+from playwright.async_api import Error as PlaywrightError, FrameLocator, Page
+
+from service.circuit_breaker import CircuitBreaker
+from service.date_input import fill_date_async
+from service.lens_calculator_service import (
+    ATA_WTW_FIELDS,
+    BULK_FILL_SCRIPT,
+    CALCULATOR_FRAME,
+    MEASUREMENT_FIELDS,
+    eye_prefixes,
+    field_values,
+    lens_type_selector,
+    mismatched_fields,
+    record_lens_type,
+)
+from service.patient_service import SEX_FIELD, SURGERY_DATE_FIELD, PatientService
+from service.rate_limiter import ACTION_CALCULATE, ACTION_LOGIN, ACTION_SAVE_DRAFT, RateLimiter
+from service.readiness import DRAFT_SAVED, LANDING_READY, LOGIN_FORM_READY, ORDER_FORM_READY
+from service.save_service import SaveService, pdf_filename
+from service.strategy_registry import StrategyRegistry
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncAuthService:
+    def __init__(
+        self,
+        base_url: str,
+        email: str,
+        password: str,
+        rate_limiter: RateLimiter | None = None,
+        circuit_breaker: CircuitBreaker | None = None,
+    ):
+        self.base_url = base_url
+        self.email = email
+        self.password = password
+        self.rate_limiter = rate_limiter
+        self.circuit_breaker = circuit_breaker
+        self.storage_state: dict | None = None
+        self._login_lock = asyncio.Lock()
+
+    async def login(self, page: Page):
+        if self.rate_limiter is not None:
+            await self.rate_limiter.wait_async(ACTION_LOGIN)
+        await page.goto(self.base_url)
+        await LOGIN_FORM_READY.wait_async(page)
+
+        await page.get_by_placeholder("ログインID").fill(self.email)
+        await page.get_by_label("パスワード").fill(self.password)
+        await page.click('button:has-text("サインイン")')
+        await ORDER_FORM_READY.wait_async(page)
+
+        self.storage_state = await page.context.storage_state()
+
+    async def is_login_page(self, page: Page) -> bool:
+        return await page.get_by_placeholder("ログインID").is_visible()
+
+    async def ensure_logged_in(self, page: Page):
+        if self.circuit_breaker is None:
+            await self._ensure_logged_in(page)
+            return
+
+        self.circuit_breaker.before_call()
+        try:
+            await self._ensure_logged_in(page)
+        except Exception:
+            self.circuit_breaker.record_failure()
+            raise
+        self.circuit_breaker.record_success()
+
+    async def _ensure_logged_in(self, page: Page):
+        if self.storage_state is None:
+            # 同時に開始したレコードが一斉にログインしないよう、最初の1件だけがログインする
+            async with self._login_lock:
+                if self.storage_state is None:
+                    await self.login(page)
+                    return
+                await page.context.add_cookies(self.storage_state['cookies'])
+
+        used_state = self.storage_state
+        await page.goto(self.base_url)
+        await LANDING_READY.wait_async(page)
+        if await self.is_login_page(page):
+            async with self._login_lock:
+                # 待っている間に他のレコードが再ログインしていれば、そのセッションを使う
+                if self.storage_state is used_state:
+                    logger.info("セッションの有効期限が切れたため再ログインします")
+                    await self.login(page)
+                    return
+                await page.context.add_cookies(self.storage_state['cookies'])
+            await page.goto(self.base_url)
+            await ORDER_FORM_READY.wait_async(page)
+
+
+class AsyncPatientService:
+    def __init__(self, strategy_registry: StrategyRegistry | None = None):
+        self.strategy_registry = strategy_registry or StrategyRegistry()
+
+    async def fill_patient_info(self, page: Page, data: dict):
+        await ORDER_FORM_READY.wait_async(page)
+
+        await page.get_by_label("患者ID").fill(data['id'])
+
+        try:
+            await self.strategy_registry.run_async(SEX_FIELD, {
+                'select2': lambda: AsyncPatientService._select_sex_with_select2(page, data['sex']),
+                'label': lambda: AsyncPatientService._select_sex_with_label(page, data['sex']),
+            })
+        except Exception:
+            logger.warning("性別選択をスキップしました")
+
+        surgery_date_formatted = PatientService._convert_date_format(data['surgery_date'])
+        try:
+            _, strategy = await self.strategy_registry.run_async(SURGERY_DATE_FIELD, {
+                'label': lambda: fill_date_async(page.get_by_label("手術日"), surgery_date_formatted),
+                'name': lambda: fill_date_async(page.locator('input[name*="surgery"]').first, surgery_date_formatted),
+            })
+            logger.info(f"手術日を入力しました: {surgery_date_formatted} (入力方式: {strategy})")
+        except Exception as e:
+            logger.warning(f"手術日入力をスキップしました: {e}")
+
+    @staticmethod
+    async def _select_sex_with_select2(page: Page, sex: str):
+        await page.locator('#select2-order-sex-container').click()
+        await page.locator('li.select2-results__option').first.wait_for(state='visible')
+        sex_index = 0 if sex == '男性' else 1
+        await page.locator('li.select2-results__option').nth(sex_index).click()
+
+    @staticmethod
+    async def _select_sex_with_label(page: Page, sex: str):
+        await page.get_by_label("性別*").click()
+        await page.click(f'li:has-text("{sex}")')
+
+    @staticmethod
+    async def fill_birthday(page: Page, birthday: str):
+        frame = page.frame_locator(CALCULATOR_FRAME)
+
+        try:
+            birthday_formatted = PatientService._convert_date_format(birthday)
+            birthday_input = frame.locator('input[placeholder="dd/mm/yyyy"]').first
+            strategy = await fill_date_async(birthday_input, birthday_formatted)
+            logger.info(f"誕生日を入力しました: {birthday_formatted} (入力方式: {strategy})")
+
+        except Exception as e:
+            logger.error(f"誕生日入力中にエラーが発生: {e}", exc_info=True)
+
+
+class AsyncLensCalculatorService:
+    def __init__(self, bulk_fill: bool = False, rate_limiter: RateLimiter | None = None):
+        self.bulk_fill = bulk_fill
+        self.rate_limiter = rate_limiter
+
+    @staticmethod
+    async def open_lens_calculator(page: Page):
+        await page.click('button:has-text("レンズ計算・注文")')
+        await page.frame_locator(CALCULATOR_FRAME).locator('body').wait_for(state='visible')
+
+    @staticmethod
+    async def select_eye_tab(page: Page, eye: str):
+        frame = page.frame_locator(CALCULATOR_FRAME)
+
+        if eye == '両眼':
+            await frame.locator('a:has-text("両眼")').click()
+            backup_checkbox = frame.locator('input[type="checkbox"][name="OrderDetail[include_backup]"]')
+            if not await backup_checkbox.is_checked():
+                await backup_checkbox.check()
+        elif eye in ['右眼', '左眼']:
+            await frame.locator(f'a:has-text("{eye}")').click()
+
+    async def fill_measurement_data(self, page: Page, data: dict, eye: str):
+        await self._fill_fields(page, field_values(data, eye, MEASUREMENT_FIELDS))
+
+    @staticmethod
+    async def select_lens_type(page: Page, data: dict, eye: str):
+        frame = page.frame_locator(CALCULATOR_FRAME)
+
+        for prefix in eye_prefixes(eye):
+            lens_type = record_lens_type(data, prefix)
+            await frame.locator(lens_type_selector(prefix, lens_type)).check()
+
+    async def fill_ata_wtw_data(self, page: Page, data: dict, eye: str):
+        await self._fill_fields(page, field_values(data, eye, ATA_WTW_FIELDS))
+
+    async def _fill_fields(self, page: Page, values: dict[str, str]):
+        frame = page.frame_locator(CALCULATOR_FRAME)
+
+        if self.bulk_fill:
+            values = await self._bulk_fill(frame, values)
+
+        for selector, value in values.items():
+            await frame.locator(selector).fill(value)
+
+    @staticmethod
+    async def _bulk_fill(frame: FrameLocator, values: dict[str, str]) -> dict[str, str]:
+        try:
+            read_back = await frame.locator('body').evaluate(BULK_FILL_SCRIPT, values)
+        except PlaywrightError as e:
+            logger.warning(f"一括入力に失敗したため個別に入力します: {e}")
+            return values
+        return mismatched_fields(values, read_back)
+
+    async def click_calculate_button(self, page: Page):
+        if self.rate_limiter is not None:
+            await self.rate_limiter.wait_async(ACTION_CALCULATE)
+        await page.frame_locator(CALCULATOR_FRAME).locator('button#btn-calculate').click()
+
+
+class AsyncSaveService:
+    def __init__(self, pdf_dir: Path, rate_limiter: RateLimiter | None = None):
+        self.pdf_dir = pdf_dir
+        self.rate_limiter = rate_limiter
+
+    async def click_save_pdf_button(self, page: Page, patient_id: str, patient_name: str) -> str:
+        frame = page.frame_locator(CALCULATOR_FRAME)
+
+        try:
+            async with page.expect_download() as download_info:
+                await frame.locator('a:has(i.far.fa-file-pdf)').click()
+
+            download = await download_info.value
+
+            pdf_path = self.pdf_dir / pdf_filename(patient_id)
+
+            await download.save_as(pdf_path)
+
+            logger.info(f"計算結果のPDFファイルを保存しました: {pdf_path}")
+            return str(pdf_path)
+
+        except Exception as e:
+            logger.error(f"PDF保存中にエラーが発生しました: {e}")
+            raise
+
+    @staticmethod
+    async def save_input(page: Page):
+        await page.frame_locator(CALCULATOR_FRAME).locator('button#btn-save-draft-modal').click()
+
+    async def save_draft(self, page: Page) -> bool:
+        try:
+            save_button = page.locator('button:has-text("下書き保存")')
+            await save_button.wait_for(state='visible', timeout=2000)
+
+            if not await save_button.is_disabled():
+                if self.rate_limiter is not None:
+                    await self.rate_limiter.wait_async(ACTION_SAVE_DRAFT)
+                async with DRAFT_SAVED.expect_async(page) as result:
+                    await save_button.click()
+                return SaveService._is_draft_response_ok(result.get('response'))
+            else:
+                logger.warning("下書き保存ボタンが無効のため、処理をスキップしました")
+                return False
+        except Exception as e:
+            logger.warning(f"下書き保存をスキップしました: {e}")
+            return False
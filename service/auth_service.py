@@ -1,17 +1,81 @@
+import logging
+import threading
+
 from playwright.sync_api import Page
 
+from service.circuit_breaker import CircuitBreaker
+from service.rate_limiter import ACTION_LOGIN, RateLimiter
+from service.readiness import LANDING_READY, LOGIN_FORM_READY, ORDER_FORM_READY
+
+logger = logging.getLogger(__name__)
+
 
 class AuthService:
-    def __init__(self, base_url: str, email: str, password: str):
+    def __init__(
+        self,
+        base_url: str,
+        email: str,
+        password: str,
+        rate_limiter: RateLimiter | None = None,
+        circuit_breaker: CircuitBreaker | None = None,
+    ):
         self.base_url = base_url
         self.email = email
         self.password = password
+        self.rate_limiter = rate_limiter
+        self.circuit_breaker = circuit_breaker
+        self.storage_state: dict | None = None
+        self._login_lock = threading.Lock()
 
     def login(self, page: Page):
+        if self.rate_limiter is not None:
+            self.rate_limiter.wait(ACTION_LOGIN)
         page.goto(self.base_url)
-        page.wait_for_load_state('networkidle')
+        LOGIN_FORM_READY.wait(page)
 
         page.get_by_placeholder("ログインID").fill(self.email)
         page.get_by_label("パスワード").fill(self.password)
         page.click('button:has-text("サインイン")')
-        page.wait_for_load_state('networkidle')
+        ORDER_FORM_READY.wait(page)
+
+        self.storage_state = page.context.storage_state()
+
+    def is_login_page(self, page: Page) -> bool:
+        return page.get_by_placeholder("ログインID").is_visible()
+
+    def ensure_logged_in(self, page: Page):
+        if self.circuit_breaker is None:
+            self._ensure_logged_in(page)
+            return
+
+        # 接続先が落ちている間は、ページを開いてタイムアウトを待たずに即座に失敗させる
+        self.circuit_breaker.before_call()
+        try:
+            self._ensure_logged_in(page)
+        except Exception:
+            self.circuit_breaker.record_failure()
+            raise
+        self.circuit_breaker.record_success()
+
+    def _ensure_logged_in(self, page: Page):
+        if self.storage_state is None:
+            # 同時に開始したレコードが一斉にログインしないよう、最初の1件だけがログインする
+            with self._login_lock:
+                if self.storage_state is None:
+                    self.login(page)
+                    return
+                page.context.add_cookies(self.storage_state['cookies'])
+
+        used_state = self.storage_state
+        page.goto(self.base_url)
+        LANDING_READY.wait(page)
+        if self.is_login_page(page):
+            with self._login_lock:
+                # 待っている間に他のスレッドが再ログインしていれば、そのセッションを使う
+                if self.storage_state is used_state:
+                    logger.info("セッションの有効期限が切れたため再ログインします")
+                    self.login(page)
+                    return
+                page.context.add_cookies(self.storage_state['cookies'])
+            page.goto(self.base_url)
+            ORDER_FORM_READY.wait(page)
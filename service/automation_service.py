@@ -1,17 +1,39 @@
 import logging
+import multiprocessing
 import os
+import time
 from pathlib import Path
+from typing import Callable
 
-from playwright.sync_api import sync_playwright
+from playwright.sync_api import Error as PlaywrightError
 
+from service.asset_cache import AssetCache
+from service.async_patient_workflow_executor import AsyncPatientWorkflowExecutor
+from service.async_record_runner import AsyncRecordRunner
+from service.async_services import AsyncAuthService, AsyncLensCalculatorService, AsyncPatientService, AsyncSaveService
 from service.auth_service import AuthService
 from service.browser_manager import BrowserManager
+from service.circuit_breaker import CircuitBreaker
+from service.concurrency_controller import ConcurrencyController
 from service.csv_handler import CSVHandler
+from service.csv_watcher import CSV_PATTERN
 from service.lens_calculator_service import LensCalculatorService
+from service.patient_record import PatientRecord
 from service.patient_service import PatientService
 from service.patient_workflow_executor import PatientWorkflowExecutor
+from service.process_shard_runner import ProcessShardRunner, ShardSettings
+from service.rate_limiter import RateLimiter
+from service.readiness import probe_latency
+from service.record_journal import RecordJournal
+from service.record_validator import RecordValidator
+from service.record_worker_pool import RecordWorkerPool
+from service.resource_blocker import ResourceBlocker
 from service.save_service import SaveService
+from service.step_timer import step_timings
+from service.strategy_registry import StrategyRegistry
+from service.work_queue import FileBatch, WorkQueue, arrival_time
 from utils.config_manager import load_config, load_environment_variables
+from utils.log_rotation import get_project_root
 from widgets.progress_window import ProgressWindow
 
 logger = logging.getLogger(__name__)
@@ -26,6 +48,7 @@ class IPCLOrderAutomation:
         self.calculated_dir = Path(config.get('Paths', 'calculated_dir'))
         self.error_dir = Path(config.get('Paths', 'error_dir'))
         self.pdf_dir = self.csv_dir / 'pdf'
+        self.log_dir = get_project_root() / config.get('LOGGING', 'log_directory', fallback='logs')
         self.pdf_dir.mkdir(exist_ok=True)
         logger.info(f"PDFダウンロード先: {self.pdf_dir}")
 
@@ -34,15 +57,79 @@ class IPCLOrderAutomation:
         password = os.getenv('PASSWORD')
         headless = config.getboolean('Settings', 'headless')
         timeout = config.getint('Settings', 'timeout')
+        workers = config.getint('Settings', 'workers', fallback=1)
+        engine = config.get('Settings', 'engine', fallback='thread')
+        bulk_fill = config.getboolean('Settings', 'bulk_fill', fallback=False)
 
         self.progress_window = ProgressWindow()
         self.csv_handler = CSVHandler()
-        self.browser_manager = BrowserManager(headless)
+        self.record_validator = RecordValidator()
+        self.resource_blocker = ResourceBlocker.from_config(config)
+        self.asset_cache = AssetCache.from_config(config)
+        self.strategy_registry = StrategyRegistry.from_config(config)
+        self.record_journal = RecordJournal.from_config(config)
+        # プロセス実行ではワーカープロセスと共有できるよう、レート制限のバケットと接続の遮断状態を共有メモリ上に作る
+        shared_context = multiprocessing.get_context('spawn') if engine == 'process' else None
+        self.rate_limiter = RateLimiter.from_config(config, shared_context)
+        self.circuit_breaker = CircuitBreaker.from_config(config, shared_context, on_change=self.progress_window.update)
+        self.concurrency_controller = ConcurrencyController.from_config(
+            config, workers, on_change=lambda limit, message: self.progress_window.update(message)
+        )
+        # 同時実行数を自動調整する場合は上限の数だけワーカーを用意し、実際に動かす数はコントローラーが決める
+        worker_count = self.concurrency_controller.ceiling if self.concurrency_controller else workers
+        self.browser_manager = BrowserManager(headless, self.resource_blocker, self.asset_cache)
+        self.worker_pool = None
+        self.async_runner = None
+        self.process_runner = None
+        if engine == 'process':
+            self.process_runner = ProcessShardRunner(
+                worker_count,
+                ShardSettings(
+                    base_url,
+                    email,
+                    password,
+                    headless,
+                    timeout,
+                    self.pdf_dir,
+                    self.calculated_dir,
+                    logging.getLogger().getEffectiveLevel(),
+                ),
+                self.concurrency_controller,
+                self.rate_limiter,
+                self.circuit_breaker,
+            )
+        elif engine == 'async':
+            async_auth_service = AsyncAuthService(base_url, email, password, self.rate_limiter, self.circuit_breaker)
+            async_workflow_executor = AsyncPatientWorkflowExecutor(
+                async_auth_service,
+                AsyncPatientService(self.strategy_registry),
+                AsyncLensCalculatorService(bulk_fill, self.rate_limiter),
+                AsyncSaveService(self.pdf_dir, self.rate_limiter),
+                self.progress_window,
+                timeout,
+                self.record_journal,
+            )
+            self.async_runner = AsyncRecordRunner(
+                worker_count,
+                headless,
+                async_auth_service,
+                async_workflow_executor,
+                self.resource_blocker,
+                self.asset_cache,
+                self.concurrency_controller,
+            )
+        elif worker_count > 1:
+            self.worker_pool = RecordWorkerPool(
+                worker_count,
+                lambda: BrowserManager(headless, self.resource_blocker, self.asset_cache),
+                lambda browser_manager, job: self._process_single_record(*job, browser_manager=browser_manager),
+                self.concurrency_controller,
+            )
 
-        auth_service = AuthService(base_url, email, password)
-        patient_service = PatientService()
-        lens_calculator_service = LensCalculatorService()
-        save_service = SaveService(self.pdf_dir, self.calculated_dir)
+        auth_service = AuthService(base_url, email, password, self.rate_limiter, self.circuit_breaker)
+        patient_service = PatientService(self.strategy_registry)
+        lens_calculator_service = LensCalculatorService(bulk_fill, self.rate_limiter)
+        save_service = SaveService(self.pdf_dir, self.calculated_dir, self.rate_limiter)
 
         self.workflow_executor = PatientWorkflowExecutor(
             auth_service,
@@ -51,41 +138,86 @@ class IPCLOrderAutomation:
             save_service,
             self.progress_window,
             timeout,
+            self.record_journal,
         )
         self.save_service = save_service
+        self.auth_service = auth_service
+        self.timeout = timeout
+        self._processed_records = 0
+        self._started_at = time.monotonic()
 
-    def _read_csv_data(self, csv_path: Path) -> list[dict]:
+    def _read_csv_data(self, csv_path: Path) -> list[PatientRecord]:
         self.progress_window.update(f"CSVファイルを読み込み中...\n{csv_path.name}")
         all_data = self.csv_handler.read_csv_file(csv_path)
         self.progress_window.update(f"{len(all_data)}件のデータを読み込みました")
         return all_data
 
-    def _process_single_record(self, idx: int, total: int, data: dict) -> bool:
+    def _validate_records(self, csv_path: Path, all_data: list[PatientRecord]) -> dict[int, PatientRecord]:
+        # 戻り値は、ファイル内の位置(1始まり)をキーにした検証済みのレコード
+        records, rejected = self.record_validator.validate_all(all_data)
+        if rejected:
+            report_path = self.record_validator.write_report(csv_path, rejected, self.error_dir)
+            self.progress_window.update(
+                f"[ERROR] {len(rejected)}件のデータに不備があるため処理対象から除外しました\n{report_path.name}"
+            )
+        rejected_rows = {item.row for item in rejected}
+        positions = [position for position in range(1, len(all_data) + 1) if position not in rejected_rows]
+        return dict(zip(positions, records))
+
+    def _skip_drafted_records(self, records: dict[int, PatientRecord]) -> dict[int, PatientRecord]:
+        if self.record_journal is None or not records:
+            return records
+
+        pending = self.record_journal.pending(records)
+        skipped_count = len(records) - len(pending)
+        if skipped_count:
+            logger.info(f"下書き保存済みの{skipped_count}件をスキップします")
+            self.progress_window.update(f"下書き保存済みの{skipped_count}件をスキップします")
+        return pending
+
+    def _process_single_record(
+        self, idx: int, total: int, data: dict, browser_manager: BrowserManager | None = None
+    ) -> bool:
         logger.info(f"[{idx}/{total}件目を処理中…]")
         logger.info(f"  患者ID: {data['id']}, 名前: {data['name']}, 眼: {data['eye']}")
-        self.progress_window.update(
-            f"[{idx}/{total}件目を処理中…]\n患者ID: {data['id']}\n名前: {data['name']}\n眼: {data['eye']}"
-        )
+        message = f"[{idx}/{total}件目を処理中…]\n患者ID: {data['id']}\n名前: {data['name']}\n眼: {data['eye']}"
+        if self.concurrency_controller is not None:
+            message += f"\n同時実行数: {self.concurrency_controller.limit}"
+        self.progress_window.update(message)
 
-        with sync_playwright() as p:
-            browser = self.browser_manager.create_browser(p)
-            context = self.browser_manager.create_context(browser)
-            page = self.browser_manager.create_page(context)
+        try:
+            return self.workflow_executor.execute_in_new_context(
+                browser_manager or self.browser_manager, idx, total, data
+            )
 
-            try:
-                save_success, _ = self.workflow_executor.execute(page, idx, total, data)
-                return save_success
+        except Exception as e:
+            error_msg = f"エラーが発生しました: {e}"
+            logger.exception(error_msg)
+            self.progress_window.update(f"[ERROR] {error_msg}")
+            return False
 
-            except Exception as e:
-                error_msg = f"エラーが発生しました: {e}"
-                logger.exception(error_msg)
-                self.progress_window.update(f"[ERROR] {error_msg}")
-                return False
+    def _process_records(
+        self, all_data: list[dict], on_result: Callable[[int, bool], None] | None = None
+    ) -> list[bool]:
+        if self.async_runner is not None:
+            return self.async_runner.run(all_data, on_result=on_result)
 
-            finally:
-                browser.close()
+        total = len(all_data)
+        jobs = [(idx, total, data) for idx, data in enumerate(all_data, 1)]
+        if self.process_runner is not None:
+            return self.process_runner.map(jobs, on_progress=self.progress_window.update, on_result=on_result)
 
-    def process_csv_file(self, csv_path: Path):
+        if self.worker_pool is None:
+            results = []
+            for position, job in enumerate(jobs):
+                results.append(self._process_single_record(*job))
+                if on_result:
+                    on_result(position, results[-1])
+            return results
+
+        return self.worker_pool.map(jobs, on_result=on_result)
+
+    def _prepare_csv_file(self, csv_path: Path) -> tuple[FileBatch, dict[int, PatientRecord]] | None:
         logger.info(f"処理開始: {csv_path.name}")
 
         try:
@@ -94,55 +226,199 @@ class IPCLOrderAutomation:
             logger.exception(f"CSVファイルの読み込み中にエラーが発生しました: {e}")
             self.progress_window.update(f"[ERROR] CSVファイルの読み込みに失敗しました")
             self.save_service.move_csv_to_error(csv_path, self.error_dir)
-            return
+            return None
+
+        valid_records = self._validate_records(csv_path, all_data)
+        pending = self._skip_drafted_records(valid_records)
+        rejected_rows = {position for position in range(1, len(all_data) + 1) if position not in valid_records}
+        return FileBatch(csv_path, len(all_data), rejected_rows, pending), pending
+
+    @property
+    def circuit_open(self) -> bool:
+        return self.circuit_breaker is not None and self.circuit_breaker.is_open
+
+    def _park_csv_file(self, batch: FileBatch):
+        csv_path = batch.csv_path
+        retry_path = self.save_service.park_csv_rows(csv_path, batch.parked_rows, batch.failed_rows, self.error_dir)
+        message = f"接続先が応答しないため{len(batch.parked_rows)}件を保留しました: {csv_path.name}"
+        logger.warning(message)
+        if retry_path is not None:
+            message += f"\n失敗した行をエラーフォルダの{retry_path.name}に出力しました"
+        self.progress_window.update(f"{message}\n接続先の回復後に処理し直します")
 
-        all_success = True
-        failed_count = 0
+    def _finish_csv_file(self, batch: FileBatch):
+        csv_path = batch.csv_path
+        if batch.parked_rows:
+            self._park_csv_file(batch)
+            return
 
-        for idx, data in enumerate(all_data, 1):
-            success = self._process_single_record(idx, len(all_data), data)
-            if not success:
-                all_success = False
-                failed_count += 1
+        failed_count = len(batch.failed_rows)
+        total_rows = batch.total_rows
 
-        if all_success:
+        if failed_count == 0:
             self.save_service.move_csv_to_calculated(csv_path)
-        else:
+        elif failed_count == total_rows:
             self.save_service.move_csv_to_error(csv_path, self.error_dir)
+            logger.error(f"すべてのレコードでエラーが発生しました: {csv_path.name} ({failed_count}件)")
+            self.progress_window.update(
+                f"[ERROR] {csv_path.name}\n"
+                f"すべてのレコードでエラーが発生しました ({failed_count}件)\n"
+                f"エラーフォルダに移動しました"
+            )
+        else:
+            # 成功した行は計算済フォルダに残し、失敗した行だけを再処理用のCSVに分ける
+            retry_path = self.save_service.split_csv_by_result(csv_path, batch.failed_rows, self.error_dir)
             logger.error(
                 f"一部のレコードでエラーが発生しました: {csv_path.name} "
-                f"(失敗: {failed_count}/{len(all_data)}件)"
+                f"(失敗: {failed_count}/{total_rows}件)"
             )
             self.progress_window.update(
                 f"[ERROR] {csv_path.name}\n"
-                f"エラーが発生しました ({failed_count}/{len(all_data)}件失敗)\n"
-                f"エラーフォルダに移動しました"
+                f"エラーが発生しました ({failed_count}/{total_rows}件失敗)\n"
+                f"失敗した行をエラーフォルダの{retry_path.name}に出力しました"
             )
 
         logger.info(f"処理完了: {csv_path.name}")
 
+    def _finish_csv_file_safely(self, batch: FileBatch):
+        try:
+            self._finish_csv_file(batch)
+        except Exception as e:
+            # 他のファイルの行はまだ処理中のため、ここでは中断しない(Excelで開いたままのファイルなど)
+            logger.exception(f"CSVファイルの移動中にエラーが発生しました: {batch.csv_path.name}: {e}")
+            self.progress_window.update(f"[ERROR] CSVファイルを移動できませんでした: {batch.csv_path.name}\n{e}")
+
+    def process_csv_files(self, csv_paths: list[Path], park: bool = False) -> list[Path]:
+        # すべてのファイルの処理待ちの行を1つのキューにまとめ、手術日が近い行から処理する。
+        # ファイルの移動は、そのファイルの最後の行が終わった時点で行う。
+        # parkがTrueの場合、接続先の障害で失敗した行はエラーにせず元のファイルに残し、そのファイルのパスを返す
+        work_queue = WorkQueue()
+        batches = []
+        for file_idx, csv_path in enumerate(csv_paths, 1):
+            if len(csv_paths) > 1:
+                logger.info(f"[{file_idx}/{len(csv_paths)}件目のファイルを読み込み中…]")
+            prepared = self._prepare_csv_file(csv_path)
+            if prepared is None:
+                continue
+            batch, pending = prepared
+            work_queue.add(batch, pending, arrival_time(csv_path))
+            batches.append(batch)
+
+        for batch in batches:
+            if batch.is_complete:
+                self._finish_csv_file_safely(batch)
+
+        items = work_queue.drain()
+        if not items:
+            return []
+
+        def on_result(index: int, success: bool):
+            item = items[index]
+            parked = park and not success and self.circuit_open
+            if item.batch.complete(item.position, success, parked):
+                self._finish_csv_file_safely(item.batch)
+
+        if len(batches) > 1:
+            logger.info(f"{len(batches)}件のファイルの{len(items)}件のデータを手術日の近い順に処理します")
+        results = self._process_records([item.record for item in items], on_result=on_result)
+        self._processed_records += len(results)
+
+        # 結果が個別に通知されなかった行(ワーカーの異常終了など)は、まとめて反映する
+        for index, success in enumerate(results):
+            on_result(index, success)
+
+        return [batch.csv_path for batch in batches if batch.parked_rows]
+
+    def process_csv_file(self, csv_path: Path):
+        self.process_csv_files([csv_path])
+
     def process_all_csv_files(self):
-        csv_files = list(self.csv_dir.glob('IPCLdata_*.csv'))
+        csv_files = list(self.csv_dir.glob(CSV_PATTERN))
 
         if not csv_files:
             logger.warning("処理するCSVファイルが見つかりませんでした")
             return
 
-        self.progress_window.create()
+        self.start_session()
 
         try:
             logger.info(f"{len(csv_files)}件のCSVファイルを処理します")
             self.progress_window.update(f"{len(csv_files)}件のCSVファイルを処理します")
-
-            for idx, csv_file in enumerate(csv_files, 1):
-                logger.info(f"[{idx}/{len(csv_files)}件目を処理中…]")
-                self.progress_window.update(f"[{idx}/{len(csv_files)}件目のファイルを処理中…]\n{csv_file.name}")
-                self.process_csv_file(csv_file)
+            self.process_csv_files(csv_files)
 
             logger.info("すべてのファイルの処理が完了しました")
             logger.info(f"PDFの保存先: {self.pdf_dir}")
             self.progress_window.update(f"すべてのファイルの処理が完了しました\n\nPDFの保存先:\n{self.pdf_dir}")
 
         finally:
-            if self.progress_window.progress_window:
-                self.progress_window.progress_window.after(1000, self.progress_window.close)
+            self.finish_session()
+
+    def start_session(self):
+        self.progress_window.create()
+        self._processed_records = 0
+        self._started_at = time.monotonic()
+        if self.concurrency_controller is not None:
+            step_timings.add_listener(self.concurrency_controller.observe)
+            logger.info(
+                f"同時実行数を自動調整します: 開始 {self.concurrency_controller.limit} "
+                f"(範囲 {self.concurrency_controller.floor}〜{self.concurrency_controller.ceiling})"
+            )
+
+    def finish_session(self):
+        if self.worker_pool is not None:
+            self.worker_pool.stop()
+        if self.async_runner is not None:
+            self.async_runner.stop()
+        if self.process_runner is not None:
+            self.process_runner.stop()
+        self.browser_manager.stop()
+        self._log_throughput(time.monotonic() - self._started_at)
+        if self.resource_blocker is not None:
+            self.resource_blocker.log_summary()
+        if self.asset_cache is not None:
+            self.asset_cache.close()
+            self.asset_cache.log_summary()
+        probe_latency.log_summary()
+        if self.rate_limiter is not None:
+            self.rate_limiter.log_summary()
+        if self.circuit_breaker is not None:
+            self.circuit_breaker.log_summary()
+        if self.concurrency_controller is not None:
+            step_timings.remove_listener(self.concurrency_controller.observe)
+            self.concurrency_controller.log_summary()
+        step_timings.log_summary()
+        step_timings.write_report(self.log_dir)
+        if self.record_journal is not None:
+            self.record_journal.close()
+        # 最後のメッセージを1秒間表示してから閉じる
+        self.progress_window.close(delay=1.0)
+
+    def keep_session_alive(self):
+        # 非同期・プロセス実行ではログイン状態を各ランナーが持つため、ここではスレッド実行時のみ扱う
+        if self.async_runner is not None or self.process_runner is not None:
+            return
+
+        context = None
+        try:
+            context = self.browser_manager.new_context(self.auth_service.storage_state)
+            page = self.browser_manager.create_page(context)
+            page.set_default_timeout(self.timeout)
+            self.auth_service.ensure_logged_in(page)
+            logger.info("ログイン状態を確認しました")
+        except Exception as e:
+            logger.warning(f"ログイン状態の確認に失敗しました: {e}")
+        finally:
+            if context is not None:
+                try:
+                    context.close()
+                except PlaywrightError as e:
+                    logger.warning(f"ブラウザコンテキストの終了中にエラーが発生しました: {e}")
+
+    def _log_throughput(self, elapsed: float):
+        if self._processed_records == 0 or elapsed <= 0:
+            return
+        records_per_minute = self._processed_records * 60 / elapsed
+        logger.info(
+            f"処理件数: {self._processed_records}件, 所要時間: {elapsed:.1f}秒, "
+            f"スループット: {records_per_minute:.2f}件/分"
+        )
@@ -1,16 +1,29 @@
 import logging
 import os
 import sys
+from contextlib import contextmanager
 from pathlib import Path
 
-from playwright.sync_api import Browser, BrowserContext, Page, Playwright
+from playwright.sync_api import Browser, BrowserContext, Error as PlaywrightError, Page, Playwright, sync_playwright
+
+from service.asset_cache import AssetCache
+from service.resource_blocker import ResourceBlocker
 
 logger = logging.getLogger(__name__)
 
 
 class BrowserManager:
-    def __init__(self, headless: bool = True):
+    def __init__(
+        self,
+        headless: bool = True,
+        resource_blocker: ResourceBlocker | None = None,
+        asset_cache: AssetCache | None = None,
+    ):
         self.headless = headless
+        self.resource_blocker = resource_blocker
+        self.asset_cache = asset_cache
+        self._playwright: Playwright | None = None
+        self._browser: Browser | None = None
         self._setup_playwright_path()
 
     def _setup_playwright_path(self):
@@ -23,11 +36,74 @@ class BrowserManager:
             else:
                 logger.warning(f"Playwrightブラウザパスが見つかりません: {playwright_browsers}")
 
+    @property
+    def is_running(self) -> bool:
+        return self._browser is not None and self._browser.is_connected()
+
+    def start(self):
+        if self._playwright is None:
+            self._playwright = sync_playwright().start()
+            logger.info("Playwrightドライバを起動しました")
+
+        if not self.is_running:
+            self._browser = self.create_browser(self._playwright)
+            logger.info("ブラウザを起動しました")
+
+    def stop(self):
+        if self._browser is not None:
+            try:
+                self._browser.close()
+            except PlaywrightError as e:
+                logger.warning(f"ブラウザの終了中にエラーが発生しました: {e}")
+            self._browser = None
+
+        if self._playwright is not None:
+            self._playwright.stop()
+            self._playwright = None
+            logger.info("Playwrightドライバを停止しました")
+
+    @contextmanager
+    def runtime(self):
+        self.start()
+        try:
+            yield self
+        finally:
+            self.stop()
+
+    def _relaunch_browser(self):
+        if self._browser is not None:
+            try:
+                self._browser.close()
+            except PlaywrightError:
+                pass
+            self._browser = None
+        self.start()
+
+    def new_context(self, storage_state: dict | None = None) -> BrowserContext:
+        if not self.is_running:
+            if self._browser is not None:
+                logger.warning("ブラウザとの接続が切れたため再起動します")
+            self._relaunch_browser()
+
+        try:
+            return self.create_context(self._browser, storage_state)
+        except PlaywrightError as e:
+            logger.warning(f"コンテキストの作成に失敗したためブラウザを再起動します: {e}")
+            self._relaunch_browser()
+            return self.create_context(self._browser, storage_state)
+
     def create_browser(self, playwright: Playwright) -> Browser:
         return playwright.chromium.launch(headless=self.headless)
 
-    def create_context(self, browser: Browser) -> BrowserContext:
-        return browser.new_context(accept_downloads=True)
+    def create_context(self, browser: Browser, storage_state: dict | None = None) -> BrowserContext:
+        context = browser.new_context(accept_downloads=True, storage_state=storage_state)
+        # ルートは後から登録したものが先に評価されるため、ブロック判定をキャッシュより優先させる
+        if self.asset_cache is not None:
+            context.route('**/*', self.asset_cache.handle)
+        if self.resource_blocker is not None:
+            context.route('**/*', self.resource_blocker.handle)
+            context.on('response', self.resource_blocker.record_response)
+        return context
 
     def create_page(self, context: BrowserContext) -> Page:
         return context.new_page()
@@ -0,0 +1,166 @@
+import configparser
+import logging
+import threading
+import time
+from typing import Callable
+
+logger = logging.getLogger(__name__)
+
+# 共有状態の添字
+_FAILURES = 0
+_OPENED_AT = 1
+_PROBING = 2
+
+
+class CircuitOpenError(Exception):
+    pass
+
+
+class CircuitBreaker:
+    # ログインとページ遷移の連続失敗を数え、failure_threshold回続いたら回路を開いて以降の処理を即座に失敗させる。
+    # reset_seconds経過後は1件だけ試行(ハーフオープン)を通し、成功すれば回路を閉じ、失敗すれば再び開く
+    def __init__(
+        self,
+        failure_threshold: int = 3,
+        reset_seconds: float = 30.0,
+        state=None,
+        lock=None,
+        on_change: Callable[[str], None] | None = None,
+    ):
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_seconds = reset_seconds
+        # [連続失敗回数, 回路を開いた時刻(エポック秒、閉じているときは0), 試行を始めた時刻(試行中でなければ0)]。
+        # プロセス間で共有する場合はmultiprocessingの共有配列とロックを渡す
+        self._state = state if state is not None else [0.0, 0.0, 0.0]
+        self._lock = lock if lock is not None else threading.Lock()
+        self.on_change = on_change
+        self._stats_lock = threading.Lock()
+        self._opened_count = 0
+        self._rejected_count = 0
+
+    @classmethod
+    def from_config(
+        cls,
+        config: configparser.ConfigParser,
+        context=None,
+        on_change: Callable[[str], None] | None = None,
+    ) -> 'CircuitBreaker | None':
+        # contextにmultiprocessingのコンテキストを渡すと、ワーカープロセスと共有できる状態を作る
+        if not config.getboolean('CircuitBreaker', 'enabled', fallback=False):
+            return None
+
+        failure_threshold = config.getint('CircuitBreaker', 'failure_threshold', fallback=3)
+        reset_seconds = config.getfloat('CircuitBreaker', 'reset_seconds', fallback=30.0)
+        if context is not None:
+            return cls(failure_threshold, reset_seconds, context.Array('d', 3, lock=False), context.Lock(), on_change)
+        return cls(failure_threshold, reset_seconds, on_change=on_change)
+
+    def __getstate__(self):
+        # ワーカープロセスへは設定と共有状態だけを渡し、集計と通知はプロセスごとに行う
+        return {
+            'failure_threshold': self.failure_threshold,
+            'reset_seconds': self.reset_seconds,
+            'state': self._state,
+            'lock': self._lock,
+        }
+
+    def __setstate__(self, state):
+        self.__init__(state['failure_threshold'], state['reset_seconds'], state['state'], state['lock'])
+
+    @property
+    def is_open(self) -> bool:
+        # 今呼び出すと即座に失敗するかを返す。回復の確認待ちになった時点でFalseになる
+        with self._lock:
+            return self._rejects(time.time())
+
+    def _rejects(self, now: float) -> bool:
+        opened_at = self._state[_OPENED_AT]
+        if not opened_at:
+            return False
+        return self._probe_active(now) or now - opened_at < self.reset_seconds
+
+    def _probe_active(self, now: float) -> bool:
+        # 試行中のワーカーが結果を返さずに終了しても止まり続けないよう、reset_seconds経過した試行は無効とする
+        probe_started = self._state[_PROBING]
+        return bool(probe_started) and now - probe_started < self.reset_seconds
+
+    def check(self):
+        # 回路が開いていればCircuitOpenErrorを送出する。回復の確認の枠は取らない
+        now = time.time()
+        with self._lock:
+            rejected = self._rejects(now)
+            remaining = self._remaining(now)
+        if rejected:
+            self._reject(remaining)
+
+    def before_call(self):
+        # 回路が開いていればCircuitOpenErrorを送出し、回復の確認待ちであればこの呼び出しを試行として通す
+        now = time.time()
+        with self._lock:
+            rejected = self._rejects(now)
+            remaining = self._remaining(now)
+            probing = not rejected and bool(self._state[_OPENED_AT])
+            if probing:
+                self._state[_PROBING] = now
+
+        if rejected:
+            self._reject(remaining)
+        if probing:
+            self._notify("接続先の回復を確認しています...")
+
+    def _remaining(self, now: float) -> float:
+        deadline = self._state[_OPENED_AT] + self.reset_seconds
+        if self._probe_active(now):
+            deadline = max(deadline, self._state[_PROBING] + self.reset_seconds)
+        return max(0.0, deadline - now)
+
+    def _reject(self, remaining: float):
+        with self._stats_lock:
+            self._rejected_count += 1
+        raise CircuitOpenError(f"接続先が応答しないため処理を中断しました (再確認まで約{remaining:.0f}秒)")
+
+    def record_success(self):
+        with self._lock:
+            recovered = bool(self._state[_OPENED_AT])
+            self._state[_FAILURES] = 0.0
+            self._state[_OPENED_AT] = 0.0
+            self._state[_PROBING] = 0.0
+
+        if recovered:
+            self._notify("接続先が回復したため処理を再開します")
+
+    def record_failure(self):
+        with self._lock:
+            self._state[_FAILURES] += 1
+            failures = int(self._state[_FAILURES])
+            if self._state[_PROBING]:
+                # 回復の確認に失敗したため、もう一度待つ
+                self._state[_OPENED_AT] = time.time()
+                self._state[_PROBING] = 0.0
+                opened = True
+            elif not self._state[_OPENED_AT] and failures >= self.failure_threshold:
+                self._state[_OPENED_AT] = time.time()
+                opened = True
+            else:
+                opened = False
+
+        if opened:
+            with self._stats_lock:
+                self._opened_count += 1
+            self._notify(
+                f"ログインまたはページ遷移が{failures}回続けて失敗したため、"
+                f"{self.reset_seconds:.0f}秒間処理を止めます"
+            )
+
+    def _notify(self, message: str):
+        logger.warning(message)
+        if self.on_change:
+            self.on_change(message)
+
+    def log_summary(self):
+        with self._stats_lock:
+            opened_count, self._opened_count = self._opened_count, 0
+            rejected_count, self._rejected_count = self._rejected_count, 0
+
+        if opened_count or rejected_count:
+            logger.info(f"接続の遮断: {opened_count}回, 即座に失敗させた処理: {rejected_count}件")
@@ -0,0 +1,157 @@
+import configparser
+import logging
+import threading
+from typing import Callable
+
+from service.step_timer import RecordTimer
+
+logger = logging.getLogger(__name__)
+
+CONGESTION_TIMEOUT = 'timeout'
+CONGESTION_SERVER_ERROR = 'server_error'
+CONGESTION_LATENCY = 'latency'
+
+REASON_LABELS = {
+    CONGESTION_TIMEOUT: 'タイムアウト',
+    CONGESTION_SERVER_ERROR: 'サーバーエラー(5xx)',
+    CONGESTION_LATENCY: '応答時間の急増',
+}
+
+# 基準値の学習に使う件数。これより少ないステップでは急増を判定しない
+BASELINE_MIN_SAMPLES = 3
+BASELINE_SMOOTHING = 0.2
+# 短いステップのわずかな揺れを急増とみなさないための下限(秒)
+SPIKE_MIN_SECONDS = 1.0
+
+
+def watch_server_errors(page, timer: RecordTimer):
+    # 5xx応答を受けたレコードは、サーバー混雑の兆候として記録する
+    def on_response(response):
+        if response.status >= 500 and timer.congestion is None:
+            timer.congestion = CONGESTION_SERVER_ERROR
+
+    page.on('response', on_response)
+
+
+class ConcurrencyController:
+    # AIMD方式で同時実行数を調整する。応答時間が基準値付近のまま同時実行数と同じ件数が
+    # 終わるごとに1つ増やし、タイムアウト・5xx応答・応答時間の急増があれば一定の割合で減らす
+    def __init__(
+        self,
+        floor: int,
+        ceiling: int,
+        initial: int | None = None,
+        decrease_factor: float = 0.5,
+        spike_ratio: float = 2.0,
+        on_change: Callable[[int, str], None] | None = None,
+    ):
+        self.floor = max(1, floor)
+        self.ceiling = max(self.floor, ceiling)
+        self.decrease_factor = decrease_factor
+        self.spike_ratio = spike_ratio
+        self.on_change = on_change
+        self._limit = min(max(initial or self.floor, self.floor), self.ceiling)
+        self._lowest = self._highest = self._limit
+        self._condition = threading.Condition()
+        self._active = 0
+        self._healthy_streak = 0
+        self._cooldown = 0
+        self._baselines: dict[str, tuple[float, int]] = {}
+
+    @classmethod
+    def from_config(
+        cls,
+        config: configparser.ConfigParser,
+        workers: int,
+        on_change: Callable[[int, str], None] | None = None,
+    ) -> 'ConcurrencyController | None':
+        if not config.getboolean('Concurrency', 'adaptive', fallback=False):
+            return None
+
+        floor = config.getint('Concurrency', 'min_workers', fallback=1)
+        return cls(
+            floor,
+            config.getint('Concurrency', 'max_workers', fallback=max(workers, floor)),
+            workers,
+            config.getfloat('Concurrency', 'decrease_factor', fallback=0.5),
+            config.getfloat('Concurrency', 'spike_ratio', fallback=2.0),
+            on_change,
+        )
+
+    @property
+    def limit(self) -> int:
+        return self._limit
+
+    def acquire(self):
+        with self._condition:
+            while self._active >= self._limit:
+                self._condition.wait()
+            self._active += 1
+
+    def try_acquire(self) -> bool:
+        with self._condition:
+            if self._active >= self._limit:
+                return False
+            self._active += 1
+            return True
+
+    def release(self):
+        with self._condition:
+            self._active -= 1
+            self._condition.notify_all()
+
+    def observe(self, entry: dict):
+        # StepTimingRecorderに記録された1レコード分の結果(ステップごとの所要時間と混雑の兆候)を受け取る
+        with self._condition:
+            old_limit = self._limit
+            reason = entry.get('congestion') or self._latency_spike(entry['steps'])
+
+            if self._cooldown > 0:
+                # 減らす前から処理中だったレコードの結果では、続けて減らしたり増やしたりしない
+                self._cooldown -= 1
+            elif reason:
+                self._limit = max(self.floor, int(self._limit * self.decrease_factor))
+                self._healthy_streak = 0
+                self._cooldown = max(0, self._active - 1)
+            elif entry.get('success'):
+                self._healthy_streak += 1
+                if self._healthy_streak >= self._limit:
+                    self._limit = min(self.ceiling, self._limit + 1)
+                    self._healthy_streak = 0
+
+            if not reason and entry.get('success'):
+                self._learn_baseline(entry['steps'])
+
+            new_limit = self._limit
+            self._lowest = min(self._lowest, new_limit)
+            self._highest = max(self._highest, new_limit)
+            self._condition.notify_all()
+
+        if new_limit != old_limit:
+            cause = REASON_LABELS.get(reason, reason) if reason else '応答時間が安定'
+            message = f"同時実行数を{old_limit}から{new_limit}に変更しました ({cause})"
+            logger.info(message)
+            if self.on_change:
+                self.on_change(new_limit, message)
+
+    def _latency_spike(self, steps: dict[str, float]) -> str | None:
+        for name, seconds in steps.items():
+            baseline, samples = self._baselines.get(name, (0.0, 0))
+            if samples < BASELINE_MIN_SAMPLES:
+                continue
+            if seconds > baseline * self.spike_ratio and seconds - baseline >= SPIKE_MIN_SECONDS:
+                logger.debug(f"応答時間の急増を検出しました[{name}]: {seconds:.2f}秒 (基準値 {baseline:.2f}秒)")
+                return CONGESTION_LATENCY
+        return None
+
+    def _learn_baseline(self, steps: dict[str, float]):
+        # 混雑の兆候がなかったレコードだけで基準値を更新し、急増した値で基準値が引き上げられないようにする
+        for name, seconds in steps.items():
+            baseline, samples = self._baselines.get(name, (seconds, 0))
+            self._baselines[name] = (baseline + (seconds - baseline) * BASELINE_SMOOTHING, samples + 1)
+
+    def log_summary(self):
+        logger.info(
+            f"同時実行数: 最終 {self._limit} (期間中の最小 {self._lowest}, 最大 {self._highest}, "
+            f"設定範囲 {self.floor}〜{self.ceiling})"
+        )
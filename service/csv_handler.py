@@ -1,60 +1,67 @@
+import codecs
 import csv
 from pathlib import Path
+from typing import Iterator
+
+from service.patient_record import HeaderIndex, PatientRecord
+
+# エンコーディング判定に使う先頭部分のサイズ
+ENCODING_SAMPLE_SIZE = 64 * 1024
 
 
 class CSVHandler:
     @staticmethod
-    def read_csv_file(csv_path: Path) -> list[dict]:
-        all_data = []
-        for encoding in ['cp932', 'utf-8']:
-            try:
-                with open(csv_path, encoding=encoding) as f:
-                    reader = csv.DictReader(f)
-                    for data in reader:
-                        patient_data = {
-                            'name': data['name'],
-                            'id': data['ID'],
-                            'sex': data['sex'],
-                            'birthday': data['birthday'],
-                            'surgery_date': data['surgerydate'],
-                            'eye': data['eye'],
-                            # 右眼データ
-                            'r_sph': data['R_SPH'],
-                            'r_cyl': data['R_Cyl'],
-                            'r_axis': data['R_Axis'],
-                            'r_acd': data['R_ACD'],
-                            'r_pachy': data['R_Pachy(CCT)'],
-                            'r_clr': data['R_CLR'],
-                            'r_k1': data['R_K1(Kf)'],
-                            'r_k1_axis': data['R_K1Axis'],
-                            'r_k2': data['R_K2(Kf)'],
-                            'r_sia': data['R_SIA'],
-                            'r_ins': data['R_Ins'],
-                            # 左眼データ
-                            'l_sph': data['L_SPH'],
-                            'l_cyl': data['L_Cyl'],
-                            'l_axis': data['L_Axis'],
-                            'l_acd': data['L_ACD'],
-                            'l_pachy': data['L_Pachy(CCT)'],
-                            'l_clr': data['L_CLR'],
-                            'l_k1': data['L_K1(Kf)'],
-                            'l_k1_axis': data['L_K1Axis'],
-                            'l_k2': data['L_K2(Kf)'],
-                            'l_sia': data['L_SIA'],
-                            'l_ins': data['L_Ins'],
-                            # ATA/WTW データ
-                            'r_ata': data['R_\tATA'],
-                            'r_casia_wtw_m': data['R_CASIA_WTW_M'],
-                            'r_caliper_wtw': data['R_Caliper_WTW'],
-                            'l_ata': data['L_\tATA'],
-                            'l_casia_wtw_m': data['L_CASIA_WTW_M'],
-                            'l_caliper_wtw': data['L_Caliper_WTW'],
-                        }
-                        all_data.append(patient_data)
-                break
-            except UnicodeDecodeError:
-                if encoding == 'utf-8':
-                    raise
-                continue
-
-        return all_data
+    def detect_encoding(csv_path: Path) -> str:
+        with open(csv_path, 'rb') as f:
+            sample = f.read(ENCODING_SAMPLE_SIZE)
+            if sample.startswith(codecs.BOM_UTF8):
+                return 'utf-8-sig'
+
+            # ASCIIだけではどちらのエンコーディングか判別できないため、最初の非ASCIIバイトまで読み進める
+            while sample.isascii():
+                sample = f.read(ENCODING_SAMPLE_SIZE)
+                if not sample:
+                    return 'utf-8'
+
+        first_non_ascii = next(i for i, byte in enumerate(sample) if byte >= 0x80)
+        try:
+            # 読み込んだ範囲の末尾で文字が途切れていても失敗しないよう、逐次デコーダーで判定する
+            codecs.getincrementaldecoder('utf-8')().decode(sample[first_non_ascii:], final=False)
+        except UnicodeDecodeError:
+            return 'cp932'
+        return 'utf-8'
+
+    @staticmethod
+    def iter_records(csv_path: Path) -> Iterator[PatientRecord]:
+        encoding = CSVHandler.detect_encoding(csv_path)
+        with open(csv_path, encoding=encoding, newline='') as f:
+            reader = csv.reader(f)
+            header = next(reader, None)
+            index = None
+            for row in reader:
+                if not row:
+                    continue
+                # 列番号はファイルごとに1回だけ求める。データ行がなければ列の検証もしない
+                if index is None:
+                    index = HeaderIndex(header)
+                yield PatientRecord.from_row(row, index)
+
+    @staticmethod
+    def read_csv_file(csv_path: Path) -> list[PatientRecord]:
+        return list(CSVHandler.iter_records(csv_path))
+
+    @staticmethod
+    def read_rows(csv_path: Path) -> tuple[str, list[str] | None, list[list[str]]]:
+        # 変換前の行をそのまま返す。空行はiter_recordsと同じく除くため、行の位置はレコードの位置と一致する
+        encoding = CSVHandler.detect_encoding(csv_path)
+        with open(csv_path, encoding=encoding, newline='') as f:
+            reader = csv.reader(f)
+            header = next(reader, None)
+            return encoding, header, [row for row in reader if row]
+
+    @staticmethod
+    def write_rows(csv_path: Path, encoding: str, header: list[str], rows: list[list[str]]):
+        with open(csv_path, 'w', encoding=encoding, newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(header)
+            writer.writerows(rows)
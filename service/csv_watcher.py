@@ -0,0 +1,57 @@
+import logging
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+CSV_PATTERN = 'IPCLdata_*.csv'
+
+
+class CsvWatcher:
+    # csv_dirをポーリングし、サイズと更新日時が連続してstable_checks回変わらなかったファイルを
+    # 書き込み完了とみなして返す。Windowsでも動くよう、OSのファイル監視APIは使わない
+    def __init__(self, csv_dir: Path, stable_checks: int = 2, pattern: str = CSV_PATTERN):
+        self.csv_dir = csv_dir
+        self.stable_checks = max(1, stable_checks)
+        self.pattern = pattern
+        self._observed: dict[Path, tuple[tuple[int, int], int]] = {}
+        self._dispatched: dict[Path, tuple[int, int]] = {}
+
+    def poll(self) -> list[Path]:
+        observed = {}
+        ready = []
+
+        for path in sorted(self.csv_dir.glob(self.pattern)):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+
+            signature = (stat.st_size, stat.st_mtime_ns)
+            previous = self._observed.get(path)
+            count = previous[1] + 1 if previous is not None and previous[0] == signature else 1
+            observed[path] = (signature, count)
+
+            if self._dispatched.get(path) == signature:
+                continue
+            if count >= self.stable_checks and self._is_readable(path):
+                self._dispatched[path] = signature
+                ready.append(path)
+
+        # 移動・削除されたファイルの記録は捨て、同じ名前で置かれた新しいファイルも処理できるようにする
+        self._observed = observed
+        self._dispatched = {path: signature for path, signature in self._dispatched.items() if path in observed}
+        return ready
+
+    def release(self, path: Path):
+        # 処理を保留したファイルは、内容が変わっていなくても次のポーリングで再び返す
+        self._dispatched.pop(path, None)
+
+    @staticmethod
+    def _is_readable(path: Path) -> bool:
+        # 書き込み中のファイルは他のプロセスにロックされていることがある
+        try:
+            with open(path, 'rb'):
+                return True
+        except OSError as e:
+            logger.debug(f"書き込み中のため後で処理します: {path.name}: {e}")
+            return False
@@ -0,0 +1,68 @@
+import logging
+
+from playwright.sync_api import Error as PlaywrightError, TimeoutError as PlaywrightTimeoutError
+
+logger = logging.getLogger(__name__)
+
+SCRIPT_STRATEGY = 'script'
+KEYBOARD_STRATEGY = 'keyboard'
+
+# 日付ピッカーのAPIがあればそれで値を設定し、なければ値を直接書き込んでinput/changeイベントを発火する。
+# イベント処理後の値を返し、呼び出し側で受け付けられた値を照合する
+SET_DATE_SCRIPT = '''(input, value) => {
+    const win = input.ownerDocument.defaultView;
+    const $ = win.jQuery;
+    if (input._flatpickr) {
+        input._flatpickr.setDate(value, true, 'd/m/Y');
+    } else if ($ && $.fn && $.fn.datepicker && $(input).data('datepicker')) {
+        $(input).datepicker('update', value);
+    } else {
+        const setValue = Object.getOwnPropertyDescriptor(win.HTMLInputElement.prototype, 'value').set;
+        setValue.call(input, value);
+    }
+    input.dispatchEvent(new win.Event('input', { bubbles: true }));
+    input.dispatchEvent(new win.Event('change', { bubbles: true }));
+    return input.value;
+}'''
+
+
+def fill_date(locator, value: str) -> str:
+    try:
+        accepted = locator.evaluate(SET_DATE_SCRIPT, value)
+    except PlaywrightTimeoutError:
+        # 入力欄が見つからない場合はキー入力でも失敗するため、呼び出し側の別方式に任せる
+        raise
+    except PlaywrightError as e:
+        logger.debug(f"日付の直接設定に失敗しました: {e}")
+        accepted = None
+
+    if accepted == value:
+        return SCRIPT_STRATEGY
+
+    if accepted:
+        locator.clear()
+    locator.click()
+    locator.type(value, delay=100)
+    locator.press('Enter')
+    return KEYBOARD_STRATEGY
+
+
+async def fill_date_async(locator, value: str) -> str:
+    try:
+        accepted = await locator.evaluate(SET_DATE_SCRIPT, value)
+    except PlaywrightTimeoutError:
+        # 入力欄が見つからない場合はキー入力でも失敗するため、呼び出し側の別方式に任せる
+        raise
+    except PlaywrightError as e:
+        logger.debug(f"日付の直接設定に失敗しました: {e}")
+        accepted = None
+
+    if accepted == value:
+        return SCRIPT_STRATEGY
+
+    if accepted:
+        await locator.clear()
+    await locator.click()
+    await locator.type(value, delay=100)
+    await locator.press('Enter')
+    return KEYBOARD_STRATEGY
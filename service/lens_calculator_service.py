@@ -1,15 +1,115 @@
-from playwright.sync_api import Page
+import logging
+
+from playwright.sync_api import Error as PlaywrightError, FrameLocator, Page
+
+from service.rate_limiter import ACTION_CALCULATE, RateLimiter
+
+logger = logging.getLogger(__name__)
+
+CALCULATOR_FRAME = '#calculatorFrame'
+
+# 入力欄名(OrderDetail[{eye}_{field}])とデータキー({eye}_{key})の対応
+MEASUREMENT_FIELDS = (
+    ('spherical', 'sph'),
+    ('cylinder', 'cyl'),
+    ('axis', 'axis'),
+    ('acd', 'acd'),
+    ('pachy', 'pachy'),
+    ('clr', 'clr'),
+    ('k1', 'k1'),
+    ('k1_axis', 'k1_axis'),
+    ('k2', 'k2'),
+    ('sia', 'sia'),
+    ('ins', 'ins'),
+)
+
+ATA_WTW_FIELDS = (
+    ('ata', 'ata'),
+    ('casia_manual', 'casia_wtw_m'),
+    ('caliper_manual', 'caliper_wtw'),
+)
+
+# セレクタと値の対応を受け取り、iframe内で値の設定とinput/changeイベントの発火をまとめて行う。
+# 設定後に読み戻した値を返し、呼び出し側で照合する
+BULK_FILL_SCRIPT = '''(body, fields) => {
+    const doc = body.ownerDocument;
+    const win = doc.defaultView;
+    const setValue = Object.getOwnPropertyDescriptor(win.HTMLInputElement.prototype, 'value').set;
+    const readBack = {};
+    for (const [selector, value] of Object.entries(fields)) {
+        const input = doc.querySelector(selector);
+        if (!input) {
+            readBack[selector] = null;
+            continue;
+        }
+        setValue.call(input, value);
+        input.dispatchEvent(new win.Event('input', { bubbles: true }));
+        input.dispatchEvent(new win.Event('change', { bubbles: true }));
+        readBack[selector] = input.value;
+    }
+    return readBack;
+}'''
+
+MONO_LENS = 'IPCL V2.0 Mono'
+TORIC_LENS = 'IPCL V2.0 Toric'
+
+
+def eye_prefixes(eye: str) -> list[str]:
+    prefixes = []
+    if eye in ['両眼', '右眼']:
+        prefixes.append('r')
+    if eye in ['両眼', '左眼']:
+        prefixes.append('l')
+    return prefixes
+
+
+def input_selector(prefix: str, field: str) -> str:
+    return f'input[name="OrderDetail[{prefix}_{field}]"]'
+
+
+def field_values(data: dict, eye: str, fields: tuple) -> dict[str, str]:
+    return {
+        input_selector(prefix, field): data[f'{prefix}_{key}']
+        for prefix in eye_prefixes(eye)
+        for field, key in fields
+    }
+
+
+def mismatched_fields(values: dict[str, str], read_back: dict[str, str | None]) -> dict[str, str]:
+    mismatched = {
+        selector: value for selector, value in values.items() if read_back.get(selector) != value
+    }
+    if mismatched:
+        logger.info(f"一括入力で{len(values)}件中{len(mismatched)}件の値が一致しなかったため個別に入力します")
+    return mismatched
+
+
+def lens_type_for(cylinder: str) -> str:
+    return MONO_LENS if float(cylinder) == 0 else TORIC_LENS
+
+
+def record_lens_type(data: dict, prefix: str) -> str:
+    # 検証済みのレコードは事前に求めたレンズタイプを使う
+    return data.get(f'{prefix}_lens_type') or lens_type_for(data[f'{prefix}_cyl'])
+
+
+def lens_type_selector(prefix: str, lens_type: str) -> str:
+    return f'input[name="OrderDetail[ipcl_{prefix}]"][value="{lens_type}"]'
 
 
 class LensCalculatorService:
+    def __init__(self, bulk_fill: bool = False, rate_limiter: RateLimiter | None = None):
+        self.bulk_fill = bulk_fill
+        self.rate_limiter = rate_limiter
+
     @staticmethod
     def open_lens_calculator(page: Page):
         page.click('button:has-text("レンズ計算・注文")')
-        page.frame_locator('#calculatorFrame').locator('body').wait_for(state='visible')
+        page.frame_locator(CALCULATOR_FRAME).locator('body').wait_for(state='visible')
 
     @staticmethod
     def select_eye_tab(page: Page, eye: str):
-        frame = page.frame_locator('#calculatorFrame')
+        frame = page.frame_locator(CALCULATOR_FRAME)
 
         if eye == '両眼':
             frame.locator('a:has-text("両眼")').click()
@@ -21,73 +121,40 @@ class LensCalculatorService:
         elif eye == '左眼':
             frame.locator('a:has-text("左眼")').click()
 
-    @staticmethod
-    def fill_measurement_data(page: Page, data: dict, eye: str):
-        frame = page.frame_locator('#calculatorFrame')
-
-        if eye in ['両眼', '右眼']:
-            # 右眼データ
-            frame.locator('input[name="OrderDetail[r_spherical]"]').fill(data['r_sph'])
-            frame.locator('input[name="OrderDetail[r_cylinder]"]').fill(data['r_cyl'])
-            frame.locator('input[name="OrderDetail[r_axis]"]').fill(data['r_axis'])
-            frame.locator('input[name="OrderDetail[r_acd]"]').fill(data['r_acd'])
-            frame.locator('input[name="OrderDetail[r_pachy]"]').fill(data['r_pachy'])
-            frame.locator('input[name="OrderDetail[r_clr]"]').fill(data['r_clr'])
-            frame.locator('input[name="OrderDetail[r_k1]"]').fill(data['r_k1'])
-            frame.locator('input[name="OrderDetail[r_k1_axis]"]').fill(data['r_k1_axis'])
-            frame.locator('input[name="OrderDetail[r_k2]"]').fill(data['r_k2'])
-            frame.locator('input[name="OrderDetail[r_sia]"]').fill(data['r_sia'])
-            frame.locator('input[name="OrderDetail[r_ins]"]').fill(data['r_ins'])
-
-        if eye in ['両眼', '左眼']:
-            # 左眼データ
-            frame.locator('input[name="OrderDetail[l_spherical]"]').fill(data['l_sph'])
-            frame.locator('input[name="OrderDetail[l_cylinder]"]').fill(data['l_cyl'])
-            frame.locator('input[name="OrderDetail[l_axis]"]').fill(data['l_axis'])
-            frame.locator('input[name="OrderDetail[l_acd]"]').fill(data['l_acd'])
-            frame.locator('input[name="OrderDetail[l_pachy]"]').fill(data['l_pachy'])
-            frame.locator('input[name="OrderDetail[l_clr]"]').fill(data['l_clr'])
-            frame.locator('input[name="OrderDetail[l_k1]"]').fill(data['l_k1'])
-            frame.locator('input[name="OrderDetail[l_k1_axis]"]').fill(data['l_k1_axis'])
-            frame.locator('input[name="OrderDetail[l_k2]"]').fill(data['l_k2'])
-            frame.locator('input[name="OrderDetail[l_sia]"]').fill(data['l_sia'])
-            frame.locator('input[name="OrderDetail[l_ins]"]').fill(data['l_ins'])
+    def fill_measurement_data(self, page: Page, data: dict, eye: str):
+        self._fill_fields(page, field_values(data, eye, MEASUREMENT_FIELDS))
 
     @staticmethod
     def select_lens_type(page: Page, data: dict, eye: str):
-        frame = page.frame_locator('#calculatorFrame')
-
-        if eye in ['両眼', '右眼']:
-            r_cyl = float(data['r_cyl'])
-            if r_cyl == 0:
-                frame.locator('input[name="OrderDetail[ipcl_r]"][value="IPCL V2.0 Mono"]').check()
-            else:
-                frame.locator('input[name="OrderDetail[ipcl_r]"][value="IPCL V2.0 Toric"]').check()
-
-        if eye in ['両眼', '左眼']:
-            l_cyl = float(data['l_cyl'])
-            if l_cyl == 0:
-                frame.locator('input[name="OrderDetail[ipcl_l]"][value="IPCL V2.0 Mono"]').check()
-            else:
-                frame.locator('input[name="OrderDetail[ipcl_l]"][value="IPCL V2.0 Toric"]').check()
+        frame = page.frame_locator(CALCULATOR_FRAME)
 
-    @staticmethod
-    def fill_ata_wtw_data(page: Page, data: dict, eye: str):
-        frame = page.frame_locator('#calculatorFrame')
+        for prefix in eye_prefixes(eye):
+            lens_type = record_lens_type(data, prefix)
+            frame.locator(lens_type_selector(prefix, lens_type)).check()
 
-        if eye in ['両眼', '右眼']:
-            # 右眼のATA/WTWデータ
-            frame.locator('input[name="OrderDetail[r_ata]"]').fill(data['r_ata'])
-            frame.locator('input[name="OrderDetail[r_casia_manual]"]').fill(data['r_casia_wtw_m'])
-            frame.locator('input[name="OrderDetail[r_caliper_manual]"]').fill(data['r_caliper_wtw'])
+    def fill_ata_wtw_data(self, page: Page, data: dict, eye: str):
+        self._fill_fields(page, field_values(data, eye, ATA_WTW_FIELDS))
 
-        if eye in ['両眼', '左眼']:
-            # 左眼のATA/WTWデータ
-            frame.locator('input[name="OrderDetail[l_ata]"]').fill(data['l_ata'])
-            frame.locator('input[name="OrderDetail[l_casia_manual]"]').fill(data['l_casia_wtw_m'])
-            frame.locator('input[name="OrderDetail[l_caliper_manual]"]').fill(data['l_caliper_wtw'])
+    def _fill_fields(self, page: Page, values: dict[str, str]):
+        frame = page.frame_locator(CALCULATOR_FRAME)
+
+        if self.bulk_fill:
+            values = self._bulk_fill(frame, values)
+
+        for selector, value in values.items():
+            frame.locator(selector).fill(value)
 
     @staticmethod
-    def click_calculate_button(page: Page):
-        frame = page.frame_locator('#calculatorFrame')
+    def _bulk_fill(frame: FrameLocator, values: dict[str, str]) -> dict[str, str]:
+        try:
+            read_back = frame.locator('body').evaluate(BULK_FILL_SCRIPT, values)
+        except PlaywrightError as e:
+            logger.warning(f"一括入力に失敗したため個別に入力します: {e}")
+            return values
+        return mismatched_fields(values, read_back)
+
+    def click_calculate_button(self, page: Page):
+        if self.rate_limiter is not None:
+            self.rate_limiter.wait(ACTION_CALCULATE)
+        frame = page.frame_locator(CALCULATOR_FRAME)
         frame.locator('button#btn-calculate').click()
@@ -0,0 +1,150 @@
+from dataclasses import dataclass
+from operator import itemgetter
+from typing import Any, Mapping, NamedTuple
+
+# 患者情報の属性名とCSV列名の対応
+PATIENT_COLUMNS = (
+    ('name', 'name'),
+    ('id', 'ID'),
+    ('sex', 'sex'),
+    ('birthday', 'birthday'),
+    ('surgery_date', 'surgerydate'),
+    ('eye', 'eye'),
+)
+
+# 片眼分の属性名とCSV列名(R_/L_ を除いた部分)の対応
+EYE_COLUMNS = (
+    ('sph', 'SPH'),
+    ('cyl', 'Cyl'),
+    ('axis', 'Axis'),
+    ('acd', 'ACD'),
+    ('pachy', 'Pachy(CCT)'),
+    ('clr', 'CLR'),
+    ('k1', 'K1(Kf)'),
+    ('k1_axis', 'K1Axis'),
+    ('k2', 'K2(Kf)'),
+    ('sia', 'SIA'),
+    ('ins', 'Ins'),
+    ('ata', '\tATA'),
+    ('casia_wtw_m', 'CASIA_WTW_M'),
+    ('caliper_wtw', 'Caliper_WTW'),
+)
+
+EYE_PREFIXES = {'r': 'R_', 'l': 'L_'}
+
+# 従来の辞書形式と同じ順序のキー
+RECORD_KEYS = (
+    *(name for name, _ in PATIENT_COLUMNS),
+    *(f'{prefix}_{name}' for prefix in EYE_PREFIXES for name, _ in EYE_COLUMNS[:11]),
+    *(f'{prefix}_{name}' for prefix in EYE_PREFIXES for name, _ in EYE_COLUMNS[11:]),
+)
+RECORD_KEY_SET = frozenset(RECORD_KEYS)
+LENS_TYPE_KEYS = frozenset(f'{prefix}_lens_type' for prefix in EYE_PREFIXES)
+PATIENT_FIELD_NAMES = frozenset(name for name, _ in PATIENT_COLUMNS)
+
+
+# 片眼分の測定値。__slots__ = () のタプルなので、1行ごとの生成が軽く変更もできない
+class EyeMeasurements(NamedTuple):
+    sph: str
+    cyl: str
+    axis: str
+    acd: str
+    pachy: str
+    clr: str
+    k1: str
+    k1_axis: str
+    k2: str
+    sia: str
+    ins: str
+    ata: str
+    casia_wtw_m: str
+    caliper_wtw: str
+
+
+EYE_FIELD_NAMES = frozenset(EyeMeasurements._fields)
+
+
+class HeaderIndex:
+    # ファイルごとに1回だけ求める、各属性に対応する列の取り出し方
+    __slots__ = ('patient', 'right', 'left', 'width')
+
+    def __init__(self, header: list[str]):
+        positions = {column: i for i, column in enumerate(header)}
+
+        def getter(columns) -> itemgetter:
+            try:
+                return itemgetter(*(positions[column] for column in columns))
+            except KeyError as e:
+                raise KeyError(f"CSVに必要な列がありません: {e.args[0]!r}") from None
+
+        self.patient = getter(column for _, column in PATIENT_COLUMNS)
+        self.right = getter(f"{EYE_PREFIXES['r']}{column}" for _, column in EYE_COLUMNS)
+        self.left = getter(f"{EYE_PREFIXES['l']}{column}" for _, column in EYE_COLUMNS)
+        self.width = len(header)
+
+
+@dataclass(frozen=True, slots=True)
+class PatientRecord:
+    name: str
+    id: str
+    sex: str
+    birthday: str
+    surgery_date: str
+    eye: str
+    right: EyeMeasurements
+    left: EyeMeasurements
+    # 検証時に求めたレンズタイプ。未検証のレコードでは空文字
+    right_lens_type: str = ''
+    left_lens_type: str = ''
+
+    @classmethod
+    def from_row(cls, row: list[str], index: HeaderIndex) -> 'PatientRecord':
+        if len(row) < index.width:
+            row = row + [''] * (index.width - len(row))
+        return cls(
+            *index.patient(row),
+            EyeMeasurements._make(index.right(row)),
+            EyeMeasurements._make(index.left(row)),
+        )
+
+    @classmethod
+    def from_mapping(cls, data: Mapping[str, str]) -> 'PatientRecord':
+        return cls(
+            *(data.get(name, '') for name, _ in PATIENT_COLUMNS),
+            *(
+                EyeMeasurements._make(data.get(f'{prefix}_{name}', '') for name in EyeMeasurements._fields)
+                for prefix in EYE_PREFIXES
+            ),
+        )
+
+    def measurements(self, prefix: str) -> EyeMeasurements:
+        return self.right if prefix == 'r' else self.left
+
+    def lens_type(self, prefix: str) -> str:
+        return self.right_lens_type if prefix == 'r' else self.left_lens_type
+
+    # 移行期間中は従来の辞書と同じキー(r_sph など)でも参照できるようにする
+    def __getitem__(self, key: str) -> str:
+        prefix, _, name = key.partition('_')
+        if prefix in EYE_PREFIXES and name in EYE_FIELD_NAMES:
+            return getattr(self.measurements(prefix), name)
+        if prefix in EYE_PREFIXES and name == 'lens_type':
+            return self.lens_type(prefix)
+        if key in PATIENT_FIELD_NAMES:
+            return getattr(self, key)
+        raise KeyError(key)
+
+    def __contains__(self, key: object) -> bool:
+        return key in RECORD_KEY_SET or key in LENS_TYPE_KEYS
+
+    def get(self, key: str, default: Any = None) -> Any:
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def keys(self) -> tuple[str, ...]:
+        return RECORD_KEYS
+
+    def to_dict(self) -> dict[str, str]:
+        return {key: self[key] for key in RECORD_KEYS}
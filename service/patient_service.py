@@ -2,47 +2,54 @@ import logging
 
 from playwright.sync_api import Page
 
+from service.date_input import fill_date
+from service.readiness import ORDER_FORM_READY
+from service.strategy_registry import StrategyRegistry
+
 logger = logging.getLogger(__name__)
 
+SEX_FIELD = 'sex'
+SURGERY_DATE_FIELD = 'surgery_date'
+
 
 class PatientService:
-    @staticmethod
-    def fill_patient_info(page: Page, data: dict):
-        page.wait_for_load_state('networkidle')
+    def __init__(self, strategy_registry: StrategyRegistry | None = None):
+        self.strategy_registry = strategy_registry or StrategyRegistry()
+
+    def fill_patient_info(self, page: Page, data: dict):
+        ORDER_FORM_READY.wait(page)
 
         page.get_by_label("患者ID").fill(data['id'])
 
         try:
-            page.locator('#select2-order-sex-container').click()
-            page.locator('li.select2-results__option').first.wait_for(state='visible')
-            sex_index = 0 if data['sex'] == '男性' else 1
-            page.locator('li.select2-results__option').nth(sex_index).click()
-        except Exception as e:
-            try:
-                page.get_by_label("性別*").click()
-                page.click(f'li:has-text("{data["sex"]}")')
-            except Exception as retry_error:
-                logger.warning("性別選択をスキップしました")
+            self.strategy_registry.run(SEX_FIELD, {
+                'select2': lambda: PatientService._select_sex_with_select2(page, data['sex']),
+                'label': lambda: PatientService._select_sex_with_label(page, data['sex']),
+            })
+        except Exception:
+            logger.warning("性別選択をスキップしました")
 
+        surgery_date_formatted = PatientService._convert_date_format(data['surgery_date'])
         try:
-            surgery_date_formatted = PatientService._convert_date_format(data['surgery_date'])
-            surgery_date_input = page.get_by_label("手術日")
-            surgery_date_input.click()
-            surgery_date_input.type(surgery_date_formatted, delay=100)
-            logger.info(f"手術日を入力しました: {surgery_date_formatted}")
-            surgery_date_input.press('Enter')
-
+            _, strategy = self.strategy_registry.run(SURGERY_DATE_FIELD, {
+                'label': lambda: fill_date(page.get_by_label("手術日"), surgery_date_formatted),
+                'name': lambda: fill_date(page.locator('input[name*="surgery"]').first, surgery_date_formatted),
+            })
+            logger.info(f"手術日を入力しました: {surgery_date_formatted} (入力方式: {strategy})")
         except Exception as e:
-            try:
-                surgery_date_formatted = PatientService._convert_date_format(data['surgery_date'])
-                surgery_date_input = page.locator('input[name*="surgery"]').first
-                surgery_date_input.click()
-                surgery_date_input.type(surgery_date_formatted, delay=100)
-                surgery_date_input.press('Enter')
-                logger.info(f"手術日を入力しました: {surgery_date_formatted}")
+            logger.warning(f"手術日入力をスキップしました: {e}")
+
+    @staticmethod
+    def _select_sex_with_select2(page: Page, sex: str):
+        page.locator('#select2-order-sex-container').click()
+        page.locator('li.select2-results__option').first.wait_for(state='visible')
+        sex_index = 0 if sex == '男性' else 1
+        page.locator('li.select2-results__option').nth(sex_index).click()
 
-            except Exception as retry_error:
-                logger.warning(f"手術日入力をスキップしました: {retry_error}")
+    @staticmethod
+    def _select_sex_with_label(page: Page, sex: str):
+        page.get_by_label("性別*").click()
+        page.click(f'li:has-text("{sex}")')
 
     @staticmethod
     def fill_birthday(page: Page, birthday: str):
@@ -51,10 +58,8 @@ class PatientService:
         try:
             birthday_formatted = PatientService._convert_date_format(birthday)
             birthday_input = frame.locator('input[placeholder="dd/mm/yyyy"]').first
-            birthday_input.click()
-            birthday_input.type(birthday_formatted, delay=100)
-            birthday_input.press('Enter')
-            logger.info(f"誕生日を入力しました: {birthday_formatted}")
+            strategy = fill_date(birthday_input, birthday_formatted)
+            logger.info(f"誕生日を入力しました: {birthday_formatted} (入力方式: {strategy})")
 
         except Exception as e:
             logger.error(f"誕生日入力中にエラーが発生: {e}", exc_info=True)
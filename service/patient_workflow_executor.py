@@ -1,12 +1,20 @@
 import logging
+import time
 from pathlib import Path
+from typing import Any, Callable
 
-from playwright.sync_api import Page
+from playwright.sync_api import Error as PlaywrightError, Page, TimeoutError as PlaywrightTimeoutError
 
 from service.auth_service import AuthService
+from service.browser_manager import BrowserManager
+from service.circuit_breaker import CircuitOpenError
+from service.concurrency_controller import CONGESTION_TIMEOUT, watch_server_errors
 from service.lens_calculator_service import LensCalculatorService
 from service.patient_service import PatientService
-from service.save_service import SaveService
+from service.save_service import SaveService, discard_pdf
+from service.record_journal import RecordJournal
+from service.step_timer import RecordTimer, step_timings
+from service.workflow_steps import RetryDecision, RetryPolicy, WorkflowState, step_message
 from widgets.progress_window import ProgressWindow
 
 logger = logging.getLogger(__name__)
@@ -21,6 +29,8 @@ class PatientWorkflowExecutor:
         save_service: SaveService,
         progress_window: ProgressWindow,
         timeout: int = 5000,
+        record_journal: RecordJournal | None = None,
+        retry_policies: dict[str, RetryPolicy] | None = None,
     ):
         self.auth_service = auth_service
         self.patient_service = patient_service
@@ -28,47 +38,98 @@ class PatientWorkflowExecutor:
         self.save_service = save_service
         self.progress_window = progress_window
         self.timeout = timeout
+        self.record_journal = record_journal
+        self.retry_policies = retry_policies
 
-    def execute(self, page: Page, idx: int, total: int, data: dict) -> tuple[bool, Path | None]:
-        pdf_path = None
-        page.set_default_timeout(self.timeout)
+    def execute_in_new_context(self, browser_manager: BrowserManager, idx: int, total: int, data: dict) -> bool:
+        context = None
 
         try:
-            self.progress_window.update(f"[{idx}/{total}] Webサイトにログイン中...")
-            self.auth_service.login(page)
-
-            self.progress_window.update(f"[{idx}/{total}] 患者情報を入力中...")
-            self.patient_service.fill_patient_info(page, data)
-
-            self.progress_window.update(f"[{idx}/{total}] レンズ計算・注文を開いています...")
-            self.lens_calculator_service.open_lens_calculator(page)
-
-            self.progress_window.update(f"[{idx}/{total}] {data['eye']}タブを選択中...")
-            self.lens_calculator_service.select_eye_tab(page, data['eye'])
-
-            self.progress_window.update(f"[{idx}/{total}] 誕生日を入力中...")
-            self.patient_service.fill_birthday(page, data['birthday'])
-
-            self.progress_window.update(f"[{idx}/{total}] 測定データを入力中...")
-            self.lens_calculator_service.fill_measurement_data(page, data, data['eye'])
-
-            self.progress_window.update(f"[{idx}/{total}] レンズタイプを選択中...")
-            self.lens_calculator_service.select_lens_type(page, data, data['eye'])
+            # 接続先が落ちている間は、ブラウザやコンテキストを用意する前に失敗させる
+            if self.auth_service.circuit_breaker is not None:
+                self.auth_service.circuit_breaker.check()
+            context = browser_manager.new_context(self.auth_service.storage_state)
+            page = browser_manager.create_page(context)
+            save_success, _ = self.execute(page, idx, total, data)
+            return save_success
+
+        except CircuitOpenError as e:
+            self._report_circuit_open(idx, total, e)
+            return False
+
+        finally:
+            if context is not None:
+                try:
+                    context.close()
+                except PlaywrightError as e:
+                    logger.warning(f"ブラウザコンテキストの終了中にエラーが発生しました: {e}")
+
+    def _step_actions(self, data: dict) -> dict[str, Callable[[Page], Any]]:
+        eye = data['eye']
+        return {
+            'login': self.auth_service.ensure_logged_in,
+            'patient_info': lambda page: self.patient_service.fill_patient_info(page, data),
+            'open_calculator': self.lens_calculator_service.open_lens_calculator,
+            'eye_tab': lambda page: self.lens_calculator_service.select_eye_tab(page, eye),
+            'birthday': lambda page: self.patient_service.fill_birthday(page, data['birthday']),
+            'measurements': lambda page: self.lens_calculator_service.fill_measurement_data(page, data, eye),
+            'lens_type': lambda page: self.lens_calculator_service.select_lens_type(page, data, eye),
+            'ata_wtw': lambda page: self.lens_calculator_service.fill_ata_wtw_data(page, data, eye),
+            'calculate': self.lens_calculator_service.click_calculate_button,
+            'save_pdf': lambda page: self.save_service.click_save_pdf_button(page, data['id'], data['name']),
+            'save_input': self.save_service.save_input,
+            'save_draft': self.save_service.save_draft,
+        }
+
+    def _report_retry(self, idx: int, total: int, name: str, retry: RetryDecision, error: Exception):
+        resume = "ページを開き直して" if retry.renavigate else ""
+        message = f"[{idx}/{total}] {name}でエラーが発生したため{resume}再試行します ({retry.attempt}/{retry.attempts}回目): {error}"
+        logger.warning(message)
+        self.progress_window.update(message)
+
+    def _report_circuit_open(self, idx: int, total: int, error: CircuitOpenError):
+        # 接続先の障害による失敗はレコードの問題ではないため、スタックトレースは出さない
+        message = f"[{idx}/{total}] {error}"
+        logger.warning(message)
+        self.progress_window.update(f"[ERROR] {message}")
 
-            self.progress_window.update(f"[{idx}/{total}] ATA/WTWデータを入力中...")
-            self.lens_calculator_service.fill_ata_wtw_data(page, data, data['eye'])
-
-            self.progress_window.update(f"[{idx}/{total}] レンズ計算を実行中...")
-            self.lens_calculator_service.click_calculate_button(page)
-
-            self.progress_window.update(f"[{idx}/{total}] 計算結果のPDFファイルを保存中...")
-            pdf_path = self.save_service.click_save_pdf_button(page, data['id'], data['name'])
+    def execute(self, page: Page, idx: int, total: int, data: dict) -> tuple[bool, Path | None]:
+        pdf_path = None
+        save_success = False
+        timer = RecordTimer()
+        page.set_default_timeout(self.timeout)
+        watch_server_errors(page, timer)
 
-            self.progress_window.update(f"[{idx}/{total}] 入力したデータを保存中...")
-            self.save_service.save_input(page)
+        state = WorkflowState(self.retry_policies)
 
-            self.progress_window.update(f"[{idx}/{total}] 下書き保存中...")
-            save_success = self.save_service.save_draft(page)
+        try:
+            actions = self._step_actions(data)
+            while not state.finished:
+                name = state.current_step
+                self.progress_window.update(f"[{idx}/{total}] {step_message(name, data)}")
+                try:
+                    with timer.span(name):
+                        result = actions[name](page)
+                except Exception as e:
+                    if isinstance(e, PlaywrightTimeoutError):
+                        timer.congestion = CONGESTION_TIMEOUT
+                    retry = state.fail(e)
+                    if retry is None:
+                        raise
+                    timer.record_retry(name, retry.attempt, e, retry.renavigate)
+                    self._report_retry(idx, total, name, retry, e)
+                    if retry.renavigate and pdf_path:
+                        # 開き直した後に保存し直すため、1レコードにつきPDFが1つだけ残るようにする
+                        discard_pdf(pdf_path)
+                        pdf_path = None
+                    time.sleep(retry.delay)
+                    continue
+
+                if name == 'save_pdf':
+                    pdf_path = result
+                elif name == 'save_draft':
+                    save_success = result
+                state.advance()
 
             if save_success:
                 self.progress_window.update(f"[{idx}/{total}] 注文の下書きが保存されました")
@@ -79,7 +140,13 @@ class PatientWorkflowExecutor:
 
             return save_success, pdf_path
 
+        except CircuitOpenError as e:
+            self._report_circuit_open(idx, total, e)
+            return False, None
+
         except Exception as e:
+            if isinstance(e, PlaywrightTimeoutError):
+                timer.congestion = CONGESTION_TIMEOUT
             error_msg = f"[{idx}/{total}] 処理中にエラーが発生しました: {e}"
             logger.exception(error_msg)
             self.progress_window.update(f"[ERROR] {error_msg}")
@@ -87,3 +154,8 @@ class PatientWorkflowExecutor:
                 f"エラー発生時の患者情報 - ID: {data.get('id')}, 名前: {data.get('name')}, 眼: {data.get('eye')}"
             )
             return False, None
+
+        finally:
+            step_timings.add(data, timer, save_success)
+            if self.record_journal is not None:
+                self.record_journal.record(data, save_success, pdf_path)
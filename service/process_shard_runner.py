@@ -0,0 +1,294 @@
+import logging
+import logging.handlers
+import multiprocessing
+import queue
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable
+
+from service.asset_cache import AssetCache
+from service.auth_service import AuthService
+from service.browser_manager import BrowserManager
+from service.circuit_breaker import CircuitBreaker
+from service.concurrency_controller import ConcurrencyController
+from service.lens_calculator_service import LensCalculatorService
+from service.patient_service import PatientService
+from service.patient_workflow_executor import PatientWorkflowExecutor
+from service.rate_limiter import RateLimiter
+from service.readiness import probe_latency
+from service.record_journal import RecordJournal
+from service.resource_blocker import ResourceBlocker
+from service.save_service import SaveService
+from service.step_timer import step_timings
+from service.strategy_registry import StrategyRegistry
+from utils.config_manager import load_config
+
+logger = logging.getLogger(__name__)
+
+MAX_RESPAWNS_PER_WORKER = 3
+
+
+@dataclass(frozen=True)
+class ShardSettings:
+    base_url: str
+    email: str | None
+    password: str | None
+    headless: bool
+    timeout: int
+    pdf_dir: Path
+    calculated_dir: Path
+    log_level: int = logging.INFO
+
+
+class QueueProgress:
+    # ワーカープロセス内でProgressWindowの代わりに使い、進捗を親プロセスへ送る
+    def __init__(self, events):
+        self._events = events
+
+    def update(self, message: str):
+        self._events.put(('progress', message))
+
+
+def _configure_worker_logging(log_queue, log_level: int):
+    root = logging.getLogger()
+    root.handlers = [logging.handlers.QueueHandler(log_queue)]
+    root.setLevel(log_level)
+
+
+def _worker_main(
+    worker_id: int,
+    settings: ShardSettings,
+    jobs,
+    events,
+    log_queue,
+    rate_limiter: RateLimiter | None = None,
+    circuit_breaker: CircuitBreaker | None = None,
+):
+    _configure_worker_logging(log_queue, settings.log_level)
+
+    config = load_config()
+    progress = QueueProgress(events)
+    record_journal = RecordJournal.from_config(config)
+    workflow_executor = PatientWorkflowExecutor(
+        AuthService(settings.base_url, settings.email, settings.password, rate_limiter, circuit_breaker),
+        PatientService(StrategyRegistry.from_config(config)),
+        LensCalculatorService(config.getboolean('Settings', 'bulk_fill', fallback=False), rate_limiter),
+        SaveService(settings.pdf_dir, settings.calculated_dir, rate_limiter),
+        progress,
+        settings.timeout,
+        record_journal,
+    )
+    resource_blocker = ResourceBlocker.from_config(config)
+    asset_cache = AssetCache.from_config(config)
+    browser_manager = BrowserManager(settings.headless, resource_blocker, asset_cache)
+
+    try:
+        while True:
+            job = jobs.get()
+            if job is None:
+                break
+
+            batch, position, idx, total, data = job
+            events.put(('started', batch, position, worker_id))
+            logger.info(f"[ワーカー{worker_id}] [{idx}/{total}件目を処理中…] 患者ID: {data['id']}")
+            try:
+                success = workflow_executor.execute_in_new_context(browser_manager, idx, total, data)
+            except Exception as e:
+                logger.exception(f"[ワーカー{worker_id}] エラーが発生しました: {e}")
+                progress.update(f"[ERROR] エラーが発生しました: {e}")
+                success = False
+            # 所要時間は親プロセスでまとめて集計する
+            timings = step_timings.drain()
+            if timings:
+                events.put(('timings', timings))
+            events.put(('result', batch, position, success))
+    finally:
+        browser_manager.stop()
+        if resource_blocker is not None:
+            resource_blocker.log_summary()
+        if asset_cache is not None:
+            asset_cache.close()
+            asset_cache.log_summary()
+        probe_latency.log_summary()
+        if rate_limiter is not None:
+            rate_limiter.log_summary()
+        if circuit_breaker is not None:
+            circuit_breaker.log_summary()
+        if record_journal is not None:
+            record_journal.close()
+
+
+class ProcessShardRunner:
+    # レコードを複数のワーカープロセスに振り分けて処理する。
+    # 各プロセスは専用のPlaywrightドライバとブラウザを持ち、
+    # 進捗と結果はキュー経由で親プロセスに集約する
+    def __init__(
+        self,
+        workers: int,
+        settings: ShardSettings,
+        limiter: ConcurrencyController | None = None,
+        rate_limiter: RateLimiter | None = None,
+        circuit_breaker: CircuitBreaker | None = None,
+    ):
+        self.workers = max(1, workers)
+        self.settings = settings
+        self.limiter = limiter
+        # レート制限のバケットは共有メモリ上にあり、すべてのワーカープロセスで同じものを使う
+        self.rate_limiter = rate_limiter
+        # 接続の遮断状態も共有し、1つのプロセスで検出した障害で他のプロセスも止める
+        self.circuit_breaker = circuit_breaker
+        self._context = multiprocessing.get_context('spawn')
+        self._jobs = None
+        self._events = None
+        self._log_queue = None
+        self._log_listener = None
+        self._processes: dict[int, multiprocessing.Process] = {}
+        self._batch = 0
+        self._consecutive_crashes = 0
+
+    @property
+    def is_running(self) -> bool:
+        return bool(self._processes)
+
+    def start(self):
+        if self._processes:
+            return
+
+        if self._log_listener is None:
+            self._jobs = self._context.Queue()
+            self._events = self._context.Queue()
+            self._log_queue = self._context.Queue()
+            self._log_listener = logging.handlers.QueueListener(
+                self._log_queue, *logging.getLogger().handlers, respect_handler_level=True
+            )
+            self._log_listener.start()
+
+        for worker_id in range(1, self.workers + 1):
+            self._spawn_worker(worker_id)
+        logger.info(f"{self.workers}個のワーカープロセスで処理を開始します")
+
+    def _spawn_worker(self, worker_id: int):
+        process = self._context.Process(
+            target=_worker_main,
+            args=(
+                worker_id,
+                self.settings,
+                self._jobs,
+                self._events,
+                self._log_queue,
+                self.rate_limiter,
+                self.circuit_breaker,
+            ),
+            name=f"RecordShard-{worker_id}",
+            daemon=True,
+        )
+        process.start()
+        self._processes[worker_id] = process
+
+    def stop(self):
+        for _ in self._processes:
+            self._jobs.put(None)
+        for process in self._processes.values():
+            process.join(timeout=30)
+            if process.is_alive():
+                logger.warning(f"ワーカープロセスが終了しないため強制終了します: {process.name}")
+                process.terminate()
+        self._processes = {}
+
+        if self._log_listener is not None:
+            self._log_listener.stop()
+            self._log_listener = None
+
+    def map(
+        self,
+        jobs: list,
+        on_progress: Callable[[str], None] | None = None,
+        on_result: Callable[[int, bool], None] | None = None,
+    ) -> list[bool]:
+        if not self._processes:
+            self.start()
+
+        self._batch += 1
+        self._consecutive_crashes = 0
+
+        outcomes = [False] * len(jobs)
+        pending = set(range(len(jobs)))
+        in_flight: dict[int, int] = {}
+        # 同時実行数を制限している場合は、枠を確保できた分だけジョブをキューに入れる
+        submitted = 0
+        holding: set[int] = set()
+
+        try:
+            while pending:
+                for position in holding - pending:
+                    holding.discard(position)
+                    self.limiter.release()
+                while submitted < len(jobs) and (self.limiter is None or self.limiter.try_acquire()):
+                    idx, total, data = jobs[submitted]
+                    self._jobs.put((self._batch, submitted, idx, total, data))
+                    if self.limiter is not None:
+                        holding.add(submitted)
+                    submitted += 1
+
+                try:
+                    event = self._events.get(timeout=0.5)
+                except queue.Empty:
+                    if not self._recover_crashed_workers(in_flight, pending, on_progress):
+                        self._discard_queued_jobs()
+                        break
+                    continue
+
+                kind = event[0]
+                if kind == 'progress':
+                    if on_progress:
+                        on_progress(event[1])
+                    continue
+                if kind == 'timings':
+                    step_timings.extend(event[1])
+                    continue
+
+                batch, position = event[1], event[2]
+                if batch != self._batch:
+                    continue
+                if kind == 'started':
+                    in_flight[event[3]] = position
+                elif kind == 'result':
+                    outcomes[position] = event[3]
+                    pending.discard(position)
+                    in_flight = {w: p for w, p in in_flight.items() if p != position}
+                    self._consecutive_crashes = 0
+                    if on_result:
+                        on_result(position, event[3])
+        finally:
+            for _ in holding:
+                self.limiter.release()
+
+        return outcomes
+
+    def _recover_crashed_workers(self, in_flight: dict[int, int], pending: set[int], on_progress) -> bool:
+        # クラッシュしたワーカーが処理中だったレコードは失敗扱いにし、代わりのワーカーを起動する
+        for worker_id, process in list(self._processes.items()):
+            if process.is_alive():
+                continue
+
+            logger.error(f"ワーカープロセスが異常終了しました: {process.name} (exitcode={process.exitcode})")
+            if worker_id in in_flight:
+                position = in_flight.pop(worker_id)
+                pending.discard(position)
+                if on_progress:
+                    on_progress(f"[ERROR] ワーカープロセスが異常終了しました ({position + 1}件目)")
+
+            self._consecutive_crashes += 1
+            if self._consecutive_crashes > self.workers * MAX_RESPAWNS_PER_WORKER:
+                logger.error("ワーカープロセスの起動に繰り返し失敗したため、残りのレコードを失敗として扱います")
+                del self._processes[worker_id]
+                return False
+            self._spawn_worker(worker_id)
+        return True
+
+    def _discard_queued_jobs(self):
+        while True:
+            try:
+                self._jobs.get_nowait()
+            except queue.Empty:
+                return
@@ -0,0 +1,120 @@
+import asyncio
+import configparser
+import logging
+import threading
+import time
+
+from service.step_timer import record_rate_limit_wait
+
+logger = logging.getLogger(__name__)
+
+ACTION_LOGIN = 'login'
+ACTION_CALCULATE = 'calculate'
+ACTION_SAVE_DRAFT = 'save_draft'
+RATE_LIMITED_ACTIONS = (ACTION_LOGIN, ACTION_CALCULATE, ACTION_SAVE_DRAFT)
+
+ACTION_LABELS = {
+    ACTION_LOGIN: 'ログイン',
+    ACTION_CALCULATE: 'レンズ計算',
+    ACTION_SAVE_DRAFT: '下書き保存',
+}
+
+
+class TokenBucket:
+    # 1分あたりper_minute回、連続してburst回まで実行できるトークンバケット。
+    # トークンがないときは先着順に次のトークンを予約し、呼び出し側はその時刻まで待つ
+    def __init__(self, per_minute: float, burst: int = 1, state=None, lock=None):
+        self.rate = per_minute / 60
+        self.capacity = max(1, burst)
+        # [トークン残量, 最終更新時刻(エポック秒)]。予約分だけ残量は負になる。
+        # プロセス間で共有する場合はmultiprocessingの共有配列とロックを渡す
+        self._state = state if state is not None else [float(self.capacity), time.time()]
+        self._lock = lock if lock is not None else threading.Lock()
+
+    @classmethod
+    def shared(cls, context, per_minute: float, burst: int = 1) -> 'TokenBucket':
+        state = context.Array('d', [float(max(1, burst)), time.time()], lock=False)
+        return cls(per_minute, burst, state, context.Lock())
+
+    def reserve(self) -> float:
+        # トークンを1つ予約し、使えるようになるまでの秒数を返す
+        with self._lock:
+            now = time.time()
+            elapsed = max(0.0, now - self._state[1])
+            tokens = min(float(self.capacity), self._state[0] + elapsed * self.rate) - 1
+            self._state[0] = tokens
+            self._state[1] = now
+        return 0.0 if tokens >= 0 else -tokens / self.rate
+
+
+class RateLimiter:
+    # 接続先への操作の回数を操作ごとのトークンバケットで制限する。
+    # 上限に達した場合は失敗させずに待たせ、待機時間を記録する
+    def __init__(self, buckets: dict[str, TokenBucket]):
+        self.buckets = buckets
+        self._stats_lock = threading.Lock()
+        # 操作ごとの[実行回数, 待機した回数, 待機時間の合計, 最大]
+        self._stats: dict[str, list] = {}
+
+    @classmethod
+    def from_config(cls, config: configparser.ConfigParser, context=None) -> 'RateLimiter | None':
+        # contextにmultiprocessingのコンテキストを渡すと、ワーカープロセスと共有できるバケットを作る
+        burst = config.getint('RateLimit', 'burst', fallback=1)
+        buckets = {}
+        for action in RATE_LIMITED_ACTIONS:
+            per_minute = config.getfloat('RateLimit', f'{action}_per_minute', fallback=0)
+            if per_minute <= 0:
+                continue
+            if context is not None:
+                buckets[action] = TokenBucket.shared(context, per_minute, burst)
+            else:
+                buckets[action] = TokenBucket(per_minute, burst)
+        return cls(buckets) if buckets else None
+
+    def __getstate__(self):
+        # ワーカープロセスへはバケットだけを渡し、待機時間の集計はプロセスごとに行う
+        return {'buckets': self.buckets}
+
+    def __setstate__(self, state):
+        self.__init__(state['buckets'])
+
+    def wait(self, action: str) -> float:
+        delay = self._reserve(action)
+        if delay > 0:
+            time.sleep(delay)
+            record_rate_limit_wait(delay)
+        return delay
+
+    async def wait_async(self, action: str) -> float:
+        delay = self._reserve(action)
+        if delay > 0:
+            await asyncio.sleep(delay)
+            record_rate_limit_wait(delay)
+        return delay
+
+    def _reserve(self, action: str) -> float:
+        bucket = self.buckets.get(action)
+        if bucket is None:
+            return 0.0
+
+        delay = bucket.reserve()
+        with self._stats_lock:
+            stats = self._stats.setdefault(action, [0, 0, 0.0, 0.0])
+            stats[0] += 1
+            if delay > 0:
+                stats[1] += 1
+                stats[2] += delay
+                stats[3] = max(stats[3], delay)
+        if delay > 0:
+            logger.info(f"レート制限のため{ACTION_LABELS.get(action, action)}を{delay:.2f}秒待機します")
+        return delay
+
+    def log_summary(self):
+        with self._stats_lock:
+            stats, self._stats = self._stats, {}
+
+        for action, (count, waited, total, longest) in stats.items():
+            logger.info(
+                f"レート制限[{ACTION_LABELS.get(action, action)}]: {count}回中{waited}回待機, "
+                f"待機時間 合計 {total:.1f}秒, 最大 {longest:.1f}秒"
+            )
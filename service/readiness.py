@@ -0,0 +1,186 @@
+import logging
+import re
+import threading
+import time
+from abc import ABC, abstractmethod
+from contextlib import asynccontextmanager, contextmanager
+from typing import Callable
+from urllib.parse import urlparse
+
+from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
+
+logger = logging.getLogger(__name__)
+
+
+class ProbeLatencyRecorder:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._latencies: dict[str, list[float]] = {}
+
+    def record(self, name: str, seconds: float):
+        with self._lock:
+            self._latencies.setdefault(name, []).append(seconds)
+
+    def summary(self) -> dict[str, dict[str, float]]:
+        with self._lock:
+            return {
+                name: {
+                    'count': len(values),
+                    'avg': sum(values) / len(values),
+                    'max': max(values),
+                }
+                for name, values in self._latencies.items()
+            }
+
+    def log_summary(self):
+        for name, stats in sorted(self.summary().items(), key=lambda item: -item[1]['avg']):
+            logger.info(
+                f"待機時間[{name}]: 平均 {stats['avg'] * 1000:.0f}ms, "
+                f"最大 {stats['max'] * 1000:.0f}ms ({stats['count']}回)"
+            )
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._latencies.clear()
+
+
+probe_latency = ProbeLatencyRecorder()
+
+
+class ReadinessProbe(ABC):
+    # 各ステップの「準備完了」の条件を表す。required=Falseの場合はタイムアウトしても警告のみで続行する
+    def __init__(self, name: str, required: bool = True):
+        self.name = name
+        self.required = required
+
+    @abstractmethod
+    def _wait(self, page, timeout: float | None):
+        pass
+
+    @abstractmethod
+    async def _wait_async(self, page, timeout: float | None):
+        pass
+
+    def _on_timeout(self, error: Exception):
+        if self.required:
+            raise error
+        logger.warning(f"準備完了の確認がタイムアウトしたため続行します: {self.name}")
+
+    def wait(self, page, timeout: float | None = None):
+        started = time.monotonic()
+        try:
+            self._wait(page, timeout)
+        except PlaywrightTimeoutError as e:
+            self._on_timeout(e)
+        finally:
+            probe_latency.record(self.name, time.monotonic() - started)
+
+    async def wait_async(self, page, timeout: float | None = None):
+        started = time.monotonic()
+        try:
+            await self._wait_async(page, timeout)
+        except PlaywrightTimeoutError as e:
+            self._on_timeout(e)
+        finally:
+            probe_latency.record(self.name, time.monotonic() - started)
+
+
+class SelectorProbe(ReadinessProbe):
+    def __init__(self, name: str, selector: str, state: str = 'visible', frame: str | None = None,
+                 required: bool = True):
+        super().__init__(name, required)
+        self.selector = selector
+        self.state = state
+        self.frame = frame
+
+    def _locator(self, page):
+        root = page.frame_locator(self.frame) if self.frame else page
+        return root.locator(self.selector).first
+
+    def _wait(self, page, timeout):
+        self._locator(page).wait_for(state=self.state, timeout=timeout)
+
+    async def _wait_async(self, page, timeout):
+        await self._locator(page).wait_for(state=self.state, timeout=timeout)
+
+
+class FunctionProbe(ReadinessProbe):
+    def __init__(self, name: str, expression: str, required: bool = True):
+        super().__init__(name, required)
+        self.expression = expression
+
+    def _wait(self, page, timeout):
+        page.wait_for_function(self.expression, timeout=timeout)
+
+    async def _wait_async(self, page, timeout):
+        await page.wait_for_function(self.expression, timeout=timeout)
+
+
+class ResponseProbe(ReadinessProbe):
+    # レスポンスは操作の前から待ち受ける必要があるため、expect()で操作を囲んで使う
+    def __init__(self, name: str, predicate: Callable, required: bool = True):
+        super().__init__(name, required)
+        self.predicate = predicate
+
+    def _wait(self, page, timeout):
+        # 操作を伴わずに、これから届くレスポンスを待つ
+        with page.expect_response(self.predicate, timeout=timeout):
+            pass
+
+    async def _wait_async(self, page, timeout):
+        async with page.expect_response(self.predicate, timeout=timeout):
+            pass
+
+    @contextmanager
+    def expect(self, page, timeout: float | None = None):
+        result = {}
+        started = None
+        try:
+            with page.expect_response(self.predicate, timeout=timeout) as response_info:
+                yield result
+                started = time.monotonic()
+            result['response'] = response_info.value
+        except PlaywrightTimeoutError as e:
+            # 囲んだ操作自体のタイムアウトはそのまま送出する
+            if started is None:
+                raise
+            self._on_timeout(e)
+        finally:
+            if started is not None:
+                probe_latency.record(self.name, time.monotonic() - started)
+
+    @asynccontextmanager
+    async def expect_async(self, page, timeout: float | None = None):
+        result = {}
+        started = None
+        try:
+            async with page.expect_response(self.predicate, timeout=timeout) as response_info:
+                yield result
+                started = time.monotonic()
+            result['response'] = await response_info.value
+        except PlaywrightTimeoutError as e:
+            if started is None:
+                raise
+            self._on_timeout(e)
+        finally:
+            if started is not None:
+                probe_latency.record(self.name, time.monotonic() - started)
+
+
+# IPCLサイトの各画面の準備完了条件
+LOGIN_FORM_READY = SelectorProbe('login_form', 'input[placeholder="ログインID"]')
+ORDER_FORM_READY = SelectorProbe('order_form', '#select2-order-sex-container', required=False)
+LANDING_READY = SelectorProbe(
+    'landing', 'input[placeholder="ログインID"], #select2-order-sex-container', required=False
+)
+# 下書き保存のリクエストのパス(draftまたはdraftsの階層を含む)。保存と同時に送られる他のPOST(計算やログ送信など)と区別する
+DRAFT_SAVE_PATH = re.compile(r'/drafts?(/|$)', re.IGNORECASE)
+
+
+def is_draft_save_response(response) -> bool:
+    request = response.request
+    return request.method == 'POST' and DRAFT_SAVE_PATH.search(urlparse(request.url).path) is not None
+
+
+DRAFT_SAVED = ResponseProbe('draft_saved', is_draft_save_response, required=False)
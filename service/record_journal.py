@@ -0,0 +1,121 @@
+import configparser
+import hashlib
+import logging
+import sqlite3
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Iterable
+
+from service.patient_record import RECORD_KEYS
+from utils.log_rotation import get_project_root
+
+logger = logging.getLogger(__name__)
+
+STATUS_SUCCESS = 'success'
+STATUS_FAILED = 'failed'
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS record_journal (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    content_hash TEXT NOT NULL,
+    status TEXT NOT NULL,
+    patient_id TEXT,
+    pdf_path TEXT,
+    recorded_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS record_journal_hash ON record_journal (content_hash, status);
+'''
+
+# SQLiteのプレースホルダ数の上限を超えないよう、照会はこの件数ずつ行う
+QUERY_CHUNK_SIZE = 500
+
+
+def record_hash(data) -> str:
+    # CSV由来の34項目から求める。ファイル名や行番号に依存しないため、
+    # エラーフォルダから戻したファイルや分割したファイルでも同じ行は同じ値になる
+    content = '\x1f'.join(str(data.get(key) or '') for key in RECORD_KEYS)
+    return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+
+class RecordJournal:
+    # レコードごとの処理結果を追記のみで記録し、再実行時に下書き保存済みの行を判別する
+    def __init__(self, db_path: Path):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._connection: sqlite3.Connection | None = None
+
+    @classmethod
+    def from_config(cls, config: configparser.ConfigParser) -> 'RecordJournal | None':
+        db_file = config.get('Journal', 'db_file', fallback='')
+        if not db_file:
+            return None
+
+        db_path = Path(db_file)
+        if not db_path.is_absolute():
+            db_path = get_project_root() / db_path
+        return cls(db_path)
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._connection is None:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            # スレッド間で共有し、書き込みはロックで直列化する。別プロセスとの競合はtimeoutで待つ
+            connection = sqlite3.connect(self.db_path, timeout=30, check_same_thread=False)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=FULL')
+            connection.executescript(SCHEMA)
+            self._connection = connection
+        return self._connection
+
+    def record(self, data, success: bool, pdf_path: str | Path | None = None):
+        status = STATUS_SUCCESS if success else STATUS_FAILED
+        try:
+            with self._lock:
+                connection = self._connect()
+                with connection:
+                    connection.execute(
+                        'INSERT INTO record_journal (content_hash, status, patient_id, pdf_path, recorded_at) '
+                        'VALUES (?, ?, ?, ?, ?)',
+                        (
+                            record_hash(data),
+                            status,
+                            data.get('id'),
+                            str(pdf_path) if pdf_path else None,
+                            datetime.now().isoformat(timespec='seconds'),
+                        ),
+                    )
+        except sqlite3.Error as e:
+            logger.warning(f"処理結果をジャーナルに記録できませんでした (患者ID: {data.get('id')}): {e}")
+
+    def succeeded_hashes(self, hashes: Iterable[str]) -> set[str]:
+        hashes = list(dict.fromkeys(hashes))
+        found = set()
+        try:
+            with self._lock:
+                connection = self._connect()
+                for start in range(0, len(hashes), QUERY_CHUNK_SIZE):
+                    chunk = hashes[start:start + QUERY_CHUNK_SIZE]
+                    placeholders = ', '.join('?' * len(chunk))
+                    rows = connection.execute(
+                        f'SELECT DISTINCT content_hash FROM record_journal '
+                        f'WHERE status = ? AND content_hash IN ({placeholders})',
+                        (STATUS_SUCCESS, *chunk),
+                    )
+                    found.update(row[0] for row in rows)
+        except sqlite3.Error as e:
+            # ジャーナルが読めない場合は全件を処理する
+            logger.warning(f"ジャーナルを参照できませんでした: {self.db_path}: {e}")
+            return set()
+        return found
+
+    def pending(self, records: dict[int, Any]) -> dict[int, Any]:
+        # 行の位置をキーにしたレコードから、下書き保存に成功していないものだけを返す
+        hashes = {position: record_hash(record) for position, record in records.items()}
+        succeeded = self.succeeded_hashes(hashes.values())
+        return {position: record for position, record in records.items() if hashes[position] not in succeeded}
+
+    def close(self):
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
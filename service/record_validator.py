@@ -0,0 +1,127 @@
+import csv
+import dataclasses
+import logging
+import math
+import unicodedata
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+
+from service.lens_calculator_service import eye_prefixes, lens_type_for
+from service.patient_record import EyeMeasurements, PatientRecord
+
+logger = logging.getLogger(__name__)
+
+VALID_SEXES = ('男性', '女性')
+VALID_EYES = ('両眼', '右眼', '左眼')
+
+# 入力対象の眼ごとに数値であることを確認する項目。必須項目は空欄も不可とする
+REQUIRED_NUMERIC_FIELDS = ('sph', 'cyl', 'axis', 'acd', 'k1', 'k2')
+OPTIONAL_NUMERIC_FIELDS = ('ata', 'casia_wtw_m', 'caliper_wtw')
+DATE_FIELDS = ('birthday', 'surgery_date')
+
+# PatientRecordの属性名(right/left, right_lens_type/left_lens_type)の接頭辞
+EYE_SIDES = {'r': 'right', 'l': 'left'}
+
+REPORT_HEADER = ['行', '患者ID', '名前', '項目', '値', '理由']
+
+
+@dataclass(frozen=True, slots=True)
+class RecordIssue:
+    field: str
+    value: str
+    reason: str
+
+
+@dataclass(frozen=True, slots=True)
+class RejectedRecord:
+    row: int
+    record: PatientRecord
+    issues: tuple[RecordIssue, ...]
+
+
+def normalize(value: str | None) -> str:
+    # 全角の数字や記号(－１.５０ など)を半角にそろえ、前後の空白を除く
+    return unicodedata.normalize('NFKC', value or '').strip()
+
+
+def is_number(value: str) -> bool:
+    try:
+        return math.isfinite(float(value))
+    except ValueError:
+        return False
+
+
+def is_date(value: str) -> bool:
+    if len(value) != 8 or not value.isdigit():
+        return False
+    try:
+        datetime.strptime(value, '%Y%m%d')
+    except ValueError:
+        return False
+    return True
+
+
+class RecordValidator:
+    def validate(self, record: PatientRecord) -> tuple[PatientRecord, list[RecordIssue]]:
+        issues = []
+
+        patient = {name: normalize(getattr(record, name)) for name in ('id', 'sex', 'eye', *DATE_FIELDS)}
+        if not patient['id']:
+            issues.append(RecordIssue('id', patient['id'], '患者IDが空欄です'))
+        if patient['sex'] not in VALID_SEXES:
+            issues.append(RecordIssue('sex', patient['sex'], f"性別は{'・'.join(VALID_SEXES)}のいずれかです"))
+        if patient['eye'] not in VALID_EYES:
+            issues.append(RecordIssue('eye', patient['eye'], f"眼は{'・'.join(VALID_EYES)}のいずれかです"))
+        for name in DATE_FIELDS:
+            if not is_date(patient[name]):
+                issues.append(RecordIssue(name, patient[name], '日付はYYYYMMDDの8桁です'))
+
+        eyes = {}
+        for prefix in eye_prefixes(patient['eye']):
+            side = EYE_SIDES[prefix]
+            measurements = EyeMeasurements._make(normalize(value) for value in record.measurements(prefix))
+            for name in REQUIRED_NUMERIC_FIELDS + OPTIONAL_NUMERIC_FIELDS:
+                value = getattr(measurements, name)
+                if not value and name in OPTIONAL_NUMERIC_FIELDS:
+                    continue
+                if not is_number(value):
+                    issues.append(RecordIssue(f'{prefix}_{name}', value, '数値ではありません'))
+            eyes[side] = measurements
+            if is_number(measurements.cyl):
+                eyes[f'{side}_lens_type'] = lens_type_for(measurements.cyl)
+
+        normalized = dataclasses.replace(record, name=record.name.strip(), **patient, **eyes)
+        return normalized, issues
+
+    def validate_all(self, records: list[PatientRecord]) -> tuple[list[PatientRecord], list[RejectedRecord]]:
+        accepted = []
+        rejected = []
+        for row, record in enumerate(records, 1):
+            normalized, issues = self.validate(record)
+            if issues:
+                rejected.append(RejectedRecord(row, normalized, tuple(issues)))
+                logger.warning(
+                    f"{row}件目のデータを除外しました (患者ID: {normalized.id}): "
+                    + ', '.join(f"{issue.field}={issue.value!r} {issue.reason}" for issue in issues)
+                )
+            else:
+                accepted.append(normalized)
+        return accepted, rejected
+
+    @staticmethod
+    def write_report(csv_path: Path, rejected: list[RejectedRecord], output_dir: Path) -> Path:
+        output_dir.mkdir(parents=True, exist_ok=True)
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        report_path = output_dir / f"{csv_path.stem}_invalid_{timestamp}.csv"
+
+        # Excelで開いても文字化けしないようBOM付きUTF-8で出力する
+        with open(report_path, 'w', encoding='utf-8-sig', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(REPORT_HEADER)
+            for item in rejected:
+                for issue in item.issues:
+                    writer.writerow([item.row, item.record.id, item.record.name, issue.field, issue.value, issue.reason])
+
+        logger.error(f"検証エラーのレポートを出力しました: {report_path}")
+        return report_path
@@ -0,0 +1,110 @@
+import logging
+import queue
+import threading
+from typing import Any, Callable
+
+from service.browser_manager import BrowserManager
+from service.concurrency_controller import ConcurrencyController
+
+logger = logging.getLogger(__name__)
+
+RecordHandler = Callable[[BrowserManager, Any], bool]
+
+
+class RecordWorkerPool:
+    # Playwrightの同期APIはスレッドをまたいで使用できないため、
+    # ワーカーごとにBrowserManagerを生成し、そのスレッド内でのみ操作する
+    def __init__(
+        self,
+        workers: int,
+        create_browser_manager: Callable[[], BrowserManager],
+        handle_record: RecordHandler,
+        limiter: ConcurrencyController | None = None,
+    ):
+        self.workers = max(1, workers)
+        self._create_browser_manager = create_browser_manager
+        self._handle_record = handle_record
+        self._limiter = limiter
+        self._jobs: queue.Queue = queue.Queue()
+        self._threads: list[threading.Thread] = []
+
+    @property
+    def is_running(self) -> bool:
+        return bool(self._threads)
+
+    def start(self):
+        if self._threads:
+            return
+
+        for worker_id in range(1, self.workers + 1):
+            thread = threading.Thread(
+                target=self._worker_loop,
+                name=f"RecordWorker-{worker_id}",
+                daemon=True,
+            )
+            thread.start()
+            self._threads.append(thread)
+        logger.info(f"{self.workers}個のワーカーで並列処理を開始します")
+
+    def stop(self):
+        for _ in self._threads:
+            self._jobs.put(None)
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+
+    def map(
+        self,
+        jobs: list,
+        on_idle: Callable[[], None] | None = None,
+        on_result: Callable[[int, bool], None] | None = None,
+    ) -> list[bool]:
+        if not self._threads:
+            self.start()
+
+        results: queue.Queue = queue.Queue()
+        for position, job in enumerate(jobs):
+            self._jobs.put((position, job, results))
+
+        outcomes = [False] * len(jobs)
+        remaining = len(jobs)
+        while remaining:
+            try:
+                position, success = results.get(timeout=0.1)
+            except queue.Empty:
+                if on_idle:
+                    on_idle()
+                continue
+            outcomes[position] = success
+            remaining -= 1
+            if on_result:
+                on_result(position, success)
+
+        if on_idle:
+            on_idle()
+        return outcomes
+
+    def _worker_loop(self):
+        browser_manager = self._create_browser_manager()
+        try:
+            while True:
+                # 同時実行数を制限している場合は、枠が空くまでジョブを取らずに待つ
+                if self._limiter is not None:
+                    self._limiter.acquire()
+                try:
+                    item = self._jobs.get()
+                    if item is None:
+                        break
+
+                    position, job, results = item
+                    try:
+                        success = self._handle_record(browser_manager, job)
+                    except Exception as e:
+                        logger.exception(f"ワーカーでエラーが発生しました: {e}")
+                        success = False
+                    results.put((position, success))
+                finally:
+                    if self._limiter is not None:
+                        self._limiter.release()
+        finally:
+            browser_manager.stop()
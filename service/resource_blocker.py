@@ -0,0 +1,92 @@
+import configparser
+import logging
+import threading
+from collections import Counter
+from urllib.parse import urlparse
+
+logger = logging.getLogger(__name__)
+
+
+def _split_list(value: str) -> list[str]:
+    return [item.strip().lower() for item in value.split(',') if item.strip()]
+
+
+class ResourceBlocker:
+    # ワークフローに不要な画像・フォント・メディア・トラッカーへのリクエストを中止する。
+    # スレッド間で共有されるため、集計はロックで保護する
+    def __init__(
+        self,
+        blocked_resource_types: list[str],
+        blocked_domains: list[str],
+        allowed_url_patterns: list[str],
+    ):
+        self.blocked_resource_types = set(blocked_resource_types)
+        self.blocked_domains = blocked_domains
+        self.allowed_url_patterns = allowed_url_patterns
+        self._lock = threading.Lock()
+        self.blocked_counts: Counter = Counter()
+        self.transferred_bytes = 0
+
+    @classmethod
+    def from_config(cls, config: configparser.ConfigParser) -> 'ResourceBlocker | None':
+        if not config.getboolean('Network', 'block_resources', fallback=False):
+            return None
+
+        return cls(
+            _split_list(config.get('Network', 'blocked_resource_types', fallback='')),
+            _split_list(config.get('Network', 'blocked_domains', fallback='')),
+            _split_list(config.get('Network', 'allowed_url_patterns', fallback='')),
+        )
+
+    def block_reason(self, url: str, resource_type: str) -> str | None:
+        lowered_url = url.lower()
+        if any(pattern in lowered_url for pattern in self.allowed_url_patterns):
+            return None
+
+        host = urlparse(lowered_url).hostname or ''
+        for domain in self.blocked_domains:
+            if host == domain or host.endswith(f'.{domain}'):
+                return 'tracker'
+
+        if resource_type in self.blocked_resource_types:
+            return resource_type
+        return None
+
+    def handle(self, route):
+        reason = self.block_reason(route.request.url, route.request.resource_type)
+        if reason is None:
+            route.fallback()
+            return
+
+        with self._lock:
+            self.blocked_counts[reason] += 1
+        route.abort()
+
+    async def handle_async(self, route):
+        reason = self.block_reason(route.request.url, route.request.resource_type)
+        if reason is None:
+            await route.fallback()
+            return
+
+        with self._lock:
+            self.blocked_counts[reason] += 1
+        await route.abort()
+
+    def record_response(self, response):
+        content_length = response.headers.get('content-length')
+        if content_length and content_length.isdigit():
+            with self._lock:
+                self.transferred_bytes += int(content_length)
+
+    def log_summary(self):
+        with self._lock:
+            blocked_total = sum(self.blocked_counts.values())
+            details = ', '.join(f"{reason}: {count}" for reason, count in self.blocked_counts.most_common())
+            transferred_kb = self.transferred_bytes / 1024
+            self.blocked_counts.clear()
+            self.transferred_bytes = 0
+
+        logger.info(
+            f"リソースブロック: {blocked_total}件 ({details or 'なし'}), "
+            f"転送量(Content-Length合計): {transferred_kb:.1f}KB"
+        )
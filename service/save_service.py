@@ -5,13 +5,33 @@ from pathlib import Path
 
 from playwright.sync_api import Page
 
+from service.csv_handler import CSVHandler
+from service.rate_limiter import ACTION_SAVE_DRAFT, RateLimiter
+from service.readiness import DRAFT_SAVED
+
 logger = logging.getLogger(__name__)
 
 
+def pdf_filename(patient_id: str, now: datetime | None = None) -> str:
+    # 並列実行時に同一秒・同一IDで衝突しないようミリ秒まで含める
+    timestamp = (now or datetime.now()).strftime('%Y%m%d_%H%M%S_%f')[:-3]
+    return f"IPCLdata_ID{patient_id}_{timestamp}.pdf"
+
+
+def discard_pdf(pdf_path: str):
+    # ページを開き直して再試行する前に、やり直すことになった試行で保存したPDFを削除する
+    try:
+        Path(pdf_path).unlink(missing_ok=True)
+        logger.info(f"やり直す前に保存したPDFファイルを削除しました: {pdf_path}")
+    except OSError as e:
+        logger.warning(f"やり直す前に保存したPDFファイルを削除できませんでした: {pdf_path}: {e}")
+
+
 class SaveService:
-    def __init__(self, pdf_dir: Path, calculated_dir: Path):
+    def __init__(self, pdf_dir: Path, calculated_dir: Path, rate_limiter: RateLimiter | None = None):
         self.pdf_dir = pdf_dir
         self.calculated_dir = calculated_dir
+        self.rate_limiter = rate_limiter
 
     def click_save_pdf_button(self, page: Page, patient_id: str, patient_name: str) -> str:
         frame = page.frame_locator('#calculatorFrame')
@@ -22,9 +42,7 @@ class SaveService:
 
             download = download_info.value
 
-            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-            pdf_filename = f"IPCLdata_ID{patient_id}_{timestamp}.pdf"
-            pdf_path = self.pdf_dir / pdf_filename
+            pdf_path = self.pdf_dir / pdf_filename(patient_id)
 
             download.save_as(pdf_path)
 
@@ -40,16 +58,17 @@ class SaveService:
         frame = page.frame_locator('#calculatorFrame')
         frame.locator('button#btn-save-draft-modal').click()
 
-    @staticmethod
-    def save_draft(page: Page) -> bool:
+    def save_draft(self, page: Page) -> bool:
         try:
             save_button = page.locator('button:has-text("下書き保存")')
             save_button.wait_for(state='visible', timeout=2000)
 
             if not save_button.is_disabled():
-                save_button.click()
-                page.wait_for_load_state('networkidle')
-                return True
+                if self.rate_limiter is not None:
+                    self.rate_limiter.wait(ACTION_SAVE_DRAFT)
+                with DRAFT_SAVED.expect(page) as result:
+                    save_button.click()
+                return SaveService._is_draft_response_ok(result.get('response'))
             else:
                 logger.warning("下書き保存ボタンが無効のため、処理をスキップしました")
                 return False
@@ -57,6 +76,17 @@ class SaveService:
             logger.warning(f"下書き保存をスキップしました: {e}")
             return False
 
+    @staticmethod
+    def _is_draft_response_ok(response) -> bool:
+        # 応答を確認できなかった場合は、保存済みとして記録して再実行で飛ばされないよう失敗として扱う
+        if response is None:
+            logger.warning("下書き保存の応答を確認できなかったため、失敗として扱います")
+            return False
+        if response.status >= 400:
+            logger.warning(f"下書き保存のレスポンスがエラーでした: HTTP {response.status}")
+            return False
+        return True
+
     def move_csv_to_calculated(self, csv_path: Path):
         self.calculated_dir.mkdir(exist_ok=True)
 
@@ -74,3 +104,59 @@ class SaveService:
 
         shutil.move(str(csv_path), str(destination))
         logger.error(f"{csv_path.name} をエラーフォルダに移動しました: {destination.name}")
+
+    def split_csv_by_result(self, csv_path: Path, failed_rows: set[int], retry_dir: Path) -> Path:
+        encoding, header, rows = CSVHandler.read_rows(csv_path)
+        retry_rows = [row for position, row in enumerate(rows, 1) if position in failed_rows]
+        succeeded_rows = [row for position, row in enumerate(rows, 1) if position not in failed_rows]
+
+        retry_dir.mkdir(exist_ok=True)
+        self.calculated_dir.mkdir(exist_ok=True)
+
+        # 同じ秒に複数のファイルを分割しても衝突しないようミリ秒まで含める
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S_%f')[:-3]
+        retry_path = retry_dir / f"IPCLdata_retry_{timestamp}.csv"
+
+        # 元のファイルは両方の書き出しが終わってから削除する
+        CSVHandler.write_rows(retry_path, encoding, header, retry_rows)
+        CSVHandler.write_rows(self.calculated_dir / csv_path.name, encoding, header, succeeded_rows)
+        csv_path.unlink()
+
+        logger.info(f"{csv_path.name} の成功した{len(succeeded_rows)}件を計算済フォルダに移動しました")
+        logger.error(f"失敗した{len(retry_rows)}件を再処理用のCSVに出力しました: {retry_path.name}")
+        return retry_path
+
+    def park_csv_rows(
+        self, csv_path: Path, parked_rows: set[int], failed_rows: set[int], retry_dir: Path
+    ) -> Path | None:
+        # 保留した行だけを元のファイルに残し、成功した行は計算済フォルダ、失敗した行は再処理用のCSVに分ける。
+        # 戻り値は再処理用のCSVのパス(失敗した行がなければNone)
+        encoding, header, rows = CSVHandler.read_rows(csv_path)
+        parked = [row for position, row in enumerate(rows, 1) if position in parked_rows]
+        if len(parked) == len(rows):
+            return None
+
+        retry_rows = [row for position, row in enumerate(rows, 1) if position in failed_rows]
+        succeeded_rows = [
+            row for position, row in enumerate(rows, 1) if position not in failed_rows and position not in parked_rows
+        ]
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S_%f')[:-3]
+
+        retry_path = None
+        if retry_rows:
+            retry_dir.mkdir(exist_ok=True)
+            retry_path = retry_dir / f"IPCLdata_retry_{timestamp}.csv"
+            CSVHandler.write_rows(retry_path, encoding, header, retry_rows)
+            logger.error(f"失敗した{len(retry_rows)}件を再処理用のCSVに出力しました: {retry_path.name}")
+        if succeeded_rows:
+            # 保留した行の処理が終わると元のファイル名で移動するため、名前が重ならないようにする
+            self.calculated_dir.mkdir(exist_ok=True)
+            succeeded_path = self.calculated_dir / f"{csv_path.stem}_{timestamp}{csv_path.suffix}"
+            CSVHandler.write_rows(succeeded_path, encoding, header, succeeded_rows)
+            logger.info(f"{csv_path.name} の成功した{len(succeeded_rows)}件を計算済フォルダに出力しました")
+
+        # 書きかけのファイルを監視モードが読まないよう、別名で書いてから置き換える
+        temp_path = csv_path.with_suffix('.tmp')
+        CSVHandler.write_rows(temp_path, encoding, header, parked)
+        temp_path.replace(csv_path)
+        return retry_path
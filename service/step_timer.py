@@ -0,0 +1,179 @@
+import json
+import logging
+import math
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from pathlib import Path
+from typing import Callable
+
+logger = logging.getLogger(__name__)
+
+# 実行中のステップを計測しているRecordTimer。スレッドと非同期タスクごとに別の値を持つ
+_current_timer: ContextVar['RecordTimer | None'] = ContextVar('current_record_timer', default=None)
+
+
+def percentile(values: list[float], q: float) -> float:
+    ordered = sorted(values)
+    rank = max(1, math.ceil(q / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+class RecordTimer:
+    # 1レコード分の各ステップの所要時間(秒)を、実行した順に保持する
+    def __init__(self):
+        self.spans: dict[str, float] = {}
+        # タイムアウトや5xx応答など、サーバー混雑の兆候があった場合にその種類を設定する
+        self.congestion: str | None = None
+        self.retries: list[dict] = []
+        # レート制限で待機した時間(秒)。接続先の応答時間と区別するため、ステップの所要時間には含めない
+        self.rate_limit_waits: dict[str, float] = {}
+        self._waited = 0.0
+
+    @contextmanager
+    def span(self, name: str):
+        token = _current_timer.set(self)
+        waited_before = self._waited
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            elapsed = time.monotonic() - started
+            _current_timer.reset(token)
+            waited = self._waited - waited_before
+            self.spans[name] = self.spans.get(name, 0.0) + max(0.0, elapsed - waited)
+            if waited > 0:
+                self.rate_limit_waits[name] = self.rate_limit_waits.get(name, 0.0) + waited
+
+    def record_wait(self, seconds: float):
+        self._waited += seconds
+
+    def record_retry(self, step: str, attempt: int, error: Exception, renavigate: bool):
+        # attemptは次に行う実行が何回目か。エラーは1行目だけを残す
+        message = str(error).strip().splitlines()[0] if str(error).strip() else ''
+        self.retries.append({
+            'step': step,
+            'attempt': attempt,
+            'renavigate': renavigate,
+            'error': f"{type(error).__name__}: {message}"[:200],
+        })
+
+    @property
+    def total(self) -> float:
+        return sum(self.spans.values())
+
+
+def record_rate_limit_wait(seconds: float):
+    # 計測中のステップがあれば、その待機時間としてステップの所要時間から除く
+    timer = _current_timer.get()
+    if timer is not None:
+        timer.record_wait(seconds)
+
+
+class StepTimingRecorder:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._records: list[dict] = []
+        self._listeners: list[Callable[[dict], None]] = []
+
+    def add_listener(self, listener: Callable[[dict], None]):
+        with self._lock:
+            self._listeners.append(listener)
+
+    def remove_listener(self, listener: Callable[[dict], None]):
+        with self._lock:
+            if listener in self._listeners:
+                self._listeners.remove(listener)
+
+    def add(self, data: dict, timer: RecordTimer, success: bool):
+        entry = {
+            'id': data.get('id'),
+            'eye': data.get('eye'),
+            'success': success,
+            'total': round(timer.total, 3),
+            'steps': {name: round(seconds, 3) for name, seconds in timer.spans.items()},
+        }
+        if timer.congestion:
+            entry['congestion'] = timer.congestion
+        if timer.retries:
+            entry['retries'] = list(timer.retries)
+        if timer.rate_limit_waits:
+            entry['rate_limit_waits'] = {name: round(seconds, 3) for name, seconds in timer.rate_limit_waits.items()}
+        self.extend([entry])
+
+    def extend(self, records: list[dict]):
+        with self._lock:
+            self._records.extend(records)
+            listeners = list(self._listeners)
+        for listener in listeners:
+            for record in records:
+                listener(record)
+
+    def drain(self) -> list[dict]:
+        with self._lock:
+            records, self._records = self._records, []
+        return records
+
+    def summary(self) -> dict[str, dict[str, float]]:
+        with self._lock:
+            records = list(self._records)
+
+        durations: dict[str, list[float]] = {}
+        for record in records:
+            for name, seconds in record['steps'].items():
+                durations.setdefault(name, []).append(seconds)
+
+        return {
+            name: {
+                'count': len(values),
+                'p50': percentile(values, 50),
+                'p95': percentile(values, 95),
+                'max': max(values),
+            }
+            for name, values in durations.items()
+        }
+
+    def retry_counts(self) -> dict[str, int]:
+        with self._lock:
+            records = list(self._records)
+
+        counts: dict[str, int] = {}
+        for record in records:
+            for retry in record.get('retries', ()):
+                counts[retry['step']] = counts.get(retry['step'], 0) + 1
+        return counts
+
+    def log_summary(self):
+        for name, stats in self.summary().items():
+            logger.info(
+                f"ステップ所要時間[{name}]: p50 {stats['p50']:.2f}秒, p95 {stats['p95']:.2f}秒, "
+                f"最大 {stats['max']:.2f}秒 ({stats['count']}件)"
+            )
+        retry_counts = self.retry_counts()
+        if retry_counts:
+            logger.info("ステップの再試行: " + ', '.join(f"{name} {count}回" for name, count in retry_counts.items()))
+
+    def write_report(self, output_dir: Path) -> Path | None:
+        summary = self.summary()
+        records = self.drain()
+        if not records:
+            return None
+
+        report_path = output_dir / f"step_timings_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+        try:
+            output_dir.mkdir(parents=True, exist_ok=True)
+            report_path.write_text(
+                json.dumps({'summary': summary, 'records': records}, ensure_ascii=False, indent=2),
+                encoding='utf-8',
+            )
+        except OSError as e:
+            logger.warning(f"ステップ所要時間の出力に失敗しました: {report_path}: {e}")
+            return None
+
+        logger.info(f"ステップ所要時間を出力しました: {report_path}")
+        return report_path
+
+
+step_timings = StepTimingRecorder()
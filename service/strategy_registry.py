@@ -0,0 +1,103 @@
+import configparser
+import json
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Awaitable, Callable, TypeVar
+
+from utils.log_rotation import get_project_root
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar('T')
+
+
+class StrategyRegistry:
+    # 入力欄ごとに最後に成功したロケーター方式を記録し、次回はその方式から試す。
+    # 記録は状態ファイルに保存し、次回の実行にも引き継ぐ
+    def __init__(self, state_path: Path | None = None):
+        self.state_path = state_path
+        self._lock = threading.Lock()
+        self._preferred: dict[str, str] = self._load()
+
+    @classmethod
+    def from_config(cls, config: configparser.ConfigParser) -> 'StrategyRegistry':
+        state_file = config.get('Strategies', 'state_file', fallback='')
+        if not state_file:
+            return cls()
+
+        state_path = Path(state_file)
+        if not state_path.is_absolute():
+            state_path = get_project_root() / state_path
+        return cls(state_path)
+
+    def _load(self) -> dict[str, str]:
+        if self.state_path is None:
+            return {}
+        try:
+            state = json.loads(self.state_path.read_text(encoding='utf-8'))
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            logger.warning(f"入力方式の状態ファイルを読み込めませんでした: {self.state_path}: {e}")
+            return {}
+        return {field: strategy for field, strategy in state.items() if isinstance(strategy, str)}
+
+    def _save(self):
+        if self.state_path is None:
+            return
+        try:
+            self.state_path.parent.mkdir(parents=True, exist_ok=True)
+            temp_path = self.state_path.with_name(f'{self.state_path.name}.{os.getpid()}.tmp')
+            temp_path.write_text(json.dumps(self._preferred, ensure_ascii=False, indent=2), encoding='utf-8')
+            os.replace(temp_path, self.state_path)
+        except OSError as e:
+            logger.warning(f"入力方式の状態ファイルを保存できませんでした: {self.state_path}: {e}")
+
+    def preferred(self, field: str) -> str | None:
+        with self._lock:
+            return self._preferred.get(field)
+
+    def order(self, field: str, strategies: list[str]) -> list[str]:
+        preferred = self.preferred(field)
+        if preferred not in strategies:
+            return list(strategies)
+        return [preferred] + [name for name in strategies if name != preferred]
+
+    def record_success(self, field: str, strategy: str):
+        with self._lock:
+            if self._preferred.get(field) == strategy:
+                return
+            previous = self._preferred.get(field)
+            self._preferred[field] = strategy
+            self._save()
+
+        if previous is not None:
+            logger.info(f"入力方式を切り替えました: {field}: {previous} → {strategy}")
+
+    def run(self, field: str, strategies: dict[str, Callable[[], T]]) -> tuple[str, T]:
+        last_error = None
+        for name in self.order(field, list(strategies)):
+            try:
+                result = strategies[name]()
+            except Exception as e:
+                logger.debug(f"入力方式が失敗しました: {field}: {name}: {e}")
+                last_error = e
+                continue
+            self.record_success(field, name)
+            return name, result
+        raise last_error
+
+    async def run_async(self, field: str, strategies: dict[str, Callable[[], Awaitable[T]]]) -> tuple[str, T]:
+        last_error = None
+        for name in self.order(field, list(strategies)):
+            try:
+                result = await strategies[name]()
+            except Exception as e:
+                logger.debug(f"入力方式が失敗しました: {field}: {name}: {e}")
+                last_error = e
+                continue
+            self.record_success(field, name)
+            return name, result
+        raise last_error
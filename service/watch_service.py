@@ -0,0 +1,77 @@
+import configparser
+import logging
+import threading
+import time
+
+from service.csv_watcher import CsvWatcher
+
+logger = logging.getLogger(__name__)
+
+
+class WatchService:
+    # ブラウザとログイン状態を保ったまま常駐し、csv_dirに置かれたファイルを順に処理する
+    def __init__(
+        self,
+        automation,
+        watcher: CsvWatcher,
+        poll_interval: float = 2.0,
+        keepalive_interval: float = 600.0,
+    ):
+        self.automation = automation
+        self.watcher = watcher
+        self.poll_interval = poll_interval
+        self.keepalive_interval = keepalive_interval
+
+    @classmethod
+    def from_config(cls, automation, config: configparser.ConfigParser) -> 'WatchService':
+        return cls(
+            automation,
+            CsvWatcher(automation.csv_dir, config.getint('Watch', 'stable_checks', fallback=2)),
+            config.getfloat('Watch', 'poll_interval_seconds', fallback=2.0),
+            config.getfloat('Watch', 'keepalive_minutes', fallback=10.0) * 60,
+        )
+
+    def run(self, stop_event: threading.Event):
+        logger.info(f"監視モードを開始します: {self.watcher.csv_dir}")
+        self.automation.start_session()
+
+        try:
+            self.automation.keep_session_alive()
+            last_activity = time.monotonic()
+            self._show_waiting()
+
+            while not stop_event.is_set():
+                try:
+                    last_activity = self._poll_once(last_activity)
+                except Exception as e:
+                    # 1つのファイルの失敗で常駐を止めない。ファイルは元のフォルダに残る
+                    logger.exception(f"CSVファイルの処理中にエラーが発生しました: {e}")
+                    self.automation.progress_window.update(
+                        f"[ERROR] CSVファイルの処理中にエラーが発生しました: {e}\n監視を続けます"
+                    )
+                    last_activity = time.monotonic()
+
+                stop_event.wait(self.poll_interval)
+
+        finally:
+            logger.info("監視モードを終了します")
+            self.automation.finish_session()
+
+    def _poll_once(self, last_activity: float) -> float:
+        # 接続先が落ちている間はファイルを取り出さず、回復の確認ができる時刻まで待つ
+        csv_paths = [] if self.automation.circuit_open else self.watcher.poll()
+        if csv_paths:
+            # 同時に置かれたファイルはまとめて処理し、手術日が近い行を優先する
+            for csv_path in csv_paths:
+                logger.info(f"新しいCSVファイルを検出しました: {csv_path.name}")
+            for parked_path in self.automation.process_csv_files(csv_paths, park=True):
+                self.watcher.release(parked_path)
+            self._show_waiting()
+            return time.monotonic()
+        if time.monotonic() - last_activity >= self.keepalive_interval:
+            self.automation.keep_session_alive()
+            return time.monotonic()
+        return last_activity
+
+    def _show_waiting(self):
+        self.automation.progress_window.update(f"新しいCSVファイルを待機しています...\n{self.watcher.csv_dir}")
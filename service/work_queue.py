@@ -0,0 +1,73 @@
+import heapq
+from pathlib import Path
+from typing import NamedTuple
+
+from service.patient_record import PatientRecord
+
+
+class FileBatch:
+    # 1つのCSVファイルのうち処理待ちの行を追跡し、すべての行の結果がそろったかを判定する
+    __slots__ = ('csv_path', 'total_rows', 'failed_rows', 'parked_rows', '_remaining')
+
+    def __init__(self, csv_path: Path, total_rows: int, failed_rows: set[int], pending_rows):
+        self.csv_path = csv_path
+        self.total_rows = total_rows
+        self.failed_rows = set(failed_rows)
+        # 接続先の障害で処理できず、回復後に処理し直す行
+        self.parked_rows: set[int] = set()
+        self._remaining = set(pending_rows)
+
+    @property
+    def is_complete(self) -> bool:
+        return not self._remaining
+
+    def complete(self, position: int, success: bool, parked: bool = False) -> bool:
+        # この呼び出しでファイル内の最後の行が終わった場合にTrueを返す
+        if position not in self._remaining:
+            return False
+        self._remaining.discard(position)
+        if parked:
+            self.parked_rows.add(position)
+        elif not success:
+            self.failed_rows.add(position)
+        return not self._remaining
+
+
+class WorkItem(NamedTuple):
+    # 比較は手術日、ファイルの到着時刻、ファイルの登録順、ファイル内の行の順に行う。
+    # file_orderとpositionの組は一意なので、recordとbatchが比較されることはない
+    surgery_date: str
+    arrival: int
+    file_order: int
+    position: int
+    record: PatientRecord
+    batch: FileBatch
+
+
+def arrival_time(csv_path: Path) -> int:
+    try:
+        return csv_path.stat().st_mtime_ns
+    except OSError:
+        return 0
+
+
+class WorkQueue:
+    # 複数のCSVファイルの処理待ちの行を、手術日が近い順に取り出す優先度付きキュー
+    def __init__(self):
+        self._heap: list[WorkItem] = []
+        self._file_count = 0
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def add(self, batch: FileBatch, records: dict[int, PatientRecord], arrival: int):
+        file_order = self._file_count
+        self._file_count += 1
+        for position, record in records.items():
+            heapq.heappush(self._heap, WorkItem(record.surgery_date, arrival, file_order, position, record, batch))
+
+    def pop(self) -> WorkItem:
+        return heapq.heappop(self._heap)
+
+    def drain(self) -> list[WorkItem]:
+        return [heapq.heappop(self._heap) for _ in range(len(self._heap))]
@@ -0,0 +1,107 @@
+from dataclasses import dataclass
+from typing import NamedTuple
+
+from playwright.sync_api import Error as PlaywrightError
+
+# ワークフローのステップ名と進捗表示。実行順に並べる
+STEP_MESSAGES = {
+    'login': 'Webサイトにログイン中...',
+    'patient_info': '患者情報を入力中...',
+    'open_calculator': 'レンズ計算・注文を開いています...',
+    'eye_tab': '{eye}タブを選択中...',
+    'birthday': '誕生日を入力中...',
+    'measurements': '測定データを入力中...',
+    'lens_type': 'レンズタイプを選択中...',
+    'ata_wtw': 'ATA/WTWデータを入力中...',
+    'calculate': 'レンズ計算を実行中...',
+    'save_pdf': '計算結果のPDFファイルを保存中...',
+    'save_input': '入力したデータを保存中...',
+    'save_draft': '下書き保存中...',
+}
+STEP_NAMES = tuple(STEP_MESSAGES)
+
+
+@dataclass(frozen=True, slots=True)
+class RetryPolicy:
+    # attempts: 初回を含めた実行回数の上限
+    # backoff_seconds: 1回目の再試行までの待機時間。以降は再試行ごとに2倍にする
+    # idempotent: 同じページのままやり直せるか。Falseの場合はページを開き直して最初のステップから再開する
+    attempts: int = 1
+    backoff_seconds: float = 0.0
+    idempotent: bool = True
+
+    def delay(self, failures: int) -> float:
+        return self.backoff_seconds * 2 ** (failures - 1)
+
+
+NO_RETRY = RetryPolicy()
+
+DEFAULT_RETRY_POLICIES = {
+    'login': RetryPolicy(2, 1.0),
+    'patient_info': RetryPolicy(2, 0.5),
+    # モーダルが開きかけの状態で再度押すと二重に開くため、ページを開き直す
+    'open_calculator': RetryPolicy(2, 0.5, idempotent=False),
+    'eye_tab': RetryPolicy(2, 0.5),
+    'birthday': RetryPolicy(2, 0.5),
+    'measurements': RetryPolicy(2, 0.5),
+    'lens_type': RetryPolicy(2, 0.5),
+    'ata_wtw': RetryPolicy(2, 0.5),
+    'calculate': RetryPolicy(3, 1.0),
+    'save_pdf': RetryPolicy(3, 1.0),
+    # 保存するとモーダルが閉じるため、同じページではやり直せない
+    'save_input': RetryPolicy(2, 0.5, idempotent=False),
+    # 下書きが二重に登録されないよう、下書き保存は再試行しない
+    'save_draft': NO_RETRY,
+}
+
+
+class RetryDecision(NamedTuple):
+    attempt: int
+    attempts: int
+    delay: float
+    renavigate: bool
+
+
+def step_message(name: str, data) -> str:
+    return STEP_MESSAGES[name].format(eye=data['eye'])
+
+
+def is_retryable(error: Exception) -> bool:
+    # ページやブラウザが閉じられた場合は、同じページでの再試行はできない
+    if isinstance(error, PlaywrightError):
+        return 'has been closed' not in str(error)
+    return isinstance(error, OSError)
+
+
+class WorkflowState:
+    # 1レコード分のワークフローの進行状況。次に実行するステップと、ステップごとの失敗回数を保持する
+    __slots__ = ('policies', 'step_index', 'failures')
+
+    def __init__(self, policies: dict[str, RetryPolicy] | None = None):
+        self.policies = DEFAULT_RETRY_POLICIES if policies is None else policies
+        self.step_index = 0
+        self.failures: dict[str, int] = {}
+
+    @property
+    def finished(self) -> bool:
+        return self.step_index >= len(STEP_NAMES)
+
+    @property
+    def current_step(self) -> str:
+        return STEP_NAMES[self.step_index]
+
+    def advance(self):
+        self.step_index += 1
+
+    def fail(self, error: Exception) -> RetryDecision | None:
+        # 再試行する場合は再開位置を更新して判断を返し、諦める場合はNoneを返す
+        name = self.current_step
+        policy = self.policies.get(name, NO_RETRY)
+        failures = self.failures[name] = self.failures.get(name, 0) + 1
+        if failures >= policy.attempts or not is_retryable(error):
+            return None
+
+        if not policy.idempotent:
+            # 最初のステップ(ログイン確認)が注文作成ページを開き直す
+            self.step_index = 0
+        return RetryDecision(failures + 1, policy.attempts, policy.delay(failures), not policy.idempotent)
@@ -0,0 +1,106 @@
+import http.cookiejar
+import urllib.request
+from unittest.mock import Mock
+
+import pytest
+
+from scripts.benchmark import write_synthetic_csvs
+from scripts.benchmark_csv import measure, read_as_dicts
+from scripts.mock_ipcl_site import DRAFT_SAVE_PATH, MockIPCLServer
+from service.csv_handler import CSVHandler
+from service.readiness import is_draft_save_response
+
+
+class TestSyntheticCsv:
+    """ベンチマーク用CSV生成のテストクラス"""
+
+    def test_generated_csv_is_readable_by_csv_handler(self, tmp_path):
+        """生成したCSVが本番と同じ読み込み処理で読めることを確認"""
+        paths = write_synthetic_csvs(tmp_path, files=2, records_per_file=3, seed=1)
+
+        assert [path.name for path in paths] == ['IPCLdata_bench001.csv', 'IPCLdata_bench002.csv']
+        records = CSVHandler.read_csv_file(paths[0])
+        assert len(records) == 3
+        assert records[0]['eye'] in ['両眼', '右眼', '左眼']
+        assert len(records[0]['birthday']) == 8
+        float(records[0]['r_cyl'])
+
+    def test_generation_is_reproducible(self, tmp_path):
+        """同じシードからは同じCSVが生成されることを確認"""
+        first = write_synthetic_csvs(tmp_path / 'a', 1, 5, seed=7)[0].read_bytes()
+        second = write_synthetic_csvs(tmp_path / 'b', 1, 5, seed=7)[0].read_bytes()
+
+        assert first == second
+
+
+class TestMockIPCLServer:
+    """代替サイトのテストクラス"""
+
+    @pytest.fixture
+    def server(self):
+        """起動済みの代替サイトを提供するフィクスチャ"""
+        server = MockIPCLServer()
+        server.start()
+        yield server
+        server.stop()
+
+    def test_order_page_requires_login(self, server):
+        """ログイン前はログインフォーム、ログイン後は注文フォームが表示されることを確認"""
+        opener = urllib.request.build_opener(urllib.request.HTTPCookieProcessor(http.cookiejar.CookieJar()))
+
+        assert 'placeholder="ログインID"' in opener.open(server.base_url).read().decode('utf-8')
+
+        login_url = server.base_url.replace('/awsystem/order/create', '/login')
+        response = opener.open(urllib.request.Request(login_url, data=b'login_id=a&password=b'))
+
+        assert 'select2-order-sex-container' in response.read().decode('utf-8')
+        assert server.stats.logins == 1
+
+    def test_calculator_page_has_order_detail_inputs(self, server):
+        """計算用ページにOrderDetailの入力欄が含まれることを確認"""
+        calculator_url = server.base_url.replace('/awsystem/order/create', '/calculator')
+
+        html = urllib.request.urlopen(calculator_url).read().decode('utf-8')
+
+        assert 'name="OrderDetail[r_spherical]"' in html
+        assert 'name="OrderDetail[l_caliper_manual]"' in html
+        assert 'id="btn-calculate"' in html
+
+
+    def test_draft_save_matches_readiness_probe(self, server):
+        """代替サイトの下書き保存のPOSTが、本番用の下書き保存の待機条件に一致することを確認"""
+        opener = urllib.request.build_opener(urllib.request.HTTPCookieProcessor(http.cookiejar.CookieJar()))
+        login_url = server.base_url.replace('/awsystem/order/create', '/login')
+        html = opener.open(urllib.request.Request(login_url, data=b'login_id=a&password=b')).read().decode('utf-8')
+        assert f"fetch('{DRAFT_SAVE_PATH}', {{ method: 'POST'" in html
+
+        draft_url = server.base_url.replace('/awsystem/order/create', DRAFT_SAVE_PATH)
+        opener.open(urllib.request.Request(draft_url, data=b'P001'))
+        response = Mock()
+        response.request.method = 'POST'
+        response.request.url = draft_url
+
+        assert is_draft_save_response(response)
+        assert server.stats.drafts == 1
+
+class TestCsvParseBenchmark:
+    """CSV読み込みベンチマークのテストクラス"""
+
+    def test_loaders_return_same_values(self, tmp_path):
+        """辞書形式とPatientRecordで同じ値が読み込まれることを確認"""
+        csv_path = write_synthetic_csvs(tmp_path, 1, 5, seed=3)[0]
+
+        dicts = read_as_dicts(csv_path)
+        records = CSVHandler.read_csv_file(csv_path)
+
+        assert dicts == [record.to_dict() for record in records]
+
+    def test_measure_reports_time_and_memory(self, tmp_path):
+        """計測結果に件数、所要時間、メモリ使用量が含まれることを確認"""
+        csv_path = write_synthetic_csvs(tmp_path, 1, 5, seed=3)[0]
+
+        result = measure(CSVHandler.read_csv_file, csv_path, repeat=1)
+
+        assert result['records'] == 5
+        assert result['best_seconds'] >= 0
+        assert result['bytes_per_record'] > 0
@@ -0,0 +1,254 @@
+import asyncio
+import configparser
+import os
+import urllib.error
+from unittest.mock import AsyncMock, MagicMock, Mock, patch
+
+import pytest
+from playwright.sync_api import Error as PlaywrightError
+
+from service.asset_cache import AssetCache
+
+
+class TestAssetCache:
+    """AssetCacheのテストクラス"""
+
+    @pytest.fixture
+    def cache(self, tmp_path):
+        """AssetCacheインスタンスを提供するフィクスチャ"""
+        cache = AssetCache(tmp_path / 'assets', 1024, ['script', 'stylesheet'])
+        yield cache
+        cache.close()
+
+    def _route(self, url, resource_type='script', method='GET'):
+        route = Mock()
+        route.request.url = url
+        route.request.resource_type = resource_type
+        route.request.method = method
+        return route
+
+    def test_put_and_get_roundtrip(self, cache):
+        """保存したアセットが取得できることを確認"""
+        url = 'https://www.ipcl-jp.com/js/jquery.min.js'
+        cache.put(url, {'etag': '"abc"', 'content-type': 'application/javascript'}, b'jquery')
+
+        meta, body = cache.get(url)
+
+        assert body == b'jquery'
+        assert meta['etag'] == '"abc"'
+        assert meta['content_type'] == 'application/javascript'
+
+    def test_get_returns_none_for_missing_entry(self, cache):
+        """未保存のURLではNoneを返すことを確認"""
+        assert cache.get('https://www.ipcl-jp.com/js/none.js') is None
+
+    def test_evicts_least_recently_used_entries(self, cache):
+        """容量を超えた場合に最も古いアクセスのエントリから削除されることを確認"""
+        cache.put('https://example.com/a.js', {}, b'a' * 400)
+        cache.put('https://example.com/b.js', {}, b'b' * 400)
+        body_a, _ = cache._paths('https://example.com/a.js')
+        body_b, _ = cache._paths('https://example.com/b.js')
+        os.utime(body_a, (1000, 1000))
+        os.utime(body_b, (2000, 2000))
+
+        cache.put('https://example.com/c.js', {}, b'c' * 400)
+
+        assert cache.get('https://example.com/a.js') is None
+        assert cache.get('https://example.com/b.js') is not None
+        assert cache.get('https://example.com/c.js') is not None
+
+    def test_put_skips_oversized_body(self, cache):
+        """上限を超えるアセットは保存しないことを確認"""
+        cache.put('https://example.com/huge.js', {}, b'x' * 2048)
+
+        assert cache.get('https://example.com/huge.js') is None
+
+    def test_handle_fulfills_cache_hit(self, cache):
+        """キャッシュヒット時にroute.fulfillで返すことを確認"""
+        url = 'https://www.ipcl-jp.com/js/select2.js'
+        cache.put(url, {'content-type': 'application/javascript'}, b'select2')
+        cache._schedule_revalidation = Mock()
+        route = self._route(url)
+
+        cache.handle(route)
+
+        route.fulfill.assert_called_once_with(
+            status=200, headers={'content-type': 'application/javascript'}, body=b'select2'
+        )
+        route.fetch.assert_not_called()
+        cache._schedule_revalidation.assert_called_once()
+        assert cache.hits == 1
+
+    def test_handle_fetches_and_stores_on_miss(self, cache):
+        """キャッシュミス時に取得して保存することを確認"""
+        url = 'https://www.ipcl-jp.com/css/app.css'
+        route = self._route(url, resource_type='stylesheet')
+        response = route.fetch.return_value
+        response.status = 200
+        response.url = url
+        response.headers = {'content-type': 'text/css', 'etag': '"v1"'}
+        response.body.return_value = b'body{}'
+
+        cache.handle(route)
+
+        route.fulfill.assert_called_once_with(response=response)
+        assert cache.get(url)[1] == b'body{}'
+        assert cache.misses == 1
+
+    def test_handle_does_not_store_error_response(self, cache):
+        """200以外のレスポンスは保存しないことを確認"""
+        url = 'https://www.ipcl-jp.com/js/missing.js'
+        route = self._route(url)
+        route.fetch.return_value.status = 404
+
+        cache.handle(route)
+
+        assert cache.get(url) is None
+
+    @pytest.mark.parametrize("resource_type,method", [('document', 'GET'), ('script', 'POST'), ('xhr', 'GET')])
+    def test_handle_falls_back_for_other_requests(self, cache, resource_type, method):
+        """対象外のリクエストは次のハンドラに渡されることを確認"""
+        route = self._route('https://www.ipcl-jp.com/order/create', resource_type, method)
+
+        cache.handle(route)
+
+        route.fallback.assert_called_once()
+        route.fetch.assert_not_called()
+
+    def test_handle_async_fulfills_cache_hit(self, cache):
+        """非同期版でもキャッシュヒット時にfulfillされることを確認"""
+        url = 'https://www.ipcl-jp.com/js/datepicker.js'
+        cache.put(url, {'content-type': 'application/javascript'}, b'dp')
+        cache._schedule_revalidation = Mock()
+        route = self._route(url)
+        route.fulfill = AsyncMock()
+
+        asyncio.run(cache.handle_async(route))
+
+        route.fulfill.assert_awaited_once()
+
+    @patch('service.asset_cache.urllib.request.urlopen')
+    def test_revalidate_sends_conditional_request_and_updates(self, mock_urlopen, cache):
+        """再検証時に条件付きリクエストを送り、更新された内容を保存することを確認"""
+        url = 'https://www.ipcl-jp.com/js/app.js'
+        response = MagicMock()
+        response.read.return_value = b'new'
+        response.headers.items.return_value = [('ETag', '"v2"'), ('Content-Type', 'application/javascript')]
+        response.geturl.return_value = url
+        mock_urlopen.return_value.__enter__.return_value = response
+
+        cache._revalidate(url, {'etag': '"v1"', 'last_modified': None})
+
+        request = mock_urlopen.call_args[0][0]
+        assert request.get_header('If-none-match') == '"v1"'
+        meta, body = cache.get(url)
+        assert body == b'new'
+        assert meta['etag'] == '"v2"'
+
+    @patch('service.asset_cache.urllib.request.urlopen')
+    def test_revalidate_keeps_entry_on_not_modified(self, mock_urlopen, cache):
+        """304の場合はキャッシュをそのまま使うことを確認"""
+        url = 'https://www.ipcl-jp.com/js/app.js'
+        cache.put(url, {'etag': '"v1"'}, b'old')
+        mock_urlopen.side_effect = urllib.error.HTTPError(url, 304, 'Not Modified', {}, None)
+
+        cache._revalidate(url, {'etag': '"v1"'})
+
+        assert cache.get(url)[1] == b'old'
+
+    @patch('service.asset_cache.urllib.request.urlopen')
+    def test_revalidate_ignores_redirect_to_login_page(self, mock_urlopen, cache):
+        """ログイン画面へリダイレクトされた応答でキャッシュを上書きしないことを確認"""
+        url = 'https://www.ipcl-jp.com/js/app.js'
+        cache.put(url, {'content-type': 'application/javascript'}, b'old')
+        response = MagicMock()
+        response.read.return_value = b'<html>login</html>'
+        response.headers.items.return_value = [('Content-Type', 'text/html; charset=utf-8')]
+        response.geturl.return_value = 'https://www.ipcl-jp.com/login'
+        mock_urlopen.return_value.__enter__.return_value = response
+
+        cache._revalidate(url, {})
+
+        assert cache.get(url)[1] == b'old'
+
+    @patch('service.asset_cache.urllib.request.urlopen')
+    def test_revalidate_ignores_unexpected_content_type(self, mock_urlopen, cache):
+        """URLが同じでもHTMLの応答は保存しないことを確認"""
+        url = 'https://www.ipcl-jp.com/js/app.js'
+        cache.put(url, {'content-type': 'application/javascript'}, b'old')
+        response = MagicMock()
+        response.read.return_value = b'<html>maintenance</html>'
+        response.headers.items.return_value = [('Content-Type', 'text/html')]
+        response.geturl.return_value = url
+        mock_urlopen.return_value.__enter__.return_value = response
+
+        cache._revalidate(url, {})
+
+        assert cache.get(url)[1] == b'old'
+
+    def test_handle_does_not_store_redirected_response(self, cache):
+        """リダイレクトされた応答は保存せず、そのまま返すことを確認"""
+        url = 'https://www.ipcl-jp.com/js/app.js'
+        route = self._route(url)
+        response = route.fetch.return_value
+        response.status = 200
+        response.url = 'https://www.ipcl-jp.com/login'
+        response.headers = {'content-type': 'text/html'}
+
+        cache.handle(route)
+
+        route.fulfill.assert_called_once_with(response=response)
+        assert cache.get(url) is None
+
+    def test_handle_falls_back_when_fetch_fails(self, cache):
+        """取得に失敗した場合はリクエストを止めずにブラウザ側の処理に任せることを確認"""
+        route = self._route('https://www.ipcl-jp.com/js/app.js')
+        route.fetch.side_effect = PlaywrightError("net::ERR_CONNECTION_RESET")
+
+        cache.handle(route)
+
+        route.fallback.assert_called_once()
+        route.fulfill.assert_not_called()
+
+    def test_handle_async_falls_back_when_fetch_fails(self, cache):
+        """非同期版でも取得に失敗した場合はfallbackすることを確認"""
+        route = self._route('https://www.ipcl-jp.com/js/app.js')
+        route.fetch = AsyncMock(side_effect=PlaywrightError("net::ERR_CONNECTION_RESET"))
+        route.fallback = AsyncMock()
+        route.fulfill = AsyncMock()
+
+        asyncio.run(cache.handle_async(route))
+
+        route.fallback.assert_awaited_once()
+        route.fulfill.assert_not_awaited()
+
+    def test_revalidation_scheduled_once_per_url(self, cache):
+        """同じURLの再検証は1回の実行につき1回だけであることを確認"""
+        cache._revalidate = Mock()
+
+        cache._schedule_revalidation('https://example.com/a.js', {})
+        cache._schedule_revalidation('https://example.com/a.js', {})
+        cache.close()
+
+        cache._revalidate.assert_called_once()
+
+    def test_from_config_disabled_returns_none(self):
+        """設定で無効化されている場合はNoneを返すことを確認"""
+        config = configparser.ConfigParser()
+        config.read_string("[AssetCache]\nenabled = False\n")
+
+        assert AssetCache.from_config(config) is None
+
+    def test_from_config_reads_settings(self, tmp_path):
+        """設定値が読み込まれることを確認"""
+        config = configparser.ConfigParser()
+        config.read_string(
+            f"[AssetCache]\nenabled = True\ncache_dir = {tmp_path / 'c'}\nmax_size_mb = 2\n"
+            "resource_types = script\n"
+        )
+
+        cache = AssetCache.from_config(config)
+
+        assert cache.cache_dir == tmp_path / 'c'
+        assert cache.max_bytes == 2 * 1024 * 1024
+        assert cache.resource_types == {'script'}
@@ -0,0 +1,139 @@
+import asyncio
+from unittest.mock import AsyncMock, Mock, patch
+
+from service.async_record_runner import AsyncRecordRunner
+from service.circuit_breaker import CircuitOpenError
+
+
+class TestAsyncRecordRunner:
+    """AsyncRecordRunnerのテストクラス"""
+
+    def _make_runner(self, concurrency, execute):
+        auth_service = Mock()
+        auth_service.storage_state = None
+        workflow_executor = Mock()
+        workflow_executor.execute = execute
+        runner = AsyncRecordRunner(concurrency, True, auth_service, workflow_executor)
+
+        browser = Mock()
+        context = Mock()
+        context.new_page = AsyncMock()
+        context.close = AsyncMock()
+        browser.new_context = AsyncMock(return_value=context)
+        runner._ensure_browser = AsyncMock(return_value=browser)
+        runner._shutdown = AsyncMock()
+        return runner, browser, context
+
+    def test_run_limits_concurrency(self):
+        """同時実行数がセマフォで制限されることを確認"""
+        state = {'running': 0, 'peak': 0}
+
+        async def execute(page, idx, total, data):
+            state['running'] += 1
+            state['peak'] = max(state['peak'], state['running'])
+            await asyncio.sleep(0.01)
+            state['running'] -= 1
+            return True, None
+
+        runner, _, _ = self._make_runner(2, execute)
+        records = [{'id': str(i), 'name': '患者', 'eye': '右眼'} for i in range(6)]
+
+        try:
+            results = runner.run(records)
+        finally:
+            runner.stop()
+
+        assert results == [True] * 6
+        assert state['peak'] == 2
+
+    def test_run_returns_results_in_record_order(self):
+        """結果がレコード順で返され、失敗が反映されることを確認"""
+        async def execute(page, idx, total, data):
+            await asyncio.sleep(0.01 * (total - idx))
+            return data['id'] != 'bad', None
+
+        runner, _, context = self._make_runner(3, execute)
+        records = [{'id': i, 'name': '患者', 'eye': '右眼'} for i in ['a', 'bad', 'c']]
+
+        try:
+            results = runner.run(records)
+        finally:
+            runner.stop()
+
+        assert results == [True, False, True]
+        assert context.close.await_count == 3
+
+    def test_run_marks_exception_as_failure(self):
+        """例外が発生したレコードは失敗として扱われることを確認"""
+        runner, _, _ = self._make_runner(2, AsyncMock(side_effect=RuntimeError("boom")))
+
+        try:
+            results = runner.run([{'id': '1', 'name': '患者', 'eye': '右眼'}])
+        finally:
+            runner.stop()
+
+        assert results == [False]
+
+    def test_new_context_uses_saved_session(self):
+        """保存済みのセッション状態でコンテキストが作成されることを確認"""
+        runner, browser, _ = self._make_runner(1, AsyncMock(return_value=(True, None)))
+        runner.auth_service.storage_state = {'cookies': [], 'origins': []}
+
+        try:
+            runner.run([{'id': '1', 'name': '患者', 'eye': '右眼'}])
+        finally:
+            runner.stop()
+
+        browser.new_context.assert_awaited_once_with(
+            accept_downloads=True, storage_state={'cookies': [], 'origins': []}
+        )
+
+    def test_open_circuit_fails_before_starting_browser(self):
+        """回路が開いている間はブラウザを起動せずに失敗することを確認"""
+        execute = AsyncMock(return_value=(True, None))
+        runner, _, _ = self._make_runner(1, execute)
+        runner.auth_service.circuit_breaker.check.side_effect = CircuitOpenError("接続先が応答しません")
+
+        try:
+            results = runner.run([{'id': '1', 'name': '患者', 'eye': '右眼'}])
+        finally:
+            runner.stop()
+
+        assert results == [False]
+        runner._ensure_browser.assert_not_awaited()
+        execute.assert_not_awaited()
+
+    def test_ensure_browser_starts_once_for_concurrent_records(self):
+        """同時に開始したレコードでもドライバとブラウザは1つだけ起動することを確認"""
+        runner = AsyncRecordRunner(4, True, Mock(), Mock())
+        playwright = Mock()
+        browser = Mock()
+        browser.is_connected.return_value = True
+
+        async def launch(headless):
+            await asyncio.sleep(0.01)
+            return browser
+
+        async def start():
+            await asyncio.sleep(0.01)
+            return playwright
+
+        playwright.chromium.launch = AsyncMock(side_effect=launch)
+        playwright.stop = AsyncMock()
+        browser.close = AsyncMock()
+
+        async def ensure_all():
+            return await asyncio.gather(*(runner._ensure_browser() for _ in range(4)))
+
+        with patch('service.async_record_runner.async_playwright') as mock_async_playwright:
+            mock_async_playwright.return_value.start = AsyncMock(side_effect=start)
+            runner._loop = asyncio.new_event_loop()
+            runner._browser_lock = asyncio.Lock()
+            try:
+                browsers = runner._loop.run_until_complete(ensure_all())
+            finally:
+                runner.stop()
+
+        assert browsers == [browser] * 4
+        mock_async_playwright.return_value.start.assert_awaited_once()
+        playwright.chromium.launch.assert_awaited_once()
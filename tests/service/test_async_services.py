@@ -0,0 +1,119 @@
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, Mock
+
+import pytest
+
+from service.async_services import AsyncAuthService, AsyncLensCalculatorService
+
+
+def make_async_page():
+    """非同期APIのページモックを作成する"""
+    page = MagicMock()
+    page.goto = AsyncMock()
+    page.wait_for_load_state = AsyncMock()
+    page.click = AsyncMock()
+    page.get_by_placeholder.return_value.fill = AsyncMock()
+    page.get_by_placeholder.return_value.is_visible = AsyncMock(return_value=False)
+    page.get_by_label.return_value.fill = AsyncMock()
+    page.context.storage_state = AsyncMock(return_value={'cookies': [{'name': 'session'}], 'origins': []})
+    page.context.add_cookies = AsyncMock()
+    page.locator.return_value.first.wait_for = AsyncMock()
+    return page
+
+
+class TestAsyncAuthService:
+    """AsyncAuthServiceのテストクラス"""
+
+    @pytest.fixture
+    def auth_service(self):
+        """AsyncAuthServiceインスタンスを提供するフィクスチャ"""
+        return AsyncAuthService("https://example.com", "test@example.com", "password123")
+
+    def test_login_stores_storage_state(self, auth_service):
+        """ログイン後にセッション状態が保存されることを確認"""
+        page = make_async_page()
+
+        asyncio.run(auth_service.login(page))
+
+        page.goto.assert_awaited_once_with("https://example.com")
+        page.click.assert_awaited_once_with('button:has-text("サインイン")')
+        assert auth_service.storage_state == {'cookies': [{'name': 'session'}], 'origins': []}
+
+    def test_concurrent_first_records_login_once(self, auth_service):
+        """同時に開始したレコードでもログインは1回だけ行われることを確認"""
+        async def slow_goto(url):
+            await asyncio.sleep(0.01)
+
+        pages = [make_async_page() for _ in range(3)]
+        for page in pages:
+            page.goto = AsyncMock(side_effect=slow_goto)
+
+        async def run():
+            await asyncio.gather(*(auth_service.ensure_logged_in(page) for page in pages))
+
+        asyncio.run(run())
+
+        login_count = sum(page.click.await_count for page in pages)
+        assert login_count == 1
+        cookie_count = sum(page.context.add_cookies.await_count for page in pages)
+        assert cookie_count == 2
+
+    def test_ensure_logged_in_relogs_when_session_expired(self, auth_service):
+        """ログインフォームが表示された場合に再ログインすることを確認"""
+        auth_service.storage_state = {'cookies': [], 'origins': []}
+        page = make_async_page()
+        page.get_by_placeholder.return_value.is_visible = AsyncMock(return_value=True)
+
+        asyncio.run(auth_service.ensure_logged_in(page))
+
+        page.click.assert_awaited_once_with('button:has-text("サインイン")')
+
+
+    def test_concurrent_expired_sessions_relogin_once(self, auth_service):
+        """同時にセッション切れを検知したレコードでも再ログインは1回だけ行われることを確認"""
+        async def slow_goto(url):
+            await asyncio.sleep(0.01)
+
+        auth_service.storage_state = {'cookies': [], 'origins': []}
+        pages = [make_async_page() for _ in range(3)]
+        for page in pages:
+            page.goto = AsyncMock(side_effect=slow_goto)
+            page.get_by_placeholder.return_value.is_visible = AsyncMock(return_value=True)
+
+        async def run():
+            await asyncio.gather(*(auth_service.ensure_logged_in(page) for page in pages))
+
+        asyncio.run(run())
+
+        login_count = sum(page.click.await_count for page in pages)
+        assert login_count == 1
+        cookie_count = sum(page.context.add_cookies.await_count for page in pages)
+        assert cookie_count == 2
+
+class TestAsyncLensCalculatorService:
+    """AsyncLensCalculatorServiceのテストクラス"""
+
+    def test_fill_measurement_data_right_eye_only(self):
+        """右眼のみの測定データが入力されることを確認"""
+        page = Mock()
+        frame = page.frame_locator.return_value
+        frame.locator.return_value.fill = AsyncMock()
+        data = {f'r_{key}': '1.0' for key in [
+            'sph', 'cyl', 'axis', 'acd', 'pachy', 'clr', 'k1', 'k1_axis', 'k2', 'sia', 'ins'
+        ]}
+
+        asyncio.run(AsyncLensCalculatorService().fill_measurement_data(page, data, '右眼'))
+
+        frame.locator.assert_any_call('input[name="OrderDetail[r_spherical]"]')
+        assert frame.locator.return_value.fill.await_count == 11
+        assert not [c for c in frame.locator.call_args_list if 'l_' in str(c)]
+
+    def test_select_lens_type_toric(self):
+        """乱視度数が0以外の場合にToricレンズが選択されることを確認"""
+        page = Mock()
+        frame = page.frame_locator.return_value
+        frame.locator.return_value.check = AsyncMock()
+
+        asyncio.run(AsyncLensCalculatorService.select_lens_type(page, {'l_cyl': '-1.5'}, '左眼'))
+
+        frame.locator.assert_called_once_with('input[name="OrderDetail[ipcl_l]"][value="IPCL V2.0 Toric"]')
@@ -1,8 +1,11 @@
+import threading
+import time
 from unittest.mock import Mock
 
 import pytest
 
 from service.auth_service import AuthService
+from service.circuit_breaker import CircuitBreaker, CircuitOpenError
 
 
 class TestAuthService:
@@ -22,6 +25,43 @@ class TestAuthService:
         """Playwrightのページモックを提供するフィクスチャ"""
         return Mock()
 
+    def test_login_waits_for_rate_limiter(self, mock_page):
+        """レート制限を指定した場合はログイン前に待機することを確認"""
+        rate_limiter = Mock()
+        rate_limiter.wait.side_effect = lambda action: mock_page.goto.assert_not_called()
+        auth_service = AuthService("https://example.com", "test@example.com", "password123", rate_limiter)
+
+        auth_service.login(mock_page)
+
+        rate_limiter.wait.assert_called_once_with('login')
+        mock_page.goto.assert_called_once_with("https://example.com")
+
+    def test_ensure_logged_in_fails_fast_while_circuit_open(self, mock_page):
+        """接続が遮断されている間はページを開かずに失敗することを確認"""
+        circuit_breaker = CircuitBreaker(failure_threshold=1, reset_seconds=60)
+        circuit_breaker.record_failure()
+        auth_service = AuthService("https://example.com", "test@example.com", "password123", None, circuit_breaker)
+
+        with pytest.raises(CircuitOpenError):
+            auth_service.ensure_logged_in(mock_page)
+
+        mock_page.goto.assert_not_called()
+
+    def test_ensure_logged_in_reports_failures_to_circuit_breaker(self, mock_page):
+        """ログインやページ遷移の失敗が続くと接続が遮断されることを確認"""
+        circuit_breaker = CircuitBreaker(failure_threshold=2, reset_seconds=60)
+        auth_service = AuthService("https://example.com", "test@example.com", "password123", None, circuit_breaker)
+        mock_page.goto.side_effect = RuntimeError("net::ERR_CONNECTION_REFUSED")
+
+        for _ in range(2):
+            with pytest.raises(RuntimeError):
+                auth_service.ensure_logged_in(mock_page)
+
+        assert circuit_breaker.is_open
+        with pytest.raises(CircuitOpenError):
+            auth_service.ensure_logged_in(mock_page)
+        assert mock_page.goto.call_count == 2
+
     def test_init_stores_credentials(self, auth_service):
         """初期化時に認証情報が正しく保存されることを確認"""
         assert auth_service.base_url == "https://example.com"
@@ -34,12 +74,14 @@ class TestAuthService:
 
         mock_page.goto.assert_called_once_with("https://example.com")
 
-    def test_login_waits_for_network_idle(self, auth_service, mock_page):
-        """ログイン時にネットワークアイドルを待機することを確認"""
+    def test_login_waits_for_login_form_and_order_form(self, auth_service, mock_page):
+        """ログイン時にネットワークアイドルではなくフォームの表示を待機することを確認"""
         auth_service.login(mock_page)
 
-        assert mock_page.wait_for_load_state.call_count == 2
-        mock_page.wait_for_load_state.assert_any_call('networkidle')
+        mock_page.wait_for_load_state.assert_not_called()
+        mock_page.locator.assert_any_call('input[placeholder="ログインID"]')
+        mock_page.locator.assert_any_call('#select2-order-sex-container')
+        mock_page.locator.return_value.first.wait_for.assert_any_call(state='visible', timeout=None)
 
     def test_login_fills_email_field(self, auth_service, mock_page):
         """ログイン時にメールフィールドを入力することを確認"""
@@ -90,3 +132,62 @@ class TestAuthService:
 
         with pytest.raises(Exception, match="Network error"):
             auth_service.login(mock_page)
+
+    def test_login_stores_storage_state(self, auth_service, mock_page):
+        """ログイン後にセッション状態が保存されることを確認"""
+        mock_page.context.storage_state.return_value = {'cookies': [], 'origins': []}
+
+        auth_service.login(mock_page)
+
+        assert auth_service.storage_state == {'cookies': [], 'origins': []}
+
+    def test_ensure_logged_in_without_session_logs_in(self, auth_service, mock_page):
+        """セッションが未保存の場合はログインすることを確認"""
+        auth_service.ensure_logged_in(mock_page)
+
+        mock_page.click.assert_called_once_with('button:has-text("サインイン")')
+
+    def test_ensure_logged_in_reuses_session(self, auth_service, mock_page):
+        """有効なセッションがある場合はログインを省略することを確認"""
+        auth_service.storage_state = {'cookies': [], 'origins': []}
+        mock_page.get_by_placeholder.return_value.is_visible.return_value = False
+
+        auth_service.ensure_logged_in(mock_page)
+
+        mock_page.goto.assert_called_once_with("https://example.com")
+        mock_page.click.assert_not_called()
+        mock_page.get_by_placeholder.return_value.fill.assert_not_called()
+
+    def test_ensure_logged_in_relogs_when_session_expired(self, auth_service, mock_page):
+        """ログインフォームが表示された場合に一度だけ再ログインすることを確認"""
+        auth_service.storage_state = {'cookies': [], 'origins': []}
+        mock_page.get_by_placeholder.return_value.is_visible.return_value = True
+        mock_page.context.storage_state.return_value = {'cookies': [{'name': 'new'}], 'origins': []}
+
+        auth_service.ensure_logged_in(mock_page)
+
+        mock_page.click.assert_called_once_with('button:has-text("サインイン")')
+        assert auth_service.storage_state == {'cookies': [{'name': 'new'}], 'origins': []}
+
+    def test_concurrent_expired_sessions_relogin_once(self, auth_service):
+        """複数のスレッドで同時にセッション切れを検知しても再ログインは1回だけ行われることを確認"""
+        auth_service.storage_state = {'cookies': [], 'origins': []}
+        pages = [Mock() for _ in range(3)]
+        barrier = threading.Barrier(len(pages))
+        for page in pages:
+            page.get_by_placeholder.return_value.is_visible.side_effect = lambda: barrier.wait() is not None
+            page.context.storage_state.side_effect = lambda: time.sleep(0.01) or {'cookies': [{'name': 'new'}]}
+
+        threads = [threading.Thread(target=auth_service.ensure_logged_in, args=(page,)) for page in pages]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        login_count = sum(page.click.call_count for page in pages)
+        assert login_count == 1
+        relogged = [page for page in pages if page.click.called][0]
+        for page in pages:
+            if page is not relogged:
+                page.context.add_cookies.assert_called_once_with([{'name': 'new'}])
+        assert auth_service.storage_state == {'cookies': [{'name': 'new'}]}
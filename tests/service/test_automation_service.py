@@ -4,6 +4,18 @@ from unittest.mock import Mock, patch
 import pytest
 
 from service.automation_service import IPCLOrderAutomation
+from service.patient_record import PatientRecord
+
+
+def valid_record(patient_id: str, **overrides) -> PatientRecord:
+    """検証を通過する右眼のレコードを作成する"""
+    data = {
+        'name': '患者', 'id': patient_id, 'sex': '男性', 'birthday': '19800515', 'surgery_date': '20240115',
+        'eye': '右眼', 'r_sph': '-5.00', 'r_cyl': '-1.50', 'r_axis': '90', 'r_acd': '3.2', 'r_k1': '43.5',
+        'r_k2': '44.0',
+    }
+    data.update(overrides)
+    return PatientRecord.from_mapping(data)
 
 
 class TestIPCLOrderAutomation:
@@ -13,7 +25,7 @@ class TestIPCLOrderAutomation:
     def mock_config(self):
         """設定モックを提供するフィクスチャ"""
         config = Mock()
-        config.get.side_effect = lambda section, key: {
+        config.get.side_effect = lambda section, key, fallback=None: {
             ('URL', 'base_url'): 'https://example.com',
             ('Paths', 'csv_dir'): 'C:\\test\\csv',
             ('Paths', 'calculated_dir'): 'C:\\test\\calculated',
@@ -21,6 +33,10 @@ class TestIPCLOrderAutomation:
             ('Paths', 'log_dir'): 'C:\\test\\log',
         }.get((section, key), '')
         config.getboolean.return_value = True
+        config.getint.side_effect = lambda section, key, fallback=None: {
+            ('Settings', 'timeout'): 5000,
+        }.get((section, key), fallback)
+        config.getfloat.side_effect = lambda section, key, fallback=None: fallback
         return config
 
     @pytest.fixture
@@ -69,7 +85,7 @@ class TestIPCLOrderAutomation:
         csv_dir = tmp_path / 'csv'
         csv_dir.mkdir(parents=True, exist_ok=True)
 
-        mock_config.get.side_effect = lambda section, key: {
+        mock_config.get.side_effect = lambda section, key, fallback=None: {
             ('URL', 'base_url'): 'https://example.com',
             ('Paths', 'csv_dir'): str(csv_dir),
             ('Paths', 'calculated_dir'): str(tmp_path / 'calculated'),
@@ -143,13 +159,13 @@ class TestIPCLOrderAutomation:
         mock_load_config.return_value = mock_config
 
         automation = IPCLOrderAutomation()
+        automation.progress_window.root = Mock()
         automation.progress_window.progress_label = Mock()
-        automation.progress_window.progress_window = Mock()
 
         automation.progress_window.update("テストメッセージ")
+        automation.progress_window._render()
 
         automation.progress_window.progress_label.config.assert_called_once_with(text="テストメッセージ")
-        automation.progress_window.progress_window.update.assert_called_once()
 
     @patch('service.automation_service.Path.mkdir')
     @patch('service.automation_service.load_environment_variables')
@@ -193,7 +209,7 @@ class TestIPCLOrderAutomation:
         calculated_dir = tmp_path / 'calculated'
         calculated_dir.mkdir(parents=True, exist_ok=True)
 
-        mock_config.get.side_effect = lambda section, key: {
+        mock_config.get.side_effect = lambda section, key, fallback=None: {
             ('URL', 'base_url'): 'https://example.com',
             ('Paths', 'csv_dir'): str(tmp_path),
             ('Paths', 'calculated_dir'): str(calculated_dir),
@@ -225,7 +241,7 @@ class TestIPCLOrderAutomation:
     @patch.dict(os.environ, {'EMAIL': 'test@example.com', 'PASSWORD': 'password123'})
     def test_process_all_csv_files_finds_csv_files(self, mock_load_config, mock_load_env, mock_config, tmp_path):
         """CSVファイルが見つかることを確認"""
-        mock_config.get.side_effect = lambda section, key: {
+        mock_config.get.side_effect = lambda section, key, fallback=None: {
             ('URL', 'base_url'): 'https://example.com',
             ('Paths', 'csv_dir'): str(tmp_path),
             ('Paths', 'calculated_dir'): str(tmp_path / 'calculated'),
@@ -244,21 +260,22 @@ class TestIPCLOrderAutomation:
         automation = IPCLOrderAutomation()
         automation.create_progress_window = Mock()
         automation.update_progress = Mock()
-        automation.process_csv_file = Mock()
+        automation.process_csv_files = Mock()
         automation.close_progress_window = Mock()
         automation.progress_window = Mock()
 
         automation.process_all_csv_files()
 
-        # 2つのCSVファイルが処理されることを確認
-        assert automation.process_csv_file.call_count == 2
+        # 2つのCSVファイルがまとめて処理されることを確認
+        automation.process_csv_files.assert_called_once()
+        assert sorted(automation.process_csv_files.call_args[0][0]) == [csv_file1, csv_file2]
 
     @patch('service.automation_service.load_environment_variables')
     @patch('service.automation_service.load_config')
     @patch.dict(os.environ, {'EMAIL': 'test@example.com', 'PASSWORD': 'password123'})
     def test_process_all_csv_files_handles_no_files(self, mock_load_config, mock_load_env, mock_config, tmp_path, caplog):
         """CSVファイルが見つからない場合の処理を確認"""
-        mock_config.get.side_effect = lambda section, key: {
+        mock_config.get.side_effect = lambda section, key, fallback=None: {
             ('URL', 'base_url'): 'https://example.com',
             ('Paths', 'csv_dir'): str(tmp_path),
             ('Paths', 'calculated_dir'): str(tmp_path / 'calculated'),
@@ -285,7 +302,7 @@ class TestIPCLOrderAutomation:
         error_dir = tmp_path / 'error'
         error_dir.mkdir(parents=True, exist_ok=True)
 
-        mock_config.get.side_effect = lambda section, key: {
+        mock_config.get.side_effect = lambda section, key, fallback=None: {
             ('URL', 'base_url'): 'https://example.com',
             ('Paths', 'csv_dir'): str(tmp_path),
             ('Paths', 'calculated_dir'): str(tmp_path / 'calculated'),
@@ -334,7 +351,7 @@ class TestIPCLOrderAutomation:
         csv_dir = tmp_path / 'csv'
         csv_dir.mkdir(parents=True, exist_ok=True)
 
-        mock_config.get.side_effect = lambda section, key: {
+        mock_config.get.side_effect = lambda section, key, fallback=None: {
             ('URL', 'base_url'): 'https://example.com',
             ('Paths', 'csv_dir'): str(csv_dir),
             ('Paths', 'calculated_dir'): str(tmp_path / 'calculated'),
@@ -359,3 +376,377 @@ class TestIPCLOrderAutomation:
                 # PLAYWRIGHT_BROWSERS_PATH環境変数が設定されることを確認
                 assert 'PLAYWRIGHT_BROWSERS_PATH' in os.environ
                 assert str(playwright_dir) in os.environ['PLAYWRIGHT_BROWSERS_PATH']
+
+    @patch('service.automation_service.Path.mkdir')
+    @patch('service.automation_service.load_environment_variables')
+    @patch('service.automation_service.load_config')
+    @patch.dict(os.environ, {'EMAIL': 'test@example.com', 'PASSWORD': 'password123'})
+    def test_process_single_record_uses_given_browser_manager(self, mock_load_config, mock_load_env, mock_mkdir, mock_config):
+        """指定されたBrowserManagerで新しいコンテキストを使って処理することを確認"""
+        mock_load_config.return_value = mock_config
+
+        automation = IPCLOrderAutomation()
+        automation.workflow_executor = Mock()
+        automation.workflow_executor.execute_in_new_context.return_value = True
+        automation.progress_window = Mock()
+        worker_browser_manager = Mock()
+        data = {'id': 'P001', 'name': '山田太郎', 'eye': '右眼'}
+
+        assert automation._process_single_record(1, 2, data) is True
+        assert automation._process_single_record(2, 2, data, browser_manager=worker_browser_manager) is True
+
+        calls = automation.workflow_executor.execute_in_new_context.call_args_list
+        assert calls[0].args == (automation.browser_manager, 1, 2, data)
+        assert calls[1].args == (worker_browser_manager, 2, 2, data)
+
+    @patch('service.automation_service.Path.mkdir')
+    @patch('service.automation_service.load_environment_variables')
+    @patch('service.automation_service.load_config')
+    @patch.dict(os.environ, {'EMAIL': 'test@example.com', 'PASSWORD': 'password123'})
+    def test_process_single_record_returns_false_on_error(self, mock_load_config, mock_load_env, mock_mkdir, mock_config):
+        """コンテキスト作成などで例外が発生した場合はFalseを返すことを確認"""
+        mock_load_config.return_value = mock_config
+
+        automation = IPCLOrderAutomation()
+        automation.workflow_executor = Mock()
+        automation.workflow_executor.execute_in_new_context.side_effect = Exception("launch failed")
+        automation.progress_window = Mock()
+
+        result = automation._process_single_record(1, 1, {'id': 'P001', 'name': '山田太郎', 'eye': '右眼'})
+
+        assert result is False
+
+    @patch('service.automation_service.load_environment_variables')
+    @patch('service.automation_service.load_config')
+    @patch.dict(os.environ, {'EMAIL': 'test@example.com', 'PASSWORD': 'password123'})
+    def test_process_csv_file_with_workers_splits_failed_rows_on_partial_failure(
+        self, mock_load_config, mock_load_env, mock_config, tmp_path
+    ):
+        """並列処理で一部のレコードが失敗した場合に、失敗した行だけを再処理用に分けることを確認"""
+        mock_config.get.side_effect = lambda section, key, fallback=None: {
+            ('Paths', 'csv_dir'): str(tmp_path),
+            ('Paths', 'calculated_dir'): str(tmp_path / 'calculated'),
+            ('Paths', 'error_dir'): str(tmp_path / 'error'),
+        }.get((section, key), '')
+        mock_config.getint.side_effect = lambda section, key, fallback=None: {
+            ('Settings', 'timeout'): 5000,
+            ('Settings', 'workers'): 2,
+        }.get((section, key), fallback)
+        mock_load_config.return_value = mock_config
+
+        automation = IPCLOrderAutomation()
+        assert automation.worker_pool.workers == 2
+
+        records = [valid_record(f'P{i}') for i in range(4)]
+        automation.csv_handler = Mock()
+        automation.csv_handler.read_csv_file.return_value = records
+        automation.worker_pool = Mock()
+        automation.worker_pool.map.return_value = [True, False, True, True]
+        automation.save_service.move_csv_to_calculated = Mock()
+        automation.save_service.move_csv_to_error = Mock()
+        automation.save_service.split_csv_by_result = Mock(return_value=tmp_path / 'error' / 'IPCLdata_retry.csv')
+
+        csv_path = tmp_path / "IPCLdata_001.csv"
+        automation.process_csv_file(csv_path)
+
+        jobs = automation.worker_pool.map.call_args[0][0]
+        assert [(idx, total, data.id) for idx, total, data in jobs] == [(1, 4, 'P0'), (2, 4, 'P1'), (3, 4, 'P2'), (4, 4, 'P3')]
+        automation.save_service.move_csv_to_calculated.assert_not_called()
+        automation.save_service.move_csv_to_error.assert_not_called()
+        automation.save_service.split_csv_by_result.assert_called_once_with(csv_path, {2}, tmp_path / 'error')
+
+    @patch('service.automation_service.load_environment_variables')
+    @patch('service.automation_service.load_config')
+    @patch.dict(os.environ, {'EMAIL': 'test@example.com', 'PASSWORD': 'password123'})
+    def test_process_csv_file_excludes_invalid_records_before_browser_work(
+        self, mock_load_config, mock_load_env, mock_config, tmp_path
+    ):
+        """検証で不備のあったレコードはブラウザ処理に渡さず、レポートに出力されることを確認"""
+        mock_config.get.side_effect = lambda section, key, fallback=None: {
+            ('Paths', 'csv_dir'): str(tmp_path),
+            ('Paths', 'calculated_dir'): str(tmp_path / 'calculated'),
+            ('Paths', 'error_dir'): str(tmp_path / 'error'),
+        }.get((section, key), '')
+        mock_load_config.return_value = mock_config
+
+        automation = IPCLOrderAutomation()
+        automation.csv_handler = Mock()
+        automation.csv_handler.read_csv_file.return_value = [
+            valid_record('P0'),
+            valid_record('P1', r_cyl='abc'),
+            valid_record('P2', eye='片眼'),
+        ]
+        automation.worker_pool = Mock()
+        automation.worker_pool.map.return_value = [True]
+        automation.save_service.split_csv_by_result = Mock(return_value=tmp_path / 'error' / 'IPCLdata_retry.csv')
+
+        csv_path = tmp_path / "IPCLdata_001.csv"
+        automation.process_csv_file(csv_path)
+
+        jobs = automation.worker_pool.map.call_args[0][0]
+        assert [(idx, total, data.id) for idx, total, data in jobs] == [(1, 1, 'P0')]
+        assert len(list((tmp_path / 'error').glob('IPCLdata_001_invalid_*.csv'))) == 1
+        automation.save_service.split_csv_by_result.assert_called_once_with(csv_path, {2, 3}, tmp_path / 'error')
+
+    @patch('service.automation_service.load_environment_variables')
+    @patch('service.automation_service.load_config')
+    @patch.dict(os.environ, {'EMAIL': 'test@example.com', 'PASSWORD': 'password123'})
+    def test_process_csv_file_skips_browser_when_all_records_invalid(
+        self, mock_load_config, mock_load_env, mock_config, tmp_path
+    ):
+        """全レコードが検証で除外された場合はブラウザ処理を行わないことを確認"""
+        mock_config.get.side_effect = lambda section, key, fallback=None: {
+            ('Paths', 'csv_dir'): str(tmp_path),
+            ('Paths', 'error_dir'): str(tmp_path / 'error'),
+        }.get((section, key), '')
+        mock_load_config.return_value = mock_config
+
+        automation = IPCLOrderAutomation()
+        automation.csv_handler = Mock()
+        automation.csv_handler.read_csv_file.return_value = [valid_record('P0', birthday='1980/05/15')]
+        automation._process_records = Mock()
+        automation.save_service.move_csv_to_error = Mock()
+
+        csv_path = tmp_path / "IPCLdata_001.csv"
+        automation.process_csv_file(csv_path)
+
+        automation._process_records.assert_not_called()
+        automation.save_service.move_csv_to_error.assert_called_once_with(csv_path, tmp_path / 'error')
+
+    @patch('service.automation_service.load_environment_variables')
+    @patch('service.automation_service.load_config')
+    @patch.dict(os.environ, {'EMAIL': 'test@example.com', 'PASSWORD': 'password123'})
+    def test_process_csv_file_skips_records_already_drafted(
+        self, mock_load_config, mock_load_env, mock_config, tmp_path
+    ):
+        """ジャーナルで下書き保存済みのレコードは再実行時に処理しないことを確認"""
+        mock_config.get.side_effect = lambda section, key, fallback=None: {
+            ('Paths', 'csv_dir'): str(tmp_path),
+            ('Paths', 'error_dir'): str(tmp_path / 'error'),
+            ('Journal', 'db_file'): str(tmp_path / 'journal.sqlite3'),
+        }.get((section, key), '')
+        mock_load_config.return_value = mock_config
+
+        automation = IPCLOrderAutomation()
+        records = [valid_record(f'P{i}') for i in range(3)]
+        automation.record_journal.record(records[0], True, 'C:\\pdf\\P0.pdf')
+        automation.csv_handler = Mock()
+        automation.csv_handler.read_csv_file.return_value = records
+        automation.worker_pool = Mock()
+        automation.worker_pool.map.return_value = [True, True]
+        automation.save_service.move_csv_to_calculated = Mock()
+        automation.save_service.move_csv_to_error = Mock()
+
+        csv_path = tmp_path / "IPCLdata_001.csv"
+        automation.process_csv_file(csv_path)
+        automation.record_journal.close()
+
+        jobs = automation.worker_pool.map.call_args[0][0]
+        assert [(idx, total, data.id) for idx, total, data in jobs] == [(1, 2, 'P1'), (2, 2, 'P2')]
+        automation.save_service.move_csv_to_calculated.assert_called_once_with(csv_path)
+        automation.save_service.move_csv_to_error.assert_not_called()
+
+    @patch('service.automation_service.load_environment_variables')
+    @patch('service.automation_service.load_config')
+    @patch.dict(os.environ, {'EMAIL': 'test@example.com', 'PASSWORD': 'password123'})
+    def test_keep_session_alive_refreshes_login_in_new_context(self, mock_load_config, mock_load_env, mock_config, tmp_path):
+        """ログイン状態の維持で新しいコンテキストを開いてログインを確認し、閉じることを確認"""
+        mock_config.get.side_effect = lambda section, key, fallback=None: {
+            ('Paths', 'csv_dir'): str(tmp_path),
+        }.get((section, key), '')
+        mock_load_config.return_value = mock_config
+
+        automation = IPCLOrderAutomation()
+        automation.browser_manager = Mock()
+        automation.auth_service = Mock()
+        automation.auth_service.storage_state = {'cookies': []}
+        context = automation.browser_manager.new_context.return_value
+        page = automation.browser_manager.create_page.return_value
+
+        automation.keep_session_alive()
+
+        automation.browser_manager.new_context.assert_called_once_with({'cookies': []})
+        page.set_default_timeout.assert_called_once_with(5000)
+        automation.auth_service.ensure_logged_in.assert_called_once_with(page)
+        context.close.assert_called_once()
+
+    @patch('service.automation_service.load_environment_variables')
+    @patch('service.automation_service.load_config')
+    @patch.dict(os.environ, {'EMAIL': 'test@example.com', 'PASSWORD': 'password123'})
+    def test_keep_session_alive_ignores_login_failure(self, mock_load_config, mock_load_env, mock_config, tmp_path):
+        """ログイン状態の確認に失敗しても例外を送出せず、コンテキストを閉じることを確認"""
+        mock_config.get.side_effect = lambda section, key, fallback=None: {
+            ('Paths', 'csv_dir'): str(tmp_path),
+        }.get((section, key), '')
+        mock_load_config.return_value = mock_config
+
+        automation = IPCLOrderAutomation()
+        automation.browser_manager = Mock()
+        automation.auth_service = Mock()
+        automation.auth_service.ensure_logged_in.side_effect = Exception('network down')
+
+        automation.keep_session_alive()
+
+        automation.browser_manager.new_context.return_value.close.assert_called_once()
+
+    @patch('service.automation_service.load_environment_variables')
+    @patch('service.automation_service.load_config')
+    @patch.dict(os.environ, {'EMAIL': 'test@example.com', 'PASSWORD': 'password123'})
+    def test_process_csv_files_orders_rows_across_files_by_surgery_date(
+        self, mock_load_config, mock_load_env, mock_config, tmp_path
+    ):
+        """複数ファイルの行を手術日が近い順、同じ日は到着の早いファイル順に処理することを確認"""
+        mock_config.get.side_effect = lambda section, key, fallback=None: {
+            ('Paths', 'csv_dir'): str(tmp_path),
+            ('Paths', 'error_dir'): str(tmp_path / 'error'),
+        }.get((section, key), '')
+        mock_load_config.return_value = mock_config
+
+        older = tmp_path / "IPCLdata_older.csv"
+        newer = tmp_path / "IPCLdata_newer.csv"
+        for csv_path, mtime in ((older, 1_000_000_000), (newer, 2_000_000_000)):
+            csv_path.write_text("test")
+            os.utime(csv_path, ns=(mtime, mtime))
+
+        automation = IPCLOrderAutomation()
+        automation.csv_handler = Mock()
+        automation.csv_handler.read_csv_file.side_effect = lambda path: {
+            older: [valid_record('O1', surgery_date='20240301'), valid_record('O2', surgery_date='20240110')],
+            newer: [valid_record('N1', surgery_date='20240110'), valid_record('N2', surgery_date='20240105')],
+        }[path]
+        automation.worker_pool = Mock()
+        automation.worker_pool.map.return_value = [True] * 4
+        automation.save_service.move_csv_to_calculated = Mock()
+
+        automation.process_csv_files([newer, older])
+
+        jobs = automation.worker_pool.map.call_args[0][0]
+        assert [(idx, data.id) for idx, total, data in jobs] == [(1, 'N2'), (2, 'O2'), (3, 'N1'), (4, 'O1')]
+        assert sorted(call.args[0] for call in automation.save_service.move_csv_to_calculated.call_args_list) == sorted(
+            [older, newer]
+        )
+
+    @patch('service.automation_service.load_environment_variables')
+    @patch('service.automation_service.load_config')
+    @patch.dict(os.environ, {'EMAIL': 'test@example.com', 'PASSWORD': 'password123'})
+    def test_process_csv_files_continues_when_moving_complete_file_fails(
+        self, mock_load_config, mock_load_env, mock_config, tmp_path
+    ):
+        """処理済みのファイルを移動できなくても、他のファイルの処理を続けることを確認"""
+        mock_config.get.side_effect = lambda section, key, fallback=None: {
+            ('Paths', 'csv_dir'): str(tmp_path),
+            ('Paths', 'error_dir'): str(tmp_path / 'error'),
+        }.get((section, key), '')
+        mock_load_config.return_value = mock_config
+
+        invalid = tmp_path / "IPCLdata_invalid.csv"
+        valid = tmp_path / "IPCLdata_valid.csv"
+        automation = IPCLOrderAutomation()
+        automation.csv_handler = Mock()
+        automation.csv_handler.read_csv_file.side_effect = lambda path: {
+            invalid: [valid_record('P0', birthday='1980/05/15')],
+            valid: [valid_record('P1')],
+        }[path]
+        automation.save_service.move_csv_to_error = Mock(side_effect=PermissionError('used by another process'))
+        automation.save_service.move_csv_to_calculated = Mock()
+        automation._process_records = Mock(return_value=[True])
+
+        automation.process_csv_files([invalid, valid])
+
+        automation._process_records.assert_called_once()
+        automation.save_service.move_csv_to_calculated.assert_called_once_with(valid)
+
+    @patch('service.automation_service.load_environment_variables')
+    @patch('service.automation_service.load_config')
+    @patch.dict(os.environ, {'EMAIL': 'test@example.com', 'PASSWORD': 'password123'})
+    def test_process_csv_files_moves_file_when_its_last_row_finishes(
+        self, mock_load_config, mock_load_env, mock_config, tmp_path
+    ):
+        """ファイルの最後の行が終わった時点で、他のファイルの処理を待たずに移動することを確認"""
+        mock_config.get.side_effect = lambda section, key, fallback=None: {
+            ('Paths', 'csv_dir'): str(tmp_path),
+            ('Paths', 'error_dir'): str(tmp_path / 'error'),
+        }.get((section, key), '')
+        mock_load_config.return_value = mock_config
+
+        soon = tmp_path / "IPCLdata_soon.csv"
+        later = tmp_path / "IPCLdata_later.csv"
+        automation = IPCLOrderAutomation()
+        automation.csv_handler = Mock()
+        automation.csv_handler.read_csv_file.side_effect = lambda path: {
+            soon: [valid_record('S1', surgery_date='20240105')],
+            later: [valid_record('L1', surgery_date='20240301')],
+        }[path]
+        events = []
+        automation.save_service.move_csv_to_calculated = Mock(side_effect=lambda path: events.append(('move', path)))
+        automation.save_service.move_csv_to_error = Mock(side_effect=lambda path, _: events.append(('error', path)))
+
+        def process(idx, total, data, browser_manager=None):
+            events.append(('record', data.id))
+            return data.id == 'S1'
+
+        automation._process_single_record = process
+
+        automation.process_csv_files([later, soon])
+
+        assert events == [('record', 'S1'), ('move', soon), ('record', 'L1'), ('error', later)]
+
+    @patch('service.automation_service.load_environment_variables')
+    @patch('service.automation_service.load_config')
+    @patch.dict(os.environ, {'EMAIL': 'test@example.com', 'PASSWORD': 'password123'})
+    def test_process_csv_files_parks_rows_while_circuit_open(
+        self, mock_load_config, mock_load_env, mock_config, tmp_path
+    ):
+        """監視モードでは接続の遮断中に失敗した行をエラーにせず保留し、そのファイルを返すことを確認"""
+        mock_config.get.side_effect = lambda section, key, fallback=None: {
+            ('Paths', 'csv_dir'): str(tmp_path),
+            ('Paths', 'error_dir'): str(tmp_path / 'error'),
+        }.get((section, key), '')
+        mock_load_config.return_value = mock_config
+
+        csv_path = tmp_path / "IPCLdata_001.csv"
+        automation = IPCLOrderAutomation()
+        automation.csv_handler = Mock()
+        automation.csv_handler.read_csv_file.return_value = [valid_record('P1'), valid_record('P2')]
+        automation.circuit_breaker = Mock(is_open=False)
+        automation.save_service = Mock()
+
+        def process(idx, total, data, browser_manager=None):
+            if data.id == 'P1':
+                return True
+            automation.circuit_breaker.is_open = True
+            return False
+
+        automation._process_single_record = process
+
+        parked = automation.process_csv_files([csv_path], park=True)
+
+        assert parked == [csv_path]
+        automation.save_service.park_csv_rows.assert_called_once_with(csv_path, {2}, set(), tmp_path / 'error')
+        automation.save_service.split_csv_by_result.assert_not_called()
+        automation.save_service.move_csv_to_error.assert_not_called()
+
+    @patch('service.automation_service.load_environment_variables')
+    @patch('service.automation_service.load_config')
+    @patch.dict(os.environ, {'EMAIL': 'test@example.com', 'PASSWORD': 'password123'})
+    def test_process_csv_files_fails_rows_while_circuit_open_without_park(
+        self, mock_load_config, mock_load_env, mock_config, tmp_path
+    ):
+        """一括処理では接続の遮断中に失敗した行も失敗として扱うことを確認"""
+        mock_config.get.side_effect = lambda section, key, fallback=None: {
+            ('Paths', 'csv_dir'): str(tmp_path),
+            ('Paths', 'error_dir'): str(tmp_path / 'error'),
+        }.get((section, key), '')
+        mock_load_config.return_value = mock_config
+
+        csv_path = tmp_path / "IPCLdata_001.csv"
+        automation = IPCLOrderAutomation()
+        automation.csv_handler = Mock()
+        automation.csv_handler.read_csv_file.return_value = [valid_record('P1')]
+        automation.circuit_breaker = Mock(is_open=True)
+        automation.save_service = Mock()
+        automation._process_single_record = Mock(return_value=False)
+
+        assert automation.process_csv_files([csv_path]) == []
+        automation.save_service.move_csv_to_error.assert_called_once_with(csv_path, tmp_path / 'error')
+        automation.save_service.park_csv_rows.assert_not_called()
@@ -0,0 +1,120 @@
+from unittest.mock import Mock, patch
+
+import pytest
+from playwright.sync_api import Error as PlaywrightError
+
+from service.browser_manager import BrowserManager
+
+
+class TestBrowserManager:
+    """BrowserManagerのテストクラス"""
+
+    @pytest.fixture
+    def mock_playwright(self):
+        """sync_playwrightのモックを提供するフィクスチャ"""
+        with patch('service.browser_manager.sync_playwright') as mock_sync_playwright:
+            playwright = Mock()
+            mock_sync_playwright.return_value.start.return_value = playwright
+            yield playwright
+
+    def test_new_context_starts_runtime_lazily(self, mock_playwright):
+        """初回のコンテキスト作成時にドライバとブラウザが起動することを確認"""
+        manager = BrowserManager(headless=True)
+
+        context = manager.new_context()
+
+        mock_playwright.chromium.launch.assert_called_once_with(headless=True)
+        browser = mock_playwright.chromium.launch.return_value
+        browser.new_context.assert_called_once_with(accept_downloads=True, storage_state=None)
+        assert context == browser.new_context.return_value
+
+    def test_new_context_reuses_browser(self, mock_playwright):
+        """複数のコンテキストで同じブラウザが再利用されることを確認"""
+        manager = BrowserManager()
+
+        manager.new_context()
+        manager.new_context()
+        manager.new_context()
+
+        mock_playwright.chromium.launch.assert_called_once()
+        assert mock_playwright.chromium.launch.return_value.new_context.call_count == 3
+
+    def test_new_context_relaunches_disconnected_browser(self, mock_playwright):
+        """ブラウザが切断された場合に再起動されることを確認"""
+        crashed_browser = Mock()
+        new_browser = Mock()
+        mock_playwright.chromium.launch.side_effect = [crashed_browser, new_browser]
+        manager = BrowserManager()
+
+        manager.new_context()
+        crashed_browser.is_connected.return_value = False
+        manager.new_context()
+
+        assert mock_playwright.chromium.launch.call_count == 2
+        new_browser.new_context.assert_called_once()
+
+    def test_new_context_relaunches_on_context_error(self, mock_playwright):
+        """コンテキスト作成に失敗した場合にブラウザを再起動して再試行することを確認"""
+        broken_browser = Mock()
+        broken_browser.new_context.side_effect = PlaywrightError("Target closed")
+        new_browser = Mock()
+        mock_playwright.chromium.launch.side_effect = [broken_browser, new_browser]
+        manager = BrowserManager()
+
+        context = manager.new_context()
+
+        assert context == new_browser.new_context.return_value
+        broken_browser.close.assert_called_once()
+
+    def test_stop_closes_browser_and_driver(self, mock_playwright):
+        """停止時にブラウザとドライバが終了することを確認"""
+        manager = BrowserManager()
+        manager.start()
+        browser = mock_playwright.chromium.launch.return_value
+
+        manager.stop()
+
+        browser.close.assert_called_once()
+        mock_playwright.stop.assert_called_once()
+        assert manager.is_running is False
+
+    def test_runtime_context_manager_stops_on_exit(self, mock_playwright):
+        """runtime()を抜けるとランタイムが停止することを確認"""
+        manager = BrowserManager()
+
+        with manager.runtime():
+            assert manager.is_running
+
+        mock_playwright.stop.assert_called_once()
+
+    def test_new_context_injects_storage_state(self, mock_playwright):
+        """保存済みのセッション状態がコンテキストに渡されることを確認"""
+        manager = BrowserManager()
+        storage_state = {'cookies': [{'name': 'session', 'value': 'abc'}], 'origins': []}
+
+        manager.new_context(storage_state)
+
+        mock_playwright.chromium.launch.return_value.new_context.assert_called_once_with(
+            accept_downloads=True, storage_state=storage_state
+        )
+
+    def test_create_context_registers_resource_blocker(self, mock_playwright):
+        """ResourceBlockerが設定されている場合にルートが登録されることを確認"""
+        resource_blocker = Mock()
+        manager = BrowserManager(resource_blocker=resource_blocker)
+
+        context = manager.new_context()
+
+        context.route.assert_called_once_with('**/*', resource_blocker.handle)
+        context.on.assert_called_once_with('response', resource_blocker.record_response)
+
+    def test_create_context_registers_asset_cache_before_blocker(self, mock_playwright):
+        """ブロック判定が先に評価されるよう、キャッシュのルートを先に登録することを確認"""
+        resource_blocker = Mock()
+        asset_cache = Mock()
+        manager = BrowserManager(resource_blocker=resource_blocker, asset_cache=asset_cache)
+
+        context = manager.new_context()
+
+        assert context.route.call_args_list[0].args == ('**/*', asset_cache.handle)
+        assert context.route.call_args_list[1].args == ('**/*', resource_blocker.handle)
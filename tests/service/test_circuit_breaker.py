@@ -0,0 +1,145 @@
+import configparser
+import multiprocessing
+from unittest.mock import Mock, patch
+
+import pytest
+
+from service.circuit_breaker import CircuitBreaker, CircuitOpenError
+
+
+def open_circuit_in_child(circuit_breaker):
+    circuit_breaker.record_failure()
+
+
+class TestCircuitBreaker:
+    """CircuitBreakerのテストクラス"""
+
+    def test_opens_after_consecutive_failures(self):
+        """連続失敗が閾値に達すると回路が開き、呼び出しを即座に失敗させることを確認"""
+        on_change = Mock()
+        circuit_breaker = CircuitBreaker(failure_threshold=3, reset_seconds=30, on_change=on_change)
+
+        for _ in range(2):
+            circuit_breaker.before_call()
+            circuit_breaker.record_failure()
+        assert not circuit_breaker.is_open
+
+        circuit_breaker.record_failure()
+
+        assert circuit_breaker.is_open
+        with pytest.raises(CircuitOpenError):
+            circuit_breaker.before_call()
+        on_change.assert_called_once()
+
+    def test_success_resets_failure_count(self):
+        """成功すると連続失敗回数が数え直しになることを確認"""
+        circuit_breaker = CircuitBreaker(failure_threshold=2, reset_seconds=30)
+
+        circuit_breaker.record_failure()
+        circuit_breaker.record_success()
+        circuit_breaker.record_failure()
+
+        assert not circuit_breaker.is_open
+
+    def test_half_open_allows_single_probe(self):
+        """待機時間が過ぎると1件だけ試行を通し、試行中は他の呼び出しを失敗させることを確認"""
+        circuit_breaker = CircuitBreaker(failure_threshold=1, reset_seconds=30)
+        with patch('service.circuit_breaker.time.time', return_value=1000.0):
+            circuit_breaker.record_failure()
+
+        with patch('service.circuit_breaker.time.time', return_value=1031.0):
+            assert not circuit_breaker.is_open
+            circuit_breaker.before_call()
+            assert circuit_breaker.is_open
+            with pytest.raises(CircuitOpenError):
+                circuit_breaker.before_call()
+
+    def test_successful_probe_closes_circuit(self):
+        """回復の確認に成功すると回路が閉じることを確認"""
+        circuit_breaker = CircuitBreaker(failure_threshold=1, reset_seconds=30)
+        with patch('service.circuit_breaker.time.time', return_value=1000.0):
+            circuit_breaker.record_failure()
+
+        with patch('service.circuit_breaker.time.time', return_value=1031.0):
+            circuit_breaker.before_call()
+            circuit_breaker.record_success()
+
+            assert not circuit_breaker.is_open
+            circuit_breaker.before_call()
+            circuit_breaker.before_call()
+
+    def test_failed_probe_reopens_circuit(self):
+        """回復の確認に失敗すると、その時点から再び待機することを確認"""
+        circuit_breaker = CircuitBreaker(failure_threshold=3, reset_seconds=30)
+        with patch('service.circuit_breaker.time.time', return_value=1000.0):
+            for _ in range(3):
+                circuit_breaker.record_failure()
+
+        with patch('service.circuit_breaker.time.time', return_value=1031.0):
+            circuit_breaker.before_call()
+            circuit_breaker.record_failure()
+
+        with patch('service.circuit_breaker.time.time', return_value=1050.0):
+            assert circuit_breaker.is_open
+        with patch('service.circuit_breaker.time.time', return_value=1062.0):
+            assert not circuit_breaker.is_open
+
+    def test_abandoned_probe_expires(self):
+        """試行中のワーカーが結果を返さなくても、reset_seconds経過後は次の試行を通すことを確認"""
+        circuit_breaker = CircuitBreaker(failure_threshold=1, reset_seconds=30)
+        with patch('service.circuit_breaker.time.time', return_value=1000.0):
+            circuit_breaker.record_failure()
+
+        with patch('service.circuit_breaker.time.time', return_value=1031.0):
+            circuit_breaker.before_call()
+
+        with patch('service.circuit_breaker.time.time', return_value=1060.0):
+            assert circuit_breaker.is_open
+            with pytest.raises(CircuitOpenError, match="約1秒"):
+                circuit_breaker.check()
+
+        with patch('service.circuit_breaker.time.time', return_value=1061.0):
+            assert not circuit_breaker.is_open
+            circuit_breaker.before_call()
+            circuit_breaker.record_success()
+            assert not circuit_breaker.is_open
+
+    def test_check_does_not_take_probe(self):
+        """checkは回復の確認の枠を取らないことを確認"""
+        circuit_breaker = CircuitBreaker(failure_threshold=1, reset_seconds=30)
+        with patch('service.circuit_breaker.time.time', return_value=1000.0):
+            circuit_breaker.record_failure()
+
+        with patch('service.circuit_breaker.time.time', return_value=1031.0):
+            circuit_breaker.check()
+            circuit_breaker.before_call()
+            with pytest.raises(CircuitOpenError):
+                circuit_breaker.check()
+
+    def test_from_config_disabled_by_default(self):
+        """設定がなければ接続の遮断を行わないことを確認"""
+        assert CircuitBreaker.from_config(configparser.ConfigParser()) is None
+
+    def test_from_config_reads_settings(self):
+        """CircuitBreakerセクションから閾値と待機時間を読み込むことを確認"""
+        config = configparser.ConfigParser()
+        config.read_dict({'CircuitBreaker': {'enabled': 'True', 'failure_threshold': '5', 'reset_seconds': '45'}})
+
+        circuit_breaker = CircuitBreaker.from_config(config)
+
+        assert circuit_breaker.failure_threshold == 5
+        assert circuit_breaker.reset_seconds == 45.0
+
+    def test_shared_state_across_processes(self):
+        """共有メモリ上の状態は、ワーカープロセスで開いた回路が親プロセスにも反映されることを確認"""
+        config = configparser.ConfigParser()
+        config.read_dict({'CircuitBreaker': {'enabled': 'True', 'failure_threshold': '1', 'reset_seconds': '60'}})
+        context = multiprocessing.get_context('spawn')
+        circuit_breaker = CircuitBreaker.from_config(config, context)
+
+        process = context.Process(target=open_circuit_in_child, args=(circuit_breaker,))
+        process.start()
+        process.join(timeout=30)
+
+        assert process.exitcode == 0
+        assert circuit_breaker.is_open
@@ -0,0 +1,157 @@
+import configparser
+import threading
+from unittest.mock import Mock
+
+from service.concurrency_controller import (
+    CONGESTION_SERVER_ERROR,
+    CONGESTION_TIMEOUT,
+    ConcurrencyController,
+    watch_server_errors,
+)
+from service.step_timer import RecordTimer
+
+
+def entry(success=True, congestion=None, **steps):
+    result = {'success': success, 'steps': steps or {'login': 1.0}}
+    if congestion:
+        result['congestion'] = congestion
+    return result
+
+
+class TestConcurrencyController:
+    """ConcurrencyControllerのテストクラス"""
+
+    def test_initial_limit_is_clamped_to_range(self):
+        """開始時の同時実行数が下限と上限の範囲に収まることを確認"""
+        assert ConcurrencyController(2, 4, initial=1).limit == 2
+        assert ConcurrencyController(2, 4, initial=8).limit == 4
+        assert ConcurrencyController(2, 4).limit == 2
+
+    def test_increases_by_one_after_limit_healthy_records(self):
+        """同時実行数と同じ件数が正常に終わるごとに1つ増えることを確認"""
+        controller = ConcurrencyController(1, 4, initial=2)
+
+        controller.observe(entry())
+        assert controller.limit == 2
+        controller.observe(entry())
+        assert controller.limit == 3
+
+    def test_never_exceeds_ceiling(self):
+        """上限を超えて増えないことを確認"""
+        controller = ConcurrencyController(1, 2, initial=2)
+
+        for _ in range(10):
+            controller.observe(entry())
+
+        assert controller.limit == 2
+
+    def test_timeout_halves_limit_down_to_floor(self):
+        """タイムアウトで同時実行数が半分になり、下限より下がらないことを確認"""
+        controller = ConcurrencyController(2, 8, initial=8)
+
+        controller.observe(entry(success=False, congestion=CONGESTION_TIMEOUT))
+        assert controller.limit == 4
+        controller.observe(entry(success=False, congestion=CONGESTION_SERVER_ERROR))
+        assert controller.limit == 2
+        controller.observe(entry(success=False, congestion=CONGESTION_TIMEOUT))
+        assert controller.limit == 2
+
+    def test_latency_spike_decreases_limit(self):
+        """基準値を大きく上回る所要時間のステップがあると同時実行数が減ることを確認"""
+        controller = ConcurrencyController(1, 8, initial=8)
+        for _ in range(3):
+            controller.observe(entry(calculate=1.0))
+        assert controller.limit == 8
+
+        controller.observe(entry(calculate=5.0))
+
+        assert controller.limit == 4
+
+    def test_small_absolute_change_is_not_a_spike(self):
+        """短いステップのわずかな揺れは急増とみなさないことを確認"""
+        controller = ConcurrencyController(1, 8, initial=8)
+        for _ in range(3):
+            controller.observe(entry(eye_tab=0.1))
+
+        controller.observe(entry(eye_tab=0.5))
+
+        assert controller.limit == 8
+
+    def test_failure_without_congestion_is_neutral(self):
+        """混雑の兆候がない失敗では増減しないことを確認"""
+        controller = ConcurrencyController(1, 4, initial=1)
+
+        controller.observe(entry(success=False))
+
+        assert controller.limit == 1
+
+    def test_records_in_flight_during_decrease_are_ignored(self):
+        """減らした時点で処理中だったレコードの結果では続けて減らさないことを確認"""
+        controller = ConcurrencyController(1, 8, initial=8)
+        for _ in range(3):
+            controller.acquire()
+
+        controller.observe(entry(success=False, congestion=CONGESTION_TIMEOUT))
+        controller.observe(entry(success=False, congestion=CONGESTION_TIMEOUT))
+        controller.observe(entry(success=False, congestion=CONGESTION_TIMEOUT))
+        assert controller.limit == 4
+
+        controller.observe(entry(success=False, congestion=CONGESTION_TIMEOUT))
+        assert controller.limit == 2
+
+    def test_on_change_reports_new_limit(self):
+        """同時実行数が変わると新しい値とメッセージが通知されることを確認"""
+        on_change = Mock()
+        controller = ConcurrencyController(1, 4, initial=1, on_change=on_change)
+
+        controller.observe(entry())
+
+        on_change.assert_called_once()
+        assert on_change.call_args[0][0] == 2
+        assert '1から2' in on_change.call_args[0][1]
+
+    def test_acquire_blocks_until_slot_is_released(self):
+        """同時実行数の枠が埋まっている間は、解放されるまで待つことを確認"""
+        controller = ConcurrencyController(1, 1)
+        controller.acquire()
+        acquired = threading.Event()
+
+        thread = threading.Thread(target=lambda: (controller.acquire(), acquired.set()))
+        thread.start()
+        assert not acquired.wait(0.1)
+        assert controller.try_acquire() is False
+
+        controller.release()
+        assert acquired.wait(1)
+        thread.join()
+
+    def test_from_config_disabled_by_default(self):
+        """adaptiveを有効にしない場合はNoneを返すことを確認"""
+        config = configparser.ConfigParser()
+
+        assert ConcurrencyController.from_config(config, 2) is None
+
+    def test_from_config_reads_limits(self):
+        """設定ファイルから下限・上限と開始値を読み込むことを確認"""
+        config = configparser.ConfigParser()
+        config.read_dict({'Concurrency': {'adaptive': 'True', 'min_workers': '2', 'max_workers': '6'}})
+
+        controller = ConcurrencyController.from_config(config, 3)
+
+        assert (controller.floor, controller.ceiling, controller.limit) == (2, 6, 3)
+
+
+class TestWatchServerErrors:
+    """watch_server_errorsのテストクラス"""
+
+    def test_marks_timer_on_5xx_response(self):
+        """5xx応答を受けるとサーバーエラーとして記録されることを確認"""
+        page = Mock()
+        timer = RecordTimer()
+        watch_server_errors(page, timer)
+        on_response = page.on.call_args[0][1]
+
+        on_response(Mock(status=200))
+        assert timer.congestion is None
+        on_response(Mock(status=503))
+        assert timer.congestion == CONGESTION_SERVER_ERROR
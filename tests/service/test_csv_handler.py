@@ -239,3 +239,73 @@ class TestCSVHandler:
         result = CSVHandler.read_csv_file(csv_path)
 
         assert result[0]['eye'] == eye_value
+
+    def test_read_csv_file_with_utf8_bom(self, create_csv_file):
+        """BOM付きUTF-8のCSVでもヘッダーが正しく読み込めることを確認"""
+        csv_path = create_csv_file(encoding='utf-8-sig')
+
+        result = CSVHandler.read_csv_file(csv_path)
+
+        assert len(result) == 1
+        assert result[0]['name'] == '山田太郎'
+
+    @pytest.mark.parametrize("encoding,expected", [
+        ('utf-8-sig', 'utf-8-sig'),
+        ('utf-8', 'utf-8'),
+        ('cp932', 'cp932'),
+    ])
+    def test_detect_encoding(self, create_csv_file, encoding, expected):
+        """先頭部分からエンコーディングを判定できることを確認"""
+        csv_path = create_csv_file(encoding=encoding)
+
+        assert CSVHandler.detect_encoding(csv_path) == expected
+
+    def test_detect_encoding_ignores_character_cut_at_sample_end(self, tmp_path, monkeypatch):
+        """判定用の先頭部分の末尾で文字が途切れてもUTF-8と判定することを確認"""
+        csv_path = tmp_path / "cut.csv"
+        csv_path.write_bytes('あいう'.encode('utf-8'))
+        monkeypatch.setattr('service.csv_handler.ENCODING_SAMPLE_SIZE', 4)
+
+        assert CSVHandler.detect_encoding(csv_path) == 'utf-8'
+
+    def test_iter_records_yields_records_in_order(self, tmp_path, sample_csv_data):
+        """iter_recordsが1行ずつ順番にレコードを返すことを確認"""
+        rows = [sample_csv_data[0].copy() for _ in range(3)]
+        for i, row in enumerate(rows):
+            row['ID'] = f'P{i}'
+
+        csv_path = tmp_path / "stream.csv"
+        with open(csv_path, 'w', newline='', encoding='cp932') as f:
+            writer = csv.DictWriter(f, fieldnames=rows[0].keys())
+            writer.writeheader()
+            writer.writerows(rows)
+
+        records = CSVHandler.iter_records(csv_path)
+
+        assert next(records)['id'] == 'P0'
+        assert [record['id'] for record in records] == ['P1', 'P2']
+
+    def test_detect_encoding_reads_past_ascii_only_sample(self, tmp_path, monkeypatch):
+        """先頭部分がASCIIのみの場合は、最初の非ASCII文字まで読み進めて判定することを確認"""
+        csv_path = tmp_path / "ascii_prefix.csv"
+        csv_path.write_bytes(b'name,ID\n' * 10 + '山田太郎,P1\n'.encode('cp932'))
+        monkeypatch.setattr('service.csv_handler.ENCODING_SAMPLE_SIZE', 16)
+
+        assert CSVHandler.detect_encoding(csv_path) == 'cp932'
+
+    def test_read_csv_file_does_not_duplicate_rows(self, tmp_path, sample_csv_data, monkeypatch):
+        """日本語を含む行が判定用の先頭部分より後ろにあっても、各行を1回だけ読み込むことを確認"""
+        ascii_row = {key: 'x' for key in sample_csv_data[0]}
+        rows = [ascii_row] * 50 + [sample_csv_data[0]]
+        monkeypatch.setattr('service.csv_handler.ENCODING_SAMPLE_SIZE', 1024)
+
+        csv_path = tmp_path / "mixed.csv"
+        with open(csv_path, 'w', newline='', encoding='cp932') as f:
+            writer = csv.DictWriter(f, fieldnames=sample_csv_data[0].keys())
+            writer.writeheader()
+            writer.writerows(rows)
+
+        result = CSVHandler.read_csv_file(csv_path)
+
+        assert len(result) == 51
+        assert result[-1]['name'] == '山田太郎'
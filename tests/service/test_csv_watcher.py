@@ -0,0 +1,83 @@
+import os
+from unittest.mock import patch
+
+from service.csv_watcher import CsvWatcher
+
+
+def write_csv(path, content='header\nrow\n', mtime_ns=None):
+    path.write_text(content, encoding='utf-8')
+    if mtime_ns is not None:
+        os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+class TestCsvWatcher:
+    """CsvWatcherのテストクラス"""
+
+    def test_poll_returns_file_after_size_is_stable(self, tmp_path):
+        """サイズと更新日時が連続して変わらなかったファイルだけを返すことを確認"""
+        csv_path = tmp_path / 'IPCLdata_001.csv'
+        write_csv(csv_path)
+        watcher = CsvWatcher(tmp_path, stable_checks=2)
+
+        assert watcher.poll() == []
+        assert watcher.poll() == [csv_path]
+
+    def test_poll_waits_while_file_is_growing(self, tmp_path):
+        """書き込み中でサイズが変わり続けるファイルは返さないことを確認"""
+        csv_path = tmp_path / 'IPCLdata_001.csv'
+        watcher = CsvWatcher(tmp_path, stable_checks=2)
+
+        write_csv(csv_path, 'header\n')
+        assert watcher.poll() == []
+        write_csv(csv_path, 'header\nrow1\n')
+        assert watcher.poll() == []
+        assert watcher.poll() == [csv_path]
+
+    def test_poll_returns_each_file_once(self, tmp_path):
+        """一度返したファイルは変更されない限り再び返さないことを確認"""
+        csv_path = tmp_path / 'IPCLdata_001.csv'
+        write_csv(csv_path)
+        watcher = CsvWatcher(tmp_path, stable_checks=1)
+
+        assert watcher.poll() == [csv_path]
+        assert watcher.poll() == []
+
+    def test_release_returns_file_again(self, tmp_path):
+        """保留して解放したファイルは、変更されていなくても再び返すことを確認"""
+        csv_path = tmp_path / 'IPCLdata_001.csv'
+        write_csv(csv_path)
+        watcher = CsvWatcher(tmp_path, stable_checks=1)
+
+        assert watcher.poll() == [csv_path]
+        watcher.release(csv_path)
+        assert watcher.poll() == [csv_path]
+
+    def test_poll_ignores_files_not_matching_pattern(self, tmp_path):
+        """IPCLdata_*.csv以外のファイルは対象外であることを確認"""
+        write_csv(tmp_path / 'other.csv')
+        watcher = CsvWatcher(tmp_path, stable_checks=1)
+
+        assert watcher.poll() == []
+
+    def test_poll_returns_replaced_file_with_same_name(self, tmp_path):
+        """処理後に移動され、同じ名前で置かれた新しいファイルも返すことを確認"""
+        csv_path = tmp_path / 'IPCLdata_001.csv'
+        write_csv(csv_path, mtime_ns=1_000_000_000)
+        watcher = CsvWatcher(tmp_path, stable_checks=1)
+        assert watcher.poll() == [csv_path]
+
+        csv_path.unlink()
+        assert watcher.poll() == []
+
+        write_csv(csv_path, mtime_ns=1_000_000_000)
+        assert watcher.poll() == [csv_path]
+
+    def test_poll_skips_file_that_cannot_be_opened(self, tmp_path):
+        """他のプロセスがロックしていて開けないファイルは次回以降に回すことを確認"""
+        csv_path = tmp_path / 'IPCLdata_001.csv'
+        write_csv(csv_path)
+        watcher = CsvWatcher(tmp_path, stable_checks=1)
+
+        with patch('builtins.open', side_effect=PermissionError('locked')):
+            assert watcher.poll() == []
+        assert watcher.poll() == [csv_path]
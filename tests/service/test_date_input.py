@@ -0,0 +1,72 @@
+import asyncio
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+from playwright.sync_api import Error as PlaywrightError, TimeoutError as PlaywrightTimeoutError
+
+from service.date_input import (
+    KEYBOARD_STRATEGY,
+    SCRIPT_STRATEGY,
+    SET_DATE_SCRIPT,
+    fill_date,
+    fill_date_async,
+)
+
+
+class TestFillDate:
+    """fill_dateのテストクラス"""
+
+    def test_script_strategy_when_value_accepted(self):
+        """直接設定した値が受け付けられた場合はキー入力を行わないことを確認"""
+        locator = Mock()
+        locator.evaluate.return_value = '15/05/1980'
+
+        strategy = fill_date(locator, '15/05/1980')
+
+        assert strategy == SCRIPT_STRATEGY
+        locator.evaluate.assert_called_once_with(SET_DATE_SCRIPT, '15/05/1980')
+        locator.type.assert_not_called()
+
+    def test_keyboard_strategy_when_value_differs(self):
+        """受け付けられた値が異なる場合は入力欄をクリアしてキー入力することを確認"""
+        locator = Mock()
+        locator.evaluate.return_value = '05/15/1980'
+
+        strategy = fill_date(locator, '15/05/1980')
+
+        assert strategy == KEYBOARD_STRATEGY
+        locator.clear.assert_called_once()
+        locator.type.assert_called_once_with('15/05/1980', delay=100)
+        locator.press.assert_called_once_with('Enter')
+
+    def test_keyboard_strategy_when_script_fails(self):
+        """直接設定に失敗した場合はキー入力にフォールバックすることを確認"""
+        locator = Mock()
+        locator.evaluate.side_effect = PlaywrightError("Execution context was destroyed")
+
+        strategy = fill_date(locator, '15/05/1980')
+
+        assert strategy == KEYBOARD_STRATEGY
+        locator.clear.assert_not_called()
+        locator.type.assert_called_once_with('15/05/1980', delay=100)
+
+    def test_missing_input_raises_without_typing(self):
+        """入力欄が見つからない場合はキー入力を試さずに例外を送出することを確認"""
+        locator = Mock()
+        locator.evaluate.side_effect = PlaywrightTimeoutError("Timeout 5000ms exceeded")
+
+        with pytest.raises(PlaywrightTimeoutError):
+            fill_date(locator, '15/05/1980')
+
+        locator.type.assert_not_called()
+
+    def test_async_script_strategy(self):
+        """非同期APIでも直接設定が使われることを確認"""
+        locator = Mock()
+        locator.evaluate = AsyncMock(return_value='15/05/1980')
+        locator.type = AsyncMock()
+
+        strategy = asyncio.run(fill_date_async(locator, '15/05/1980'))
+
+        assert strategy == SCRIPT_STRATEGY
+        locator.type.assert_not_awaited()
@@ -1,7 +1,9 @@
 import pytest
 from unittest.mock import Mock
 
-from service.lens_calculator_service import LensCalculatorService
+from playwright.sync_api import Error as PlaywrightError
+
+from service.lens_calculator_service import BULK_FILL_SCRIPT, LensCalculatorService
 
 
 class TestLensCalculatorService:
@@ -114,7 +116,7 @@ class TestLensCalculatorService:
 
     def test_fill_measurement_data_both_eyes(self, mock_page, mock_frame, measurement_data):
         """両眼の測定データが入力されることを確認"""
-        LensCalculatorService.fill_measurement_data(mock_page, measurement_data, '両眼')
+        LensCalculatorService().fill_measurement_data(mock_page, measurement_data, '両眼')
 
         # 右眼データ
         mock_frame.locator.assert_any_call('input[name="OrderDetail[r_spherical]"]')
@@ -126,7 +128,7 @@ class TestLensCalculatorService:
 
     def test_fill_measurement_data_right_eye_only(self, mock_page, mock_frame, measurement_data):
         """右眼のみの測定データが入力されることを確認"""
-        LensCalculatorService.fill_measurement_data(mock_page, measurement_data, '右眼')
+        LensCalculatorService().fill_measurement_data(mock_page, measurement_data, '右眼')
 
         # 右眼データのみ入力されることを確認
         mock_frame.locator.assert_any_call('input[name="OrderDetail[r_spherical]"]')
@@ -138,7 +140,7 @@ class TestLensCalculatorService:
 
     def test_fill_measurement_data_left_eye_only(self, mock_page, mock_frame, measurement_data):
         """左眼のみの測定データが入力されることを確認"""
-        LensCalculatorService.fill_measurement_data(mock_page, measurement_data, '左眼')
+        LensCalculatorService().fill_measurement_data(mock_page, measurement_data, '左眼')
 
         # 左眼データのみ入力されることを確認
         mock_frame.locator.assert_any_call('input[name="OrderDetail[l_spherical]"]')
@@ -175,6 +177,14 @@ class TestLensCalculatorService:
         mock_frame.locator.assert_any_call('input[name="OrderDetail[ipcl_r]"][value="IPCL V2.0 Mono"]')
         mock_frame.locator.assert_any_call('input[name="OrderDetail[ipcl_l]"][value="IPCL V2.0 Toric"]')
 
+    def test_select_lens_type_uses_precomputed_lens_type(self, mock_page, mock_frame):
+        """検証時に求めたレンズタイプがあれば、乱視度数から求め直さないことを確認"""
+        data = {'r_cyl': 'invalid', 'r_lens_type': 'IPCL V2.0 Mono'}
+
+        LensCalculatorService.select_lens_type(mock_page, data, '右眼')
+
+        mock_frame.locator.assert_any_call('input[name="OrderDetail[ipcl_r]"][value="IPCL V2.0 Mono"]')
+
     def test_select_lens_type_right_eye_only(self, mock_page, mock_frame):
         """右眼のみのレンズタイプ選択を確認"""
         data = {'r_cyl': '-1.0', 'l_cyl': '0'}
@@ -193,7 +203,7 @@ class TestLensCalculatorService:
 
     def test_fill_ata_wtw_data_both_eyes(self, mock_page, mock_frame, ata_wtw_data):
         """両眼のATA/WTWデータが入力されることを確認"""
-        LensCalculatorService.fill_ata_wtw_data(mock_page, ata_wtw_data, '両眼')
+        LensCalculatorService().fill_ata_wtw_data(mock_page, ata_wtw_data, '両眼')
 
         # 右眼データ
         mock_frame.locator.assert_any_call('input[name="OrderDetail[r_ata]"]')
@@ -207,7 +217,7 @@ class TestLensCalculatorService:
 
     def test_fill_ata_wtw_data_right_eye_only(self, mock_page, mock_frame, ata_wtw_data):
         """右眼のみのATA/WTWデータが入力されることを確認"""
-        LensCalculatorService.fill_ata_wtw_data(mock_page, ata_wtw_data, '右眼')
+        LensCalculatorService().fill_ata_wtw_data(mock_page, ata_wtw_data, '右眼')
 
         # 右眼データのみ入力
         mock_frame.locator.assert_any_call('input[name="OrderDetail[r_ata]"]')
@@ -219,7 +229,7 @@ class TestLensCalculatorService:
 
     def test_fill_ata_wtw_data_left_eye_only(self, mock_page, mock_frame, ata_wtw_data):
         """左眼のみのATA/WTWデータが入力されることを確認"""
-        LensCalculatorService.fill_ata_wtw_data(mock_page, ata_wtw_data, '左眼')
+        LensCalculatorService().fill_ata_wtw_data(mock_page, ata_wtw_data, '左眼')
 
         # 左眼データのみ入力
         mock_frame.locator.assert_any_call('input[name="OrderDetail[l_ata]"]')
@@ -231,7 +241,7 @@ class TestLensCalculatorService:
 
     def test_click_calculate_button_clicks_and_waits(self, mock_page, mock_frame):
         """計算ボタンがクリックされることを確認"""
-        LensCalculatorService.click_calculate_button(mock_page)
+        LensCalculatorService().click_calculate_button(mock_page)
 
         mock_frame.locator.assert_called_once_with('button#btn-calculate')
         mock_frame.locator.return_value.click.assert_called_once()
@@ -261,3 +271,38 @@ class TestLensCalculatorService:
         LensCalculatorService.select_lens_type(mock_page, data, '右眼')
 
         mock_frame.locator.assert_called_with(f'input[name="OrderDetail[ipcl_r]"][value="{expected_lens}"]')
+
+    def test_bulk_fill_uses_single_evaluate(self, mock_page, mock_frame, measurement_data):
+        """一括入力モードでは1回のevaluateで全項目を設定し、個別入力を行わないことを確認"""
+        mock_frame.locator.return_value.evaluate.side_effect = lambda script, values: dict(values)
+
+        LensCalculatorService(bulk_fill=True).fill_measurement_data(mock_page, measurement_data, '両眼')
+
+        mock_frame.locator.return_value.evaluate.assert_called_once()
+        script, values = mock_frame.locator.return_value.evaluate.call_args.args
+        assert script == BULK_FILL_SCRIPT
+        assert len(values) == 22
+        assert values['input[name="OrderDetail[r_spherical]"]'] == '-5.00'
+        mock_frame.locator.return_value.fill.assert_not_called()
+
+    def test_bulk_fill_falls_back_for_mismatched_fields(self, mock_page, mock_frame, ata_wtw_data):
+        """読み戻した値が一致しない項目のみ個別に入力されることを確認"""
+        def read_back(script, values):
+            result = dict(values)
+            result['input[name="OrderDetail[r_ata]"]'] = ''
+            return result
+
+        mock_frame.locator.return_value.evaluate.side_effect = read_back
+
+        LensCalculatorService(bulk_fill=True).fill_ata_wtw_data(mock_page, ata_wtw_data, '右眼')
+
+        mock_frame.locator.return_value.fill.assert_called_once_with('5.0')
+        mock_frame.locator.assert_called_with('input[name="OrderDetail[r_ata]"]')
+
+    def test_bulk_fill_falls_back_when_evaluate_fails(self, mock_page, mock_frame, ata_wtw_data):
+        """一括入力が失敗した場合は全項目を個別に入力することを確認"""
+        mock_frame.locator.return_value.evaluate.side_effect = PlaywrightError("Execution context was destroyed")
+
+        LensCalculatorService(bulk_fill=True).fill_ata_wtw_data(mock_page, ata_wtw_data, '両眼')
+
+        assert mock_frame.locator.return_value.fill.call_count == 6
@@ -0,0 +1,86 @@
+import dataclasses
+import pickle
+
+import pytest
+
+from scripts.benchmark import CSV_HEADER
+from service.patient_record import RECORD_KEYS, EyeMeasurements, HeaderIndex, PatientRecord
+
+
+class TestPatientRecord:
+    """PatientRecordのテストクラス"""
+
+    @pytest.fixture
+    def header(self):
+        """列の並びを入れ替えたヘッダーを提供するフィクスチャ"""
+        return list(reversed(CSV_HEADER))
+
+    @pytest.fixture
+    def row(self, header):
+        """列名をそのまま値にした行を提供するフィクスチャ"""
+        return [f'v:{column}' for column in header]
+
+    @pytest.fixture
+    def record(self, header, row):
+        """ヘッダーの列番号から組み立てたレコードを提供するフィクスチャ"""
+        return PatientRecord.from_row(row, HeaderIndex(header))
+
+    def test_from_row_uses_header_positions(self, record):
+        """列の並び順によらず、列名に対応する値が設定されることを確認"""
+        assert record.id == 'v:ID'
+        assert record.surgery_date == 'v:surgerydate'
+        assert record.right.pachy == 'v:R_Pachy(CCT)'
+        assert record.left.ata == 'v:L_\tATA'
+        assert isinstance(record.right, EyeMeasurements)
+
+    def test_dict_like_access_uses_legacy_keys(self, record):
+        """従来の辞書と同じキーで値を参照できることを確認"""
+        assert record['name'] == 'v:name'
+        assert record['r_k1_axis'] == 'v:R_K1Axis'
+        assert record['l_casia_wtw_m'] == 'v:L_CASIA_WTW_M'
+        assert 'r_caliper_wtw' in record
+        assert 'unknown' not in record
+        assert record.get('unknown') is None
+
+    def test_unknown_key_raises_key_error(self, record):
+        """存在しないキーではKeyErrorが発生することを確認"""
+        with pytest.raises(KeyError):
+            record['r_unknown']
+
+    def test_to_dict_matches_legacy_key_order(self, record):
+        """辞書に変換すると従来の34キーが同じ順序で並ぶことを確認"""
+        converted = record.to_dict()
+
+        assert list(converted) == list(RECORD_KEYS)
+        assert len(converted) == 34
+        assert dict(record) == converted
+
+    def test_record_is_immutable(self, record):
+        """レコードと片眼分の測定値が変更できないことを確認"""
+        with pytest.raises(dataclasses.FrozenInstanceError):
+            record.name = 'changed'
+        with pytest.raises(AttributeError):
+            record.right.sph = '0'
+
+    def test_record_has_no_instance_dict(self, record):
+        """__slots__により、インスタンスごとの__dict__を持たないことを確認"""
+        assert not hasattr(record, '__dict__')
+        assert not hasattr(record.right, '__dict__')
+
+    def test_short_row_is_padded_with_empty_strings(self, header):
+        """列が足りない行は空文字で補われることを確認"""
+        # 逆順のヘッダーなので先頭の列は L_Caliper_WTW
+        record = PatientRecord.from_row(['v:x'], HeaderIndex(header))
+
+        assert record.left.caliper_wtw == 'v:x'
+        assert record.name == ''
+        assert record.right.sph == ''
+
+    def test_missing_column_raises_key_error(self):
+        """必要な列がないヘッダーではKeyErrorが発生することを確認"""
+        with pytest.raises(KeyError, match='surgerydate'):
+            HeaderIndex([column for column in CSV_HEADER if column != 'surgerydate'])
+
+    def test_record_survives_pickle(self, record):
+        """プロセス間でやり取りできるよう、pickleで復元できることを確認"""
+        assert pickle.loads(pickle.dumps(record)) == record
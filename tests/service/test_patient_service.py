@@ -3,6 +3,7 @@ from unittest.mock import Mock
 import pytest
 
 from service.patient_service import PatientService
+from service.strategy_registry import StrategyRegistry
 
 
 class TestPatientService:
@@ -27,22 +28,23 @@ class TestPatientService:
 
     def test_fill_patient_info_fills_patient_id(self, mock_page, patient_data):
         """患者IDが正しく入力されることを確認"""
-        PatientService.fill_patient_info(mock_page, patient_data)
+        PatientService().fill_patient_info(mock_page, patient_data)
 
         mock_page.get_by_label.assert_any_call("患者ID")
         mock_page.get_by_label.return_value.fill.assert_any_call('P12345')
 
     def test_fill_patient_info_waits_for_dom(self, mock_page, patient_data):
-        """ネットワークアイドル状態を待機することを確認"""
-        PatientService.fill_patient_info(mock_page, patient_data)
+        """注文フォームの性別欄が表示されるまで待機することを確認"""
+        PatientService().fill_patient_info(mock_page, patient_data)
 
-        mock_page.wait_for_load_state.assert_called_with('networkidle')
+        mock_page.wait_for_load_state.assert_not_called()
+        mock_page.locator.return_value.first.wait_for.assert_any_call(state='visible', timeout=None)
 
     def test_fill_patient_info_with_male_sex(self, mock_page, patient_data):
         """男性の性別選択が正しく行われることを確認"""
         patient_data['sex'] = '男性'
 
-        PatientService.fill_patient_info(mock_page, patient_data)
+        PatientService().fill_patient_info(mock_page, patient_data)
 
         # Select2クリックを確認
         mock_page.locator.assert_any_call('#select2-order-sex-container')
@@ -51,30 +53,54 @@ class TestPatientService:
         """女性の性別選択が正しく行われることを確認"""
         patient_data['sex'] = '女性'
 
-        PatientService.fill_patient_info(mock_page, patient_data)
+        PatientService().fill_patient_info(mock_page, patient_data)
 
         # Select2クリックを確認
         mock_page.locator.assert_any_call('#select2-order-sex-container')
 
     def test_fill_patient_info_fills_surgery_date(self, mock_page, patient_data):
         """手術日が正しく入力されることを確認"""
-        PatientService.fill_patient_info(mock_page, patient_data)
+        PatientService().fill_patient_info(mock_page, patient_data)
 
         mock_page.get_by_label.assert_any_call("手術日")
 
     def test_fill_patient_info_handles_sex_selection_error(self, mock_page, patient_data):
         """性別選択エラーを適切に処理することを確認"""
-        mock_page.locator.side_effect = Exception("Element not found")
+        # 1回目は注文フォームの待機、2回目以降が性別選択
+        mock_page.locator.side_effect = [Mock(), Exception("Element not found")]
 
         # エラーが発生しても処理が継続することを確認
-        PatientService.fill_patient_info(mock_page, patient_data)
+        PatientService().fill_patient_info(mock_page, patient_data)
 
     def test_fill_patient_info_handles_surgery_date_error(self, mock_page, patient_data):
         """手術日入力エラーを適切に処理することを確認"""
         mock_page.get_by_label.side_effect = [Mock(), Exception("Date field error"), Mock()]
 
         # エラーが発生しても処理が継続することを確認
-        PatientService.fill_patient_info(mock_page, patient_data)
+        PatientService().fill_patient_info(mock_page, patient_data)
+
+    def test_fill_patient_info_tries_learned_sex_strategy_first(self, mock_page, patient_data):
+        """前回成功したラベル方式で性別を選択し、select2を試さないことを確認"""
+        registry = StrategyRegistry()
+        registry.record_success('sex', 'label')
+
+        PatientService(registry).fill_patient_info(mock_page, patient_data)
+
+        mock_page.get_by_label.assert_any_call("性別*")
+        mock_page.click.assert_called_once_with('li:has-text("男性")')
+        assert not any(
+            call.args == ('#select2-order-sex-container',) for call in mock_page.locator.call_args_list[1:]
+        )
+
+    def test_fill_patient_info_remembers_surgery_date_fallback(self, mock_page, patient_data):
+        """手術日のラベル方式が失敗した場合にname属性方式を記録することを確認"""
+        registry = StrategyRegistry()
+        mock_page.get_by_label.side_effect = [Mock(), Exception("Date field error")]
+
+        PatientService(registry).fill_patient_info(mock_page, patient_data)
+
+        assert registry.preferred('surgery_date') == 'name'
+        mock_page.locator.assert_any_call('input[name*="surgery"]')
 
     def test_fill_birthday_converts_date_format(self, mock_page):
         """誕生日のフォーマット変換が正しく行われることを確認"""
@@ -91,6 +117,19 @@ class TestPatientService:
         mock_input.click.assert_called_once()
         mock_input.type.assert_called_once_with('15/05/1980', delay=100)
 
+    def test_fill_birthday_sets_date_without_typing(self, mock_page):
+        """日付の直接設定が受け付けられた場合はキー入力しないことを確認"""
+        mock_frame = Mock()
+        mock_page.frame_locator.return_value = mock_frame
+        mock_input = Mock()
+        mock_input.evaluate.return_value = '15/05/1980'
+        mock_frame.locator.return_value.first = mock_input
+
+        PatientService.fill_birthday(mock_page, '19800515')
+
+        mock_input.evaluate.assert_called_once()
+        mock_input.type.assert_not_called()
+
     def test_fill_birthday_presses_enter(self, mock_page):
         """誕生日入力後にEnterキーが押されることを確認"""
         birthday = '19900120'  # YYYYMMDD
@@ -152,7 +191,7 @@ class TestPatientService:
             'surgery_date': ''
         }
 
-        PatientService.fill_patient_info(mock_page, empty_data)
+        PatientService().fill_patient_info(mock_page, empty_data)
 
         mock_page.get_by_label.assert_any_call("患者ID")
 
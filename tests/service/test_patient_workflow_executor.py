@@ -0,0 +1,223 @@
+from unittest.mock import Mock, patch
+
+import pytest
+from playwright.sync_api import Error as PlaywrightError, TimeoutError as PlaywrightTimeoutError
+
+from service.circuit_breaker import CircuitOpenError
+from service.patient_workflow_executor import PatientWorkflowExecutor
+from service.step_timer import step_timings
+
+
+class TestPatientWorkflowExecutor:
+    """PatientWorkflowExecutorのテストクラス"""
+
+    @pytest.fixture(autouse=True)
+    def reset_step_timings(self):
+        """テスト間でステップ所要時間の記録が混ざらないようにするフィクスチャ"""
+        step_timings.drain()
+        yield
+        step_timings.drain()
+
+    @pytest.fixture(autouse=True)
+    def no_backoff(self):
+        """再試行前の待機を省略するフィクスチャ"""
+        with patch('service.patient_workflow_executor.time.sleep') as mock_sleep:
+            yield mock_sleep
+
+    @pytest.fixture
+    def executor(self):
+        """各サービスをモックしたPatientWorkflowExecutorを提供するフィクスチャ"""
+        auth_service = Mock()
+        auth_service.storage_state = {'cookies': [], 'origins': []}
+        save_service = Mock()
+        save_service.save_draft.return_value = True
+        save_service.click_save_pdf_button.return_value = 'C:\\pdf\\IPCLdata_IDP001.pdf'
+        return PatientWorkflowExecutor(auth_service, Mock(), Mock(), save_service, Mock(), timeout=3000)
+
+    @pytest.fixture
+    def patient_data(self):
+        """患者データのフィクスチャ"""
+        return {'id': 'P001', 'name': '山田太郎', 'eye': '右眼', 'birthday': '19800515'}
+
+    def test_execute_runs_workflow_and_returns_pdf_path(self, executor, patient_data):
+        """ワークフローが実行され、保存結果とPDFパスが返されることを確認"""
+        page = Mock()
+
+        result = executor.execute(page, 1, 1, patient_data)
+
+        assert result == (True, 'C:\\pdf\\IPCLdata_IDP001.pdf')
+        page.set_default_timeout.assert_called_once_with(3000)
+        executor.auth_service.ensure_logged_in.assert_called_once_with(page)
+        executor.lens_calculator_service.click_calculate_button.assert_called_once_with(page)
+
+    def test_execute_returns_failure_on_exception(self, executor, patient_data):
+        """途中で例外が発生した場合は失敗を返すことを確認"""
+        executor.lens_calculator_service.open_lens_calculator.side_effect = Exception("frame not found")
+
+        result = executor.execute(Mock(), 1, 1, patient_data)
+
+        assert result == (False, None)
+        executor.save_service.save_draft.assert_not_called()
+
+    def test_execute_records_step_timings(self, executor, patient_data):
+        """各ステップの所要時間がレコードごとに記録されることを確認"""
+        executor.execute(Mock(), 1, 1, patient_data)
+
+        [record] = step_timings.drain()
+        assert record['id'] == 'P001'
+        assert record['success'] is True
+        assert list(record['steps']) == [
+            'login', 'patient_info', 'open_calculator', 'eye_tab', 'birthday', 'measurements',
+            'lens_type', 'ata_wtw', 'calculate', 'save_pdf', 'save_input', 'save_draft',
+        ]
+
+    def test_execute_records_steps_until_failure(self, executor, patient_data):
+        """失敗したレコードも失敗したステップまでの所要時間が記録されることを確認"""
+        executor.lens_calculator_service.open_lens_calculator.side_effect = Exception("frame not found")
+
+        executor.execute(Mock(), 1, 1, patient_data)
+
+        [record] = step_timings.drain()
+        assert record['success'] is False
+        assert list(record['steps']) == ['login', 'patient_info', 'open_calculator']
+
+    def test_execute_marks_timeout_as_congestion(self, executor, patient_data):
+        """タイムアウトで失敗したレコードはサーバー混雑の兆候として記録されることを確認"""
+        executor.lens_calculator_service.click_calculate_button.side_effect = PlaywrightTimeoutError("Timeout 3000ms")
+
+        executor.execute(Mock(), 1, 1, patient_data)
+
+        [record] = step_timings.drain()
+        assert record['congestion'] == 'timeout'
+
+    def test_execute_retries_failed_step_on_same_page(self, executor, patient_data, no_backoff):
+        """冪等なステップは失敗したステップから同じページで再試行されることを確認"""
+        executor.save_service.click_save_pdf_button.side_effect = [
+            PlaywrightTimeoutError("Timeout 3000ms"), 'C:\\pdf\\IPCLdata_IDP001.pdf',
+        ]
+
+        result = executor.execute(Mock(), 1, 1, patient_data)
+
+        assert result == (True, 'C:\\pdf\\IPCLdata_IDP001.pdf')
+        assert executor.save_service.click_save_pdf_button.call_count == 2
+        executor.auth_service.ensure_logged_in.assert_called_once()
+        executor.lens_calculator_service.click_calculate_button.assert_called_once()
+        no_backoff.assert_called_once_with(1.0)
+
+    def test_execute_renavigates_for_non_idempotent_step(self, executor, patient_data):
+        """冪等でないステップの再試行はログイン確認からやり直すことを確認"""
+        executor.save_service.save_input.side_effect = [PlaywrightError("modal detached"), None]
+
+        result = executor.execute(Mock(), 1, 1, patient_data)
+
+        assert result[0] is True
+        assert executor.auth_service.ensure_logged_in.call_count == 2
+        assert executor.patient_service.fill_patient_info.call_count == 2
+        assert executor.save_service.save_input.call_count == 2
+        executor.save_service.save_draft.assert_called_once()
+
+    def test_execute_discards_pdf_from_abandoned_attempt(self, executor, patient_data, tmp_path):
+        """ページを開き直して再試行する場合は、やり直す前に保存したPDFを削除することを確認"""
+        first_pdf = tmp_path / 'IPCLdata_IDP001_20240115_120000_001.pdf'
+        second_pdf = tmp_path / 'IPCLdata_IDP001_20240115_120005_002.pdf'
+
+        saved_paths = iter([first_pdf, second_pdf])
+
+        def save_pdf(page, patient_id, patient_name):
+            path = next(saved_paths)
+            path.write_bytes(b'%PDF')
+            return str(path)
+
+        executor.save_service.click_save_pdf_button.side_effect = save_pdf
+        executor.save_service.save_input.side_effect = [PlaywrightError("modal detached"), None]
+        executor.record_journal = Mock()
+
+        result = executor.execute(Mock(), 1, 1, patient_data)
+
+        assert result == (True, str(second_pdf))
+        assert not first_pdf.exists()
+        assert second_pdf.exists()
+        executor.record_journal.record.assert_called_once_with(patient_data, True, str(second_pdf))
+
+    def test_execute_does_not_retry_unexpected_error(self, executor, patient_data):
+        """Playwright以外の例外は再試行せずに失敗とすることを確認"""
+        executor.save_service.click_save_pdf_button.side_effect = ValueError("bad data")
+
+        assert executor.execute(Mock(), 1, 1, patient_data) == (False, None)
+        executor.save_service.click_save_pdf_button.assert_called_once()
+
+    def test_execute_does_not_retry_save_draft(self, executor, patient_data):
+        """下書きの二重登録を避けるため、下書き保存は再試行しないことを確認"""
+        executor.save_service.save_draft.side_effect = PlaywrightTimeoutError("Timeout 3000ms")
+
+        assert executor.execute(Mock(), 1, 1, patient_data) == (False, None)
+        executor.save_service.save_draft.assert_called_once()
+
+    def test_execute_gives_up_after_policy_attempts(self, executor, patient_data):
+        """再試行の上限に達した場合は失敗とすることを確認"""
+        executor.lens_calculator_service.click_calculate_button.side_effect = PlaywrightTimeoutError("Timeout 3000ms")
+
+        assert executor.execute(Mock(), 1, 1, patient_data) == (False, None)
+        assert executor.lens_calculator_service.click_calculate_button.call_count == 3
+
+    def test_execute_records_retries_in_step_timings(self, executor, patient_data):
+        """再試行したステップと回数がステップ所要時間の記録に含まれることを確認"""
+        executor.save_service.click_save_pdf_button.side_effect = [
+            PlaywrightTimeoutError("Timeout 3000ms"), 'C:\\pdf\\IPCLdata_IDP001.pdf',
+        ]
+
+        executor.execute(Mock(), 1, 1, patient_data)
+
+        [record] = step_timings.drain()
+        assert record['success'] is True
+        assert record['retries'] == [
+            {'step': 'save_pdf', 'attempt': 2, 'renavigate': False, 'error': 'TimeoutError: Timeout 3000ms'},
+        ]
+
+    def test_execute_records_result_in_journal(self, executor, patient_data):
+        """ジャーナルがあれば、保存結果とPDFパスが記録されることを確認"""
+        executor.record_journal = Mock()
+
+        executor.execute(Mock(), 1, 1, patient_data)
+
+        executor.record_journal.record.assert_called_once_with(patient_data, True, 'C:\\pdf\\IPCLdata_IDP001.pdf')
+
+    def test_execute_records_failure_in_journal(self, executor, patient_data):
+        """失敗したレコードも失敗としてジャーナルに記録されることを確認"""
+        executor.record_journal = Mock()
+        executor.lens_calculator_service.open_lens_calculator.side_effect = Exception("frame not found")
+
+        executor.execute(Mock(), 1, 1, patient_data)
+
+        executor.record_journal.record.assert_called_once_with(patient_data, False, None)
+
+    def test_execute_in_new_context_closes_context(self, executor, patient_data):
+        """セッション状態付きのコンテキストで実行し、終了後に閉じることを確認"""
+        browser_manager = Mock()
+
+        assert executor.execute_in_new_context(browser_manager, 1, 1, patient_data) is True
+
+        browser_manager.new_context.assert_called_once_with({'cookies': [], 'origins': []})
+        browser_manager.new_context.return_value.close.assert_called_once()
+
+    def test_execute_in_new_context_skips_context_while_circuit_open(self, executor, patient_data):
+        """接続が遮断されている間はコンテキストを作らずに失敗を返すことを確認"""
+        executor.auth_service.circuit_breaker.check.side_effect = CircuitOpenError("接続先が応答しません")
+        browser_manager = Mock()
+
+        assert executor.execute_in_new_context(browser_manager, 1, 1, patient_data) is False
+        browser_manager.new_context.assert_not_called()
+
+    def test_execute_returns_failure_without_retry_when_circuit_opens(self, executor, patient_data):
+        """ログインが遮断された場合は再試行せずに失敗を返すことを確認"""
+        executor.auth_service.ensure_logged_in.side_effect = CircuitOpenError("接続先が応答しません")
+
+        assert executor.execute(Mock(), 1, 1, patient_data) == (False, None)
+        executor.auth_service.ensure_logged_in.assert_called_once()
+
+    def test_execute_in_new_context_ignores_close_error(self, executor, patient_data):
+        """コンテキスト終了時のエラーで結果が変わらないことを確認"""
+        browser_manager = Mock()
+        browser_manager.new_context.return_value.close.side_effect = PlaywrightError("Target closed")
+
+        assert executor.execute_in_new_context(browser_manager, 1, 1, patient_data) is True
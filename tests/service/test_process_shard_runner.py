@@ -0,0 +1,146 @@
+import configparser
+import logging
+import queue
+from unittest.mock import Mock, patch
+
+import pytest
+
+from service.process_shard_runner import ProcessShardRunner, QueueProgress, ShardSettings, _worker_main
+from service.step_timer import step_timings
+
+
+@pytest.fixture
+def settings(tmp_path):
+    """ShardSettingsのフィクスチャ"""
+    return ShardSettings(
+        'https://example.com', 'test@example.com', 'password123', True, 5000,
+        tmp_path / 'pdf', tmp_path / 'calculated', logging.INFO,
+    )
+
+
+def drain(q):
+    """キューの内容をすべて取り出す"""
+    items = []
+    while not q.empty():
+        items.append(q.get_nowait())
+    return items
+
+
+class TestWorkerMain:
+    """ワーカープロセス本体のテストクラス"""
+
+    @pytest.fixture(autouse=True)
+    def empty_config(self):
+        """設定ファイルを読まず、キャッシュや記録ファイルをリポジトリ内に作らないようにするフィクスチャ"""
+        with patch('service.process_shard_runner.load_config', return_value=configparser.ConfigParser()):
+            yield
+
+    @patch('service.process_shard_runner._configure_worker_logging')
+    @patch('service.process_shard_runner.BrowserManager')
+    @patch('service.process_shard_runner.PatientWorkflowExecutor')
+    def test_worker_reports_results_and_stops_browser(
+        self, mock_executor_class, mock_browser_manager_class, mock_logging, settings
+    ):
+        """ワーカーが結果をキューに送り、終了時にブラウザを停止することを確認"""
+        mock_executor_class.return_value.execute_in_new_context.side_effect = [True, Exception("crash")]
+        jobs, events = queue.Queue(), queue.Queue()
+        jobs.put((1, 0, 1, 2, {'id': 'P1'}))
+        jobs.put((1, 1, 2, 2, {'id': 'P2'}))
+        jobs.put(None)
+
+        _worker_main(3, settings, jobs, events, queue.Queue())
+
+        received = drain(events)
+        assert ('started', 1, 0, 3) in received
+        assert ('result', 1, 0, True) in received
+        assert ('result', 1, 1, False) in received
+        mock_browser_manager_class.return_value.stop.assert_called_once()
+
+    @patch('service.process_shard_runner._configure_worker_logging')
+    @patch('service.process_shard_runner.BrowserManager')
+    @patch('service.process_shard_runner.PatientWorkflowExecutor')
+    def test_worker_uses_queue_progress(self, mock_executor_class, mock_browser_manager_class, mock_logging, settings):
+        """ワーカー内の進捗表示がキュー経由になることを確認"""
+        jobs = queue.Queue()
+        jobs.put(None)
+
+        _worker_main(1, settings, jobs, queue.Queue(), queue.Queue())
+
+        progress = mock_executor_class.call_args.args[4]
+        assert isinstance(progress, QueueProgress)
+
+
+class TestProcessShardRunner:
+    """ProcessShardRunnerのテストクラス"""
+
+    def _running_runner(self, settings, processes):
+        runner = ProcessShardRunner(len(processes), settings)
+        runner._jobs = queue.Queue()
+        runner._events = queue.Queue()
+        runner._processes = dict(enumerate(processes, 1))
+        return runner
+
+    def test_map_aggregates_results_and_progress(self, settings):
+        """結果が集約され、進捗がコールバックに渡されることを確認"""
+        runner = self._running_runner(settings, [Mock(), Mock()])
+        for event in [('started', 1, 1, 2), ('progress', '[2/2] ログイン中...'), ('result', 1, 1, False),
+                      ('result', 0, 0, True), ('started', 1, 0, 1), ('result', 1, 0, True)]:
+            runner._events.put(event)
+        on_progress = Mock()
+
+        results = runner.map([(1, 2, {'id': 'P1'}), (2, 2, {'id': 'P2'})], on_progress=on_progress)
+
+        assert results == [True, False]
+        on_progress.assert_called_once_with('[2/2] ログイン中...')
+        assert drain(runner._jobs) == [(1, 0, 1, 2, {'id': 'P1'}), (1, 1, 2, 2, {'id': 'P2'})]
+
+    def test_map_collects_worker_step_timings(self, settings):
+        """ワーカーから送られたステップ所要時間が親プロセスで集計されることを確認"""
+        runner = self._running_runner(settings, [Mock()])
+        record = {'id': 'P1', 'eye': '右眼', 'success': True, 'total': 1.0, 'steps': {'login': 1.0}}
+        runner._events.put(('timings', [record]))
+        runner._events.put(('result', 1, 0, True))
+
+        runner.map([(1, 1, {'id': 'P1'})])
+
+        assert step_timings.drain() == [record]
+
+    def test_crashed_worker_fails_in_flight_record_and_respawns(self, settings):
+        """クラッシュしたワーカーの処理中レコードを失敗扱いにし、ワーカーを再起動することを確認"""
+        crashed = Mock()
+        crashed.is_alive.return_value = False
+        runner = self._running_runner(settings, [crashed])
+        runner._spawn_worker = Mock()
+        runner._events.put(('started', 1, 0, 1))
+
+        results = runner.map([(1, 1, {'id': 'P1'})])
+
+        assert results == [False]
+        runner._spawn_worker.assert_called_once_with(1)
+
+    def test_repeated_startup_crashes_fail_remaining_records(self, settings):
+        """ワーカーが起動直後にクラッシュし続ける場合、待ち続けずに失敗を返すことを確認"""
+        crashed = Mock()
+        crashed.is_alive.return_value = False
+        runner = self._running_runner(settings, [crashed])
+        runner._spawn_worker = Mock()
+
+        results = runner.map([(1, 2, {'id': 'P1'}), (2, 2, {'id': 'P2'})])
+
+        assert results == [False, False]
+        assert runner._jobs.empty()
+
+    def test_stop_sends_sentinels(self, settings):
+        """停止時に各ワーカーへ終了指示を送ることを確認"""
+        processes = [Mock(), Mock()]
+        for process in processes:
+            process.is_alive.return_value = False
+        runner = self._running_runner(settings, processes)
+        log_listener = Mock()
+        runner._log_listener = log_listener
+
+        runner.stop()
+
+        assert drain(runner._jobs) == [None, None]
+        assert not runner.is_running
+        log_listener.stop.assert_called_once()
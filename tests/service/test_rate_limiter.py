@@ -0,0 +1,163 @@
+import asyncio
+import configparser
+import multiprocessing
+from unittest.mock import patch
+
+import pytest
+
+from service.rate_limiter import ACTION_CALCULATE, ACTION_LOGIN, ACTION_SAVE_DRAFT, RateLimiter, TokenBucket
+from service.step_timer import RecordTimer
+
+
+def reserve_in_child(bucket):
+    bucket.reserve()
+
+
+class TestTokenBucket:
+    """TokenBucketのテストクラス"""
+
+    def test_burst_is_available_immediately(self):
+        """burstの回数までは待たずに実行できることを確認"""
+        bucket = TokenBucket(60, burst=2)
+
+        assert bucket.reserve() == 0
+        assert bucket.reserve() == 0
+
+    def test_reservations_are_spaced_by_rate(self):
+        """トークンがない場合は、予約の順に1トークン分ずつ待機時間が延びることを確認"""
+        bucket = TokenBucket(60, burst=1)
+
+        with patch('service.rate_limiter.time.time', return_value=1000.0):
+            bucket._state[1] = 1000.0
+            assert bucket.reserve() == 0
+            assert bucket.reserve() == pytest.approx(1.0)
+            assert bucket.reserve() == pytest.approx(2.0)
+
+    def test_tokens_refill_over_time(self):
+        """時間の経過でトークンが補充され、上限を超えて貯まらないことを確認"""
+        bucket = TokenBucket(60, burst=2)
+
+        with patch('service.rate_limiter.time.time', return_value=1000.0):
+            bucket._state[1] = 1000.0
+            bucket.reserve()
+            bucket.reserve()
+        with patch('service.rate_limiter.time.time', return_value=1100.0):
+            assert bucket.reserve() == 0
+            assert bucket.reserve() == 0
+            assert bucket.reserve() == pytest.approx(1.0)
+
+    def test_shared_bucket_is_consumed_by_other_process(self):
+        """共有バケットのトークンを別プロセスで使うと、親プロセスでも残量が減ることを確認"""
+        context = multiprocessing.get_context('spawn')
+        bucket = TokenBucket.shared(context, 1, burst=1)
+
+        process = context.Process(target=reserve_in_child, args=(bucket,))
+        process.start()
+        process.join(timeout=30)
+
+        assert process.exitcode == 0
+        assert bucket.reserve() > 0
+
+
+class TestRateLimiter:
+    """RateLimiterのテストクラス"""
+
+    def test_from_config_creates_buckets_for_configured_actions(self):
+        """回数が設定された操作だけを制限することを確認"""
+        config = configparser.ConfigParser()
+        config.read_dict({'RateLimit': {'login_per_minute': '6', 'calculate_per_minute': '0', 'burst': '3'}})
+
+        limiter = RateLimiter.from_config(config)
+
+        assert list(limiter.buckets) == [ACTION_LOGIN]
+        assert limiter.buckets[ACTION_LOGIN].capacity == 3
+
+    def test_from_config_returns_none_without_limits(self):
+        """制限する操作がない場合はNoneを返すことを確認"""
+        assert RateLimiter.from_config(configparser.ConfigParser()) is None
+
+    def test_wait_sleeps_for_reserved_delay(self):
+        """トークンがない場合は失敗させずに待機し、待機時間を返すことを確認"""
+        limiter = RateLimiter({ACTION_SAVE_DRAFT: TokenBucket(60, burst=1)})
+
+        with patch('service.rate_limiter.time.sleep') as sleep:
+            assert limiter.wait(ACTION_SAVE_DRAFT) == 0
+            delay = limiter.wait(ACTION_SAVE_DRAFT)
+
+        assert delay > 0
+        sleep.assert_called_once_with(delay)
+
+    def test_wait_async_sleeps_without_blocking_loop(self):
+        """非同期版はasyncio.sleepで待機することを確認"""
+        limiter = RateLimiter({ACTION_CALCULATE: TokenBucket(60, burst=1)})
+
+        async def run():
+            with patch('service.rate_limiter.asyncio.sleep') as sleep:
+                await limiter.wait_async(ACTION_CALCULATE)
+                delay = await limiter.wait_async(ACTION_CALCULATE)
+            return delay, sleep
+
+        delay, sleep = asyncio.run(run())
+        sleep.assert_called_once_with(delay)
+
+    def test_wait_is_recorded_apart_from_step_span(self):
+        """待機時間は計測中のステップの所要時間に含めず、別に記録することを確認"""
+        limiter = RateLimiter({ACTION_SAVE_DRAFT: TokenBucket(60, burst=1)})
+        timer = RecordTimer()
+
+        with patch('service.step_timer.time.monotonic', side_effect=[100.0, 101.5]):
+            with patch('service.rate_limiter.time.sleep'):
+                limiter.wait(ACTION_SAVE_DRAFT)
+                with timer.span('save_draft'):
+                    delay = limiter.wait(ACTION_SAVE_DRAFT)
+
+        assert timer.rate_limit_waits == {'save_draft': delay}
+        assert timer.spans['save_draft'] == pytest.approx(1.5 - delay)
+
+    def test_wait_async_is_recorded_per_task(self):
+        """非同期版でも待機したタスクのステップにだけ待機時間が記録されることを確認"""
+        limiter = RateLimiter({ACTION_CALCULATE: TokenBucket(60, burst=1)})
+        waiting, idle = RecordTimer(), RecordTimer()
+
+        async def step(timer):
+            with timer.span('calculate'):
+                await limiter.wait_async(ACTION_CALCULATE)
+
+        async def run():
+            with patch('service.rate_limiter.asyncio.sleep'):
+                await step(idle)
+                await asyncio.gather(step(waiting))
+
+        asyncio.run(run())
+
+        assert idle.rate_limit_waits == {}
+        assert waiting.rate_limit_waits['calculate'] > 0
+
+    def test_unlimited_action_does_not_wait(self):
+        """制限していない操作は待たないことを確認"""
+        limiter = RateLimiter({ACTION_LOGIN: TokenBucket(1, burst=1)})
+
+        assert limiter.wait(ACTION_CALCULATE) == 0
+
+    def test_log_summary_reports_wait_time(self, caplog):
+        """操作ごとの待機回数と待機時間がログに出力されることを確認"""
+        limiter = RateLimiter({ACTION_LOGIN: TokenBucket(60, burst=1)})
+        with patch('service.rate_limiter.time.sleep'):
+            limiter.wait(ACTION_LOGIN)
+            limiter.wait(ACTION_LOGIN)
+
+        with caplog.at_level('INFO'):
+            limiter.log_summary()
+
+        assert 'レート制限[ログイン]: 2回中1回待機' in caplog.text
+
+    def test_pickle_keeps_buckets_and_resets_stats(self):
+        """ワーカープロセスへ渡すとバケットだけが引き継がれることを確認"""
+        limiter = RateLimiter({ACTION_LOGIN: TokenBucket(60, burst=1)})
+        limiter.wait(ACTION_LOGIN)
+
+        copied = RateLimiter.__new__(RateLimiter)
+        copied.__setstate__(limiter.__getstate__())
+
+        assert list(copied.buckets) == [ACTION_LOGIN]
+        assert copied._stats == {}
@@ -0,0 +1,208 @@
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, Mock
+
+import pytest
+from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
+
+from service.readiness import (
+    FunctionProbe,
+    ProbeLatencyRecorder,
+    ReadinessProbe,
+    ResponseProbe,
+    SelectorProbe,
+    is_draft_save_response,
+    probe_latency,
+)
+
+
+@pytest.fixture(autouse=True)
+def reset_latency():
+    """テスト間で待機時間の記録が混ざらないようにするフィクスチャ"""
+    probe_latency.reset()
+    yield
+    probe_latency.reset()
+
+
+class TestProbeLatencyRecorder:
+    """ProbeLatencyRecorderのテストクラス"""
+
+    def test_summary_aggregates_by_name(self):
+        """名前ごとに回数・平均・最大が集計されることを確認"""
+        recorder = ProbeLatencyRecorder()
+        recorder.record('login_form', 0.1)
+        recorder.record('login_form', 0.3)
+
+        stats = recorder.summary()['login_form']
+
+        assert stats['count'] == 2
+        assert stats['avg'] == pytest.approx(0.2)
+        assert stats['max'] == pytest.approx(0.3)
+
+    def test_log_summary_resets(self):
+        """サマリー出力後に記録がリセットされることを確認"""
+        recorder = ProbeLatencyRecorder()
+        recorder.record('order_form', 0.1)
+
+        recorder.log_summary()
+
+        assert recorder.summary() == {}
+
+
+class TestReadinessProbe:
+    """ReadinessProbeのテストクラス"""
+
+    def test_base_class_cannot_be_instantiated(self):
+        """待機方法を実装していない条件は作成できないことを確認"""
+        with pytest.raises(TypeError):
+            ReadinessProbe('base')
+
+
+class TestSelectorProbe:
+    """SelectorProbeのテストクラス"""
+
+    def test_wait_waits_for_selector(self):
+        """指定したセレクタの状態を待機し、待機時間を記録することを確認"""
+        page = Mock()
+        probe = SelectorProbe('order_form', '#order')
+
+        probe.wait(page, timeout=1000)
+
+        page.locator.assert_called_once_with('#order')
+        page.locator.return_value.first.wait_for.assert_called_once_with(state='visible', timeout=1000)
+        assert probe_latency.summary()['order_form']['count'] == 1
+
+    def test_wait_uses_frame(self):
+        """フレーム指定時はフレーム内の要素を待機することを確認"""
+        page = Mock()
+        probe = SelectorProbe('calculator', 'body', frame='#calculatorFrame')
+
+        probe.wait(page)
+
+        page.frame_locator.assert_called_once_with('#calculatorFrame')
+        page.frame_locator.return_value.locator.assert_called_once_with('body')
+
+    def test_required_probe_raises_on_timeout(self):
+        """必須の条件がタイムアウトした場合は例外を送出することを確認"""
+        page = Mock()
+        page.locator.return_value.first.wait_for.side_effect = PlaywrightTimeoutError('timeout')
+        probe = SelectorProbe('login_form', '#login')
+
+        with pytest.raises(PlaywrightTimeoutError):
+            probe.wait(page)
+
+    def test_optional_probe_continues_on_timeout(self):
+        """任意の条件がタイムアウトした場合は続行することを確認"""
+        page = Mock()
+        page.locator.return_value.first.wait_for.side_effect = PlaywrightTimeoutError('timeout')
+        probe = SelectorProbe('order_form', '#order', required=False)
+
+        probe.wait(page)
+
+        assert probe_latency.summary()['order_form']['count'] == 1
+
+    def test_wait_async(self):
+        """非同期APIでも同じセレクタを待機することを確認"""
+        page = MagicMock()
+        page.locator.return_value.first.wait_for = AsyncMock()
+        probe = SelectorProbe('order_form', '#order')
+
+        asyncio.run(probe.wait_async(page))
+
+        page.locator.return_value.first.wait_for.assert_awaited_once_with(state='visible', timeout=None)
+
+
+class TestFunctionProbe:
+    """FunctionProbeのテストクラス"""
+
+    def test_wait_evaluates_expression(self):
+        """JavaScriptの条件式を待機することを確認"""
+        page = Mock()
+        probe = FunctionProbe('jquery_idle', '() => window.jQuery && jQuery.active === 0')
+
+        probe.wait(page, timeout=500)
+
+        page.wait_for_function.assert_called_once_with('() => window.jQuery && jQuery.active === 0', timeout=500)
+
+
+class TestResponseProbe:
+    """ResponseProbeのテストクラス"""
+
+    def test_expect_yields_response(self):
+        """操作後のレスポンスが結果に格納されることを確認"""
+        page = MagicMock()
+        response = Mock(status=200)
+        page.expect_response.return_value.__enter__.return_value.value = response
+        action = Mock()
+        probe = ResponseProbe('draft_saved', lambda r: True)
+
+        with probe.expect(page) as result:
+            action()
+
+        action.assert_called_once()
+        assert result['response'] is response
+        assert probe_latency.summary()['draft_saved']['count'] == 1
+
+    def test_optional_probe_continues_when_response_times_out(self):
+        """任意の条件でレスポンス待ちがタイムアウトした場合は結果なしで続行することを確認"""
+        page = MagicMock()
+        page.expect_response.return_value.__exit__.side_effect = PlaywrightTimeoutError('timeout')
+        probe = ResponseProbe('draft_saved', lambda r: True, required=False)
+
+        with probe.expect(page) as result:
+            pass
+
+        assert 'response' not in result
+
+    def test_action_timeout_is_reraised(self):
+        """囲んだ操作自体のタイムアウトは任意の条件でも送出されることを確認"""
+        page = MagicMock()
+        probe = ResponseProbe('draft_saved', lambda r: True, required=False)
+
+        with pytest.raises(PlaywrightTimeoutError):
+            with probe.expect(page):
+                raise PlaywrightTimeoutError('click timeout')
+
+        assert probe_latency.summary() == {}
+
+    def test_wait_waits_for_response(self):
+        """操作を伴わずにレスポンスを待てることを確認"""
+        page = MagicMock()
+        predicate = Mock()
+        probe = ResponseProbe('draft_saved', predicate)
+
+        probe.wait(page, timeout=1000)
+
+        page.expect_response.assert_called_once_with(predicate, timeout=1000)
+
+
+class TestIsDraftSaveResponse:
+    """is_draft_save_responseのテストクラス"""
+
+    @staticmethod
+    def _response(method, url):
+        response = Mock()
+        response.request.method = method
+        response.request.url = url
+        return response
+
+    @pytest.mark.parametrize('url', [
+        'https://www.ipcl-jp.com/awsystem/order/drafts',
+        'https://www.ipcl-jp.com/awsystem/order/draft/store',
+        'https://www.ipcl-jp.com/awsystem/order/create/draft?id=1',
+        'http://127.0.0.1:8765/api/draft',
+    ])
+    def test_matches_draft_save_post(self, url):
+        """下書き保存のPOSTに一致することを確認"""
+        assert is_draft_save_response(self._response('POST', url))
+
+    @pytest.mark.parametrize('method, url', [
+        ('POST', 'https://www.ipcl-jp.com/awsystem/log'),
+        ('POST', 'https://www.ipcl-jp.com/awsystem/order/calculate'),
+        ('POST', 'https://www.ipcl-jp.com/awsystem/order/create?next=drafts'),
+        ('POST', 'http://127.0.0.1:8765/api/calculate'),
+        ('POST', 'http://127.0.0.1:8765/api/drafting'),
+        ('GET', 'https://www.ipcl-jp.com/awsystem/order/drafts'),
+    ])
+    def test_ignores_other_requests(self, method, url):
+        """下書き保存以外のリクエストには一致しないことを確認"""
+        assert not is_draft_save_response(self._response(method, url))
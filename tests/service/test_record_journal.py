@@ -0,0 +1,112 @@
+import sqlite3
+from unittest.mock import Mock
+
+import pytest
+
+from service.patient_record import PatientRecord
+from service.record_journal import RecordJournal, record_hash
+
+
+class TestRecordHash:
+    """record_hashのテストクラス"""
+
+    def test_same_content_gives_same_hash(self):
+        """同じ内容であれば辞書とPatientRecordで同じ値になることを確認"""
+        data = {'id': 'P001', 'name': '山田太郎', 'eye': '右眼', 'r_sph': '-5.00'}
+
+        assert record_hash(data) == record_hash(PatientRecord.from_mapping(data))
+
+    def test_different_content_gives_different_hash(self):
+        """内容が1項目でも違えば異なる値になることを確認"""
+        assert record_hash({'id': 'P001', 'r_sph': '-5.00'}) != record_hash({'id': 'P001', 'r_sph': '-5.25'})
+
+    def test_lens_type_does_not_change_hash(self):
+        """検証時に求めたレンズタイプはハッシュに含まれないことを確認"""
+        record = PatientRecord.from_mapping({'id': 'P001', 'r_cyl': '0'})
+        validated = PatientRecord.from_mapping({'id': 'P001', 'r_cyl': '0'})
+        object.__setattr__(validated, 'right_lens_type', 'IPCL V2.0 Mono')
+
+        assert record_hash(record) == record_hash(validated)
+
+
+class TestRecordJournal:
+    """RecordJournalのテストクラス"""
+
+    @pytest.fixture
+    def journal(self, tmp_path):
+        """一時ディレクトリのRecordJournalを提供するフィクスチャ"""
+        journal = RecordJournal(tmp_path / 'cache' / 'journal.sqlite3')
+        yield journal
+        journal.close()
+
+    def test_pending_skips_only_succeeded_records(self, journal):
+        """下書き保存に成功したレコードだけが除外されることを確認"""
+        records = {1: {'id': 'P1'}, 2: {'id': 'P2'}, 3: {'id': 'P3'}}
+        journal.record(records[1], True, 'C:\\pdf\\P1.pdf')
+        journal.record(records[2], False)
+
+        assert journal.pending(records) == {2: {'id': 'P2'}, 3: {'id': 'P3'}}
+
+    def test_success_after_failure_is_skipped(self, journal):
+        """失敗の後に成功した記録があれば除外されることを確認"""
+        journal.record({'id': 'P1'}, False)
+        journal.record({'id': 'P1'}, True)
+
+        assert journal.pending({1: {'id': 'P1'}}) == {}
+
+    def test_entries_are_appended(self, journal):
+        """記録は上書きせずに追記され、PDFパスも残ることを確認"""
+        journal.record({'id': 'P1'}, False)
+        journal.record({'id': 'P1'}, True, 'C:\\pdf\\P1.pdf')
+        journal.close()
+
+        with sqlite3.connect(journal.db_path) as connection:
+            rows = connection.execute(
+                'SELECT status, patient_id, pdf_path FROM record_journal ORDER BY seq'
+            ).fetchall()
+        assert rows == [('failed', 'P1', None), ('success', 'P1', 'C:\\pdf\\P1.pdf')]
+
+    def test_journal_persists_across_instances(self, journal):
+        """別のインスタンスから開いても記録が引き継がれることを確認"""
+        journal.record({'id': 'P1'}, True)
+        journal.close()
+
+        reopened = RecordJournal(journal.db_path)
+        try:
+            assert reopened.pending({1: {'id': 'P1'}, 2: {'id': 'P2'}}) == {2: {'id': 'P2'}}
+        finally:
+            reopened.close()
+
+    def test_pending_handles_more_records_than_query_chunk(self, journal):
+        """照会を分割する件数を超えても正しく判定されることを確認"""
+        records = {i: {'id': f'P{i}'} for i in range(1200)}
+        for i in range(0, 1200, 2):
+            journal.record(records[i], True)
+
+        assert list(journal.pending(records)) == list(range(1, 1200, 2))
+
+    def test_unreadable_journal_processes_all_records(self, tmp_path):
+        """ジャーナルが壊れている場合は全件を処理対象にすることを確認"""
+        db_path = tmp_path / 'journal.sqlite3'
+        db_path.write_bytes(b'not a database' * 100)
+        journal = RecordJournal(db_path)
+
+        assert journal.pending({1: {'id': 'P1'}}) == {1: {'id': 'P1'}}
+        journal.record({'id': 'P1'}, True)
+
+    def test_from_config_resolves_relative_path(self, monkeypatch, tmp_path):
+        """相対パスはプロジェクトルートからのパスとして扱われることを確認"""
+        monkeypatch.setattr('service.record_journal.get_project_root', lambda: tmp_path)
+        config = Mock()
+        config.get.return_value = 'cache/journal.sqlite3'
+
+        journal = RecordJournal.from_config(config)
+
+        assert journal.db_path == tmp_path / 'cache' / 'journal.sqlite3'
+
+    def test_from_config_returns_none_when_disabled(self):
+        """設定が空の場合はジャーナルを使わないことを確認"""
+        config = Mock()
+        config.get.return_value = ''
+
+        assert RecordJournal.from_config(config) is None
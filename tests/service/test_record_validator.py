@@ -0,0 +1,112 @@
+import csv
+
+import pytest
+
+from service.lens_calculator_service import MONO_LENS, TORIC_LENS
+from service.patient_record import PatientRecord
+from service.record_validator import RecordValidator
+
+
+class TestRecordValidator:
+    """RecordValidatorのテストクラス"""
+
+    @pytest.fixture
+    def validator(self):
+        """RecordValidatorのインスタンスを提供するフィクスチャ"""
+        return RecordValidator()
+
+    @pytest.fixture
+    def make_record(self):
+        """両眼分の正しい値を持つレコードを作成するフィクスチャ"""
+        def _make(**overrides):
+            data = {
+                'name': '山田太郎', 'id': 'P12345', 'sex': '男性',
+                'birthday': '19800515', 'surgery_date': '20240115', 'eye': '両眼',
+            }
+            for prefix in ['r', 'l']:
+                data.update({
+                    f'{prefix}_sph': '-5.00', f'{prefix}_cyl': '-1.50', f'{prefix}_axis': '90',
+                    f'{prefix}_acd': '3.2', f'{prefix}_k1': '43.5', f'{prefix}_k2': '44.0',
+                    f'{prefix}_ata': '11.5', f'{prefix}_casia_wtw_m': '11.6', f'{prefix}_caliper_wtw': '11.7',
+                })
+            data.update(overrides)
+            return PatientRecord.from_mapping(data)
+        return _make
+
+    def test_valid_record_has_no_issues(self, validator, make_record):
+        """正しいレコードでは不備が検出されないことを確認"""
+        _, issues = validator.validate(make_record())
+
+        assert issues == []
+
+    @pytest.mark.parametrize("field,value", [
+        ('r_sph', 'abc'),
+        ('l_cyl', ''),
+        ('r_axis', 'nan'),
+        ('l_k2', '4 3'),
+        ('r_ata', 'x'),
+        ('birthday', '1980/05/15'),
+        ('surgery_date', '20240230'),
+        ('sex', '不明'),
+        ('id', ''),
+    ])
+    def test_invalid_field_is_reported(self, validator, make_record, field, value):
+        """不正な値の項目が不備として検出されることを確認"""
+        _, issues = validator.validate(make_record(**{field: value}))
+
+        assert [issue.field for issue in issues] == [field]
+
+    def test_invalid_eye_is_reported(self, validator, make_record):
+        """眼の値が不正な場合に不備として検出されることを確認"""
+        _, issues = validator.validate(make_record(eye='片眼'))
+
+        assert [issue.field for issue in issues] == ['eye']
+
+    def test_other_eye_fields_are_not_checked(self, validator, make_record):
+        """入力対象でない眼の測定値は検証しないことを確認"""
+        _, issues = validator.validate(make_record(eye='右眼', l_sph='', l_cyl='abc'))
+
+        assert issues == []
+
+    def test_blank_optional_fields_are_allowed(self, validator, make_record):
+        """ATA/WTWの空欄は許容されることを確認"""
+        _, issues = validator.validate(make_record(r_ata='', l_caliper_wtw=''))
+
+        assert issues == []
+
+    def test_values_are_normalized(self, validator, make_record):
+        """全角の数字や前後の空白が正規化されることを確認"""
+        normalized, issues = validator.validate(make_record(r_sph=' －５.００ ', birthday='１９８０0515', eye=' 両眼'))
+
+        assert issues == []
+        assert normalized['r_sph'] == '-5.00'
+        assert normalized.birthday == '19800515'
+        assert normalized.eye == '両眼'
+
+    def test_lens_type_is_precomputed(self, validator, make_record):
+        """眼ごとのレンズタイプが事前に求められることを確認"""
+        normalized, _ = validator.validate(make_record(r_cyl='0', l_cyl='-1.25'))
+
+        assert normalized['r_lens_type'] == MONO_LENS
+        assert normalized['l_lens_type'] == TORIC_LENS
+
+    def test_validate_all_splits_accepted_and_rejected(self, validator, make_record):
+        """全レコードを1回で検証し、正常なものと除外されたものに分けることを確認"""
+        records = [make_record(id='P1'), make_record(id='P2', r_cyl='x'), make_record(id='P3')]
+
+        accepted, rejected = validator.validate_all(records)
+
+        assert [record.id for record in accepted] == ['P1', 'P3']
+        assert [(item.row, item.record.id) for item in rejected] == [(2, 'P2')]
+
+    def test_write_report(self, validator, make_record, tmp_path):
+        """除外したレコードの不備がレポートに1行ずつ出力されることを確認"""
+        _, rejected = validator.validate_all([make_record(id='P9', r_sph='x', sex='')])
+
+        report_path = RecordValidator.write_report(tmp_path / 'IPCLdata_001.csv', rejected, tmp_path / 'error')
+
+        assert report_path.name.startswith('IPCLdata_001_invalid_')
+        with open(report_path, encoding='utf-8-sig', newline='') as f:
+            rows = list(csv.reader(f))
+        assert rows[0] == ['行', '患者ID', '名前', '項目', '値', '理由']
+        assert [(row[0], row[1], row[3]) for row in rows[1:]] == [('1', 'P9', 'sex'), ('1', 'P9', 'r_sph')]
@@ -0,0 +1,118 @@
+import threading
+from unittest.mock import Mock
+
+from service.concurrency_controller import ConcurrencyController
+from service.record_worker_pool import RecordWorkerPool
+
+
+class TestRecordWorkerPool:
+    """RecordWorkerPoolのテストクラス"""
+
+    def test_map_returns_results_in_job_order(self):
+        """結果がジョブの投入順で返されることを確認"""
+        pool = RecordWorkerPool(3, Mock, lambda browser_manager, job: job % 2 == 0)
+
+        try:
+            results = pool.map([0, 1, 2, 3, 4])
+        finally:
+            pool.stop()
+
+        assert results == [True, False, True, False, True]
+
+    def test_map_reports_each_result_on_calling_thread(self):
+        """各ジョブの結果がmapを呼んだスレッドでon_resultに通知されることを確認"""
+        pool = RecordWorkerPool(2, Mock, lambda browser_manager, job: job != 1)
+        reported = []
+
+        try:
+            pool.map([0, 1, 2], on_result=lambda position, success: reported.append(
+                (position, success, threading.get_ident())
+            ))
+        finally:
+            pool.stop()
+
+        assert sorted(reported) == [(0, True, threading.get_ident()), (1, False, threading.get_ident()),
+                                    (2, True, threading.get_ident())]
+
+    def test_limiter_caps_records_in_progress(self):
+        """limiterを指定すると、同時に処理するレコード数がその同時実行数に制限されることを確認"""
+        lock = threading.Lock()
+        running = []
+        peak = []
+
+        def handle_record(browser_manager, job):
+            with lock:
+                running.append(job)
+                peak.append(len(running))
+            threading.Event().wait(0.02)
+            with lock:
+                running.remove(job)
+            return True
+
+        pool = RecordWorkerPool(4, Mock, handle_record, ConcurrencyController(1, 4, initial=2))
+        try:
+            results = pool.map(list(range(8)))
+        finally:
+            pool.stop()
+
+        assert results == [True] * 8
+        assert max(peak) <= 2
+
+    def test_each_worker_owns_browser_manager(self):
+        """各ワーカーが専用のBrowserManagerを使い、終了時に停止することを確認"""
+        managers = []
+        lock = threading.Lock()
+
+        def create_browser_manager():
+            manager = Mock()
+            with lock:
+                managers.append(manager)
+            return manager
+
+        seen = {}
+
+        def handle_record(browser_manager, job):
+            seen.setdefault(threading.get_ident(), set()).add(id(browser_manager))
+            return True
+
+        pool = RecordWorkerPool(2, create_browser_manager, handle_record)
+        pool.map(list(range(6)))
+        pool.stop()
+
+        assert len(managers) == 2
+        assert all(len(manager_ids) == 1 for manager_ids in seen.values())
+        for manager in managers:
+            manager.stop.assert_called_once()
+
+    def test_handler_exception_marks_record_failed(self):
+        """ハンドラで例外が発生した場合は失敗として扱われることを確認"""
+        def handle_record(browser_manager, job):
+            if job == 'bad':
+                raise RuntimeError("boom")
+            return True
+
+        pool = RecordWorkerPool(2, Mock, handle_record)
+        try:
+            results = pool.map(['ok', 'bad', 'ok'])
+        finally:
+            pool.stop()
+
+        assert results == [True, False, True]
+
+    def test_map_calls_on_idle(self):
+        """結果待ちの間にon_idleが呼ばれることを確認"""
+        on_idle = Mock()
+        pool = RecordWorkerPool(1, Mock, lambda browser_manager, job: True)
+
+        try:
+            pool.map([1], on_idle=on_idle)
+        finally:
+            pool.stop()
+
+        on_idle.assert_called()
+
+    def test_workers_minimum_is_one(self):
+        """ワーカー数が1未満の場合は1に補正されることを確認"""
+        pool = RecordWorkerPool(0, Mock, lambda browser_manager, job: True)
+
+        assert pool.workers == 1
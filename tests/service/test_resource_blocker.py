@@ -0,0 +1,111 @@
+import asyncio
+import configparser
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+
+from service.resource_blocker import ResourceBlocker
+
+
+class TestResourceBlocker:
+    """ResourceBlockerのテストクラス"""
+
+    @pytest.fixture
+    def blocker(self):
+        """ResourceBlockerインスタンスを提供するフィクスチャ"""
+        return ResourceBlocker(
+            ['image', 'font', 'media'],
+            ['google-analytics.com', 'doubleclick.net'],
+            ['.pdf', 'calculator'],
+        )
+
+    def _route(self, url, resource_type):
+        route = Mock()
+        route.request.url = url
+        route.request.resource_type = resource_type
+        return route
+
+    @pytest.mark.parametrize("url,resource_type,expected", [
+        ('https://www.ipcl-jp.com/img/logo.png', 'image', 'image'),
+        ('https://www.ipcl-jp.com/fonts/fa.woff2', 'font', 'font'),
+        ('https://www.google-analytics.com/collect', 'xhr', 'tracker'),
+        ('https://stats.g.doubleclick.net/r/collect', 'script', 'tracker'),
+        ('https://www.ipcl-jp.com/js/jquery.min.js', 'script', None),
+        ('https://www.ipcl-jp.com/calculator/icon.png', 'image', None),
+        ('https://www.ipcl-jp.com/order/report.pdf', 'document', None),
+        ('https://notdoubleclick.net/ad.js', 'script', None),
+    ])
+    def test_block_reason(self, blocker, url, resource_type, expected):
+        """URLとリソース種別に応じてブロック可否が判定されることを確認"""
+        assert blocker.block_reason(url, resource_type) == expected
+
+    def test_handle_aborts_blocked_request(self, blocker):
+        """ブロック対象のリクエストが中止され、件数が集計されることを確認"""
+        route = self._route('https://www.ipcl-jp.com/img/logo.png', 'image')
+
+        blocker.handle(route)
+
+        route.abort.assert_called_once()
+        route.fallback.assert_not_called()
+        assert blocker.blocked_counts['image'] == 1
+
+    def test_handle_falls_back_for_allowed_request(self, blocker):
+        """ブロック対象外のリクエストは次のハンドラに渡されることを確認"""
+        route = self._route('https://www.ipcl-jp.com/js/app.js', 'script')
+
+        blocker.handle(route)
+
+        route.fallback.assert_called_once()
+        route.abort.assert_not_called()
+
+    def test_handle_async_aborts_blocked_request(self, blocker):
+        """非同期版でもブロック対象が中止されることを確認"""
+        route = self._route('https://www.ipcl-jp.com/img/logo.png', 'image')
+        route.abort = AsyncMock()
+        route.fallback = AsyncMock()
+
+        asyncio.run(blocker.handle_async(route))
+
+        route.abort.assert_awaited_once()
+        assert blocker.blocked_counts['image'] == 1
+
+    def test_record_response_sums_content_length(self, blocker):
+        """レスポンスのContent-Lengthが転送量として集計されることを確認"""
+        blocker.record_response(Mock(headers={'content-length': '2048'}))
+        blocker.record_response(Mock(headers={}))
+
+        assert blocker.transferred_bytes == 2048
+
+    def test_log_summary_resets_counters(self, blocker, caplog):
+        """集計結果がログ出力され、カウンタがリセットされることを確認"""
+        blocker.handle(self._route('https://www.ipcl-jp.com/img/a.png', 'image'))
+        blocker.record_response(Mock(headers={'content-length': '1024'}))
+
+        with caplog.at_level('INFO'):
+            blocker.log_summary()
+
+        assert "リソースブロック: 1件 (image: 1)" in caplog.text
+        assert "1.0KB" in caplog.text
+        assert sum(blocker.blocked_counts.values()) == 0
+        assert blocker.transferred_bytes == 0
+
+    def test_from_config_disabled_returns_none(self):
+        """設定で無効化されている場合はNoneを返すことを確認"""
+        config = configparser.ConfigParser()
+        config.read_string("[Network]\nblock_resources = False\n")
+
+        assert ResourceBlocker.from_config(config) is None
+
+    def test_from_config_parses_lists(self):
+        """カンマ区切りの設定値がリストとして読み込まれることを確認"""
+        config = configparser.ConfigParser()
+        config.read_string(
+            "[Network]\nblock_resources = True\nblocked_resource_types = Image, font\n"
+            "blocked_domains = hotjar.com\nallowed_url_patterns = .pdf\n"
+        )
+
+        blocker = ResourceBlocker.from_config(config)
+
+        assert blocker.blocked_resource_types == {'image', 'font'}
+        assert blocker.blocked_domains == ['hotjar.com']
+        assert blocker.allowed_url_patterns == ['.pdf']
@@ -1,8 +1,10 @@
+from datetime import datetime
 from unittest.mock import Mock, patch, MagicMock
 
 import pytest
+from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
 
-from service.save_service import SaveService
+from service.save_service import SaveService, discard_pdf, pdf_filename
 
 
 class TestSaveService:
@@ -26,7 +28,9 @@ class TestSaveService:
     @pytest.fixture
     def mock_page(self):
         """Playwrightのページモックを提供するフィクスチャ"""
-        return Mock()
+        page = MagicMock()
+        page.expect_response.return_value.__enter__.return_value.value.status = 200
+        return page
 
     def test_init_stores_directories(self, temp_dirs):
         """初期化時にディレクトリが正しく保存されることを確認"""
@@ -82,12 +86,30 @@ class TestSaveService:
         mock_page.expect_download.return_value = mock_download_context
 
         with patch('service.save_service.datetime') as mock_datetime:
-            mock_datetime.now.return_value.strftime.return_value = '20240115_120000'
+            mock_datetime.now.return_value = datetime(2024, 1, 15, 12, 0, 0, 123456)
             result = save_service.click_save_pdf_button(mock_page, "TEST001", "テスト患者")
 
-        expected_filename = "IPCLdata_IDTEST001_20240115_120000.pdf"
+        expected_filename = "IPCLdata_IDTEST001_20240115_120000_123.pdf"
         assert expected_filename in result
 
+    def test_pdf_filename_differs_within_same_second(self):
+        """同じ秒に保存した同じIDのPDFでもファイル名が重ならないことを確認"""
+        first = pdf_filename("P001", datetime(2024, 1, 15, 12, 0, 0, 1000))
+        second = pdf_filename("P001", datetime(2024, 1, 15, 12, 0, 0, 2000))
+
+        assert first == "IPCLdata_IDP001_20240115_120000_001.pdf"
+        assert first != second
+
+    def test_discard_pdf_removes_file(self, tmp_path):
+        """やり直す前に保存したPDFが削除され、既にない場合も例外にならないことを確認"""
+        pdf_path = tmp_path / "IPCLdata_IDP001_20240115_120000_001.pdf"
+        pdf_path.write_bytes(b'%PDF')
+
+        discard_pdf(str(pdf_path))
+        discard_pdf(str(pdf_path))
+
+        assert not pdf_path.exists()
+
     def test_click_save_pdf_button_raises_exception_on_error(self, save_service, mock_page):
         """PDFダウンロード時のエラーを適切に処理することを確認"""
         mock_frame = Mock()
@@ -121,53 +143,95 @@ class TestSaveService:
         # ボタンがクリックされることを確認
         mock_frame.locator.return_value.click.assert_called_once()
 
-    def test_save_draft_returns_true_on_success(self, mock_page):
+    def test_save_draft_returns_true_on_success(self, save_service, mock_page):
         """下書き保存が成功した場合にTrueを返すことを確認"""
         mock_button = Mock()
         mock_button.is_disabled.return_value = False
         mock_page.locator.return_value = mock_button
 
-        result = SaveService.save_draft(mock_page)
+        result = save_service.save_draft(mock_page)
 
         assert result is True
         mock_button.click.assert_called_once()
 
-    def test_save_draft_returns_false_when_button_disabled(self, mock_page):
+    def test_save_draft_waits_for_rate_limiter_before_clicking(self, temp_dirs, mock_page):
+        """レート制限を指定した場合は下書き保存ボタンを押す前に待機することを確認"""
+        pdf_dir, calculated_dir = temp_dirs
+        rate_limiter = Mock()
+        mock_button = Mock()
+        mock_button.is_disabled.return_value = False
+        mock_page.locator.return_value = mock_button
+        rate_limiter.wait.side_effect = lambda action: mock_button.click.assert_not_called()
+
+        SaveService(pdf_dir, calculated_dir, rate_limiter).save_draft(mock_page)
+
+        rate_limiter.wait.assert_called_once_with('save_draft')
+        mock_button.click.assert_called_once()
+
+    def test_save_draft_returns_false_when_button_disabled(self, save_service, mock_page):
         """ボタンが無効な場合にFalseを返すことを確認"""
         mock_button = Mock()
         mock_button.is_disabled.return_value = True
         mock_page.locator.return_value = mock_button
 
-        result = SaveService.save_draft(mock_page)
+        result = save_service.save_draft(mock_page)
 
         assert result is False
         mock_button.click.assert_not_called()
 
-    def test_save_draft_waits_for_button_visibility(self, mock_page):
+    def test_save_draft_waits_for_button_visibility(self, save_service, mock_page):
         """下書き保存ボタンの表示を待機することを確認"""
         mock_button = Mock()
         mock_button.is_disabled.return_value = False
         mock_page.locator.return_value = mock_button
 
-        SaveService.save_draft(mock_page)
+        save_service.save_draft(mock_page)
 
         mock_button.wait_for.assert_called_once_with(state='visible', timeout=2000)
 
-    def test_save_draft_waits_before_clicking(self, mock_page):
-        """下書き保存ボタンクリック後にネットワークアイドルを待機することを確認"""
+    def test_save_draft_waits_before_clicking(self, save_service, mock_page):
+        """下書き保存ボタンクリックをPOSTレスポンスの待ち受けで囲むことを確認"""
         mock_button = Mock()
         mock_button.is_disabled.return_value = False
         mock_page.locator.return_value = mock_button
+        events = []
+        mock_page.expect_response.return_value.__enter__.side_effect = lambda: events.append('expect') or Mock(
+            value=Mock(status=200)
+        )
+        mock_button.click.side_effect = lambda: events.append('click')
 
-        SaveService.save_draft(mock_page)
+        save_service.save_draft(mock_page)
 
-        mock_page.wait_for_load_state.assert_called_with('networkidle')
+        mock_page.wait_for_load_state.assert_not_called()
+        assert events == ['expect', 'click']
 
-    def test_save_draft_returns_false_on_exception(self, mock_page):
+    def test_save_draft_returns_false_on_error_response(self, save_service, mock_page):
+        """下書き保存のレスポンスがエラーの場合にFalseを返すことを確認"""
+        mock_button = Mock()
+        mock_button.is_disabled.return_value = False
+        mock_page.locator.return_value = mock_button
+        mock_page.expect_response.return_value.__enter__.return_value.value.status = 500
+
+        result = save_service.save_draft(mock_page)
+
+        assert result is False
+
+    def test_save_draft_returns_false_when_response_not_seen(self, save_service, mock_page):
+        """下書き保存の応答を待ちきれなかった場合は保存済みとして扱わないことを確認"""
+        mock_button = Mock()
+        mock_button.is_disabled.return_value = False
+        mock_page.locator.return_value = mock_button
+        mock_page.expect_response.return_value.__exit__.side_effect = PlaywrightTimeoutError('timeout')
+
+        result = save_service.save_draft(mock_page)
+
+        assert result is False
+
+    def test_save_draft_returns_false_on_exception(self, save_service, mock_page):
         """例外発生時にFalseを返すことを確認"""
         mock_page.locator.side_effect = Exception("Button not found")
 
-        result = SaveService.save_draft(mock_page)
+        result = save_service.save_draft(mock_page)
 
         assert result is False
 
@@ -238,3 +302,45 @@ class TestSaveService:
         result = save_service.click_save_pdf_button(mock_page, "P001", "患者・名前（テスト）")
 
         assert "IPCLdata_IDP001" in result
+
+    @pytest.mark.parametrize("encoding", ['cp932', 'utf-8-sig'])
+    def test_split_csv_by_result_keeps_header_and_encoding(self, save_service, temp_dirs, tmp_path, encoding):
+        """失敗した行は元のヘッダーとエンコーディングで再処理用CSVに、成功した行は計算済フォルダに出力されることを確認"""
+        _, calculated_dir = temp_dirs
+        error_dir = tmp_path / "error"
+        csv_path = tmp_path / "IPCLdata_001.csv"
+        csv_path.write_bytes('name,ID,R_\tATA\r\n山田,P1,1\r\n\r\n佐藤,P2,2\r\n鈴木,P3,3\r\n'.encode(encoding))
+
+        retry_path = save_service.split_csv_by_result(csv_path, {2}, error_dir)
+
+        assert not csv_path.exists()
+        assert retry_path.parent == error_dir
+        assert retry_path.name.startswith('IPCLdata_retry_')
+        assert retry_path.read_bytes() == 'name,ID,R_\tATA\r\n佐藤,P2,2\r\n'.encode(encoding)
+        assert (calculated_dir / "IPCLdata_001.csv").read_bytes() == (
+            'name,ID,R_\tATA\r\n山田,P1,1\r\n鈴木,P3,3\r\n'.encode(encoding)
+        )
+
+    def test_park_csv_rows_keeps_parked_rows_in_place(self, save_service, temp_dirs, tmp_path):
+        """保留した行は元のファイルに残り、成功した行と失敗した行は別のファイルに出力されることを確認"""
+        _, calculated_dir = temp_dirs
+        error_dir = tmp_path / "error"
+        csv_path = tmp_path / "IPCLdata_001.csv"
+        csv_path.write_bytes('name,ID\r\n山田,P1\r\n佐藤,P2\r\n鈴木,P3\r\n'.encode('cp932'))
+
+        retry_path = save_service.park_csv_rows(csv_path, {3}, {2}, error_dir)
+
+        assert csv_path.read_bytes() == 'name,ID\r\n鈴木,P3\r\n'.encode('cp932')
+        assert retry_path.read_bytes() == 'name,ID\r\n佐藤,P2\r\n'.encode('cp932')
+        [succeeded_path] = calculated_dir.glob('IPCLdata_001_*.csv')
+        assert succeeded_path.read_bytes() == 'name,ID\r\n山田,P1\r\n'.encode('cp932')
+
+    def test_park_csv_rows_leaves_file_untouched_when_all_parked(self, save_service, tmp_path):
+        """すべての行を保留した場合はファイルを書き換えないことを確認"""
+        csv_path = tmp_path / "IPCLdata_001.csv"
+        csv_path.write_bytes(b'name,ID\r\nA,P1\r\n')
+        mtime = csv_path.stat().st_mtime_ns
+
+        assert save_service.park_csv_rows(csv_path, {1}, set(), tmp_path / "error") is None
+        assert csv_path.stat().st_mtime_ns == mtime
+        assert not (tmp_path / "error").exists()
@@ -0,0 +1,160 @@
+import json
+from unittest.mock import patch
+
+import pytest
+
+from service.step_timer import RecordTimer, StepTimingRecorder, percentile, record_rate_limit_wait
+
+
+class TestPercentile:
+    """percentileのテストクラス"""
+
+    @pytest.mark.parametrize("q,expected", [(50, 2.0), (95, 4.0), (100, 4.0), (0, 1.0)])
+    def test_nearest_rank(self, q, expected):
+        """最近傍順位法でパーセンタイルを求めることを確認"""
+        assert percentile([4.0, 1.0, 3.0, 2.0], q) == expected
+
+
+class TestRecordTimer:
+    """RecordTimerのテストクラス"""
+
+    def test_span_measures_monotonic_time(self):
+        """ステップの所要時間が単調増加時計で計測されることを確認"""
+        timer = RecordTimer()
+
+        with patch('service.step_timer.time.monotonic', side_effect=[10.0, 12.5]):
+            with timer.span('login'):
+                pass
+
+        assert timer.spans == {'login': 2.5}
+
+    def test_span_records_failed_step(self):
+        """例外が発生したステップも所要時間が記録されることを確認"""
+        timer = RecordTimer()
+
+        with pytest.raises(RuntimeError):
+            with timer.span('calculate'):
+                raise RuntimeError("timeout")
+
+        assert 'calculate' in timer.spans
+
+    def test_span_accumulates_retried_step(self):
+        """再試行したステップは各回の所要時間が合算されることを確認"""
+        timer = RecordTimer()
+
+        with patch('service.step_timer.time.monotonic', side_effect=[0.0, 1.0, 5.0, 7.0]):
+            with timer.span('save_pdf'):
+                pass
+            with timer.span('save_pdf'):
+                pass
+
+        assert timer.spans == {'save_pdf': 3.0}
+
+    def test_span_excludes_rate_limit_wait(self):
+        """レート制限の待機時間はステップの所要時間から除かれ、別に記録されることを確認"""
+        timer = RecordTimer()
+
+        with patch('service.step_timer.time.monotonic', side_effect=[0.0, 5.0]):
+            with timer.span('login'):
+                record_rate_limit_wait(4.0)
+
+        assert timer.spans == {'login': 1.0}
+        assert timer.rate_limit_waits == {'login': 4.0}
+
+    def test_rate_limit_wait_outside_span_is_ignored(self):
+        """計測中のステップがなければ待機時間は記録されないことを確認"""
+        timer = RecordTimer()
+
+        record_rate_limit_wait(2.0)
+        with patch('service.step_timer.time.monotonic', side_effect=[0.0, 1.0]):
+            with timer.span('login'):
+                pass
+
+        assert timer.spans == {'login': 1.0}
+        assert timer.rate_limit_waits == {}
+
+    def test_record_retry_keeps_first_line_of_error(self):
+        """再試行の記録にはエラーの種類と1行目だけが残ることを確認"""
+        timer = RecordTimer()
+
+        timer.record_retry('calculate', 2, RuntimeError("Timeout 3000ms\nCall log:\n  waiting for locator"), False)
+
+        assert timer.retries == [
+            {'step': 'calculate', 'attempt': 2, 'renavigate': False, 'error': 'RuntimeError: Timeout 3000ms'},
+        ]
+
+
+class TestStepTimingRecorder:
+    """StepTimingRecorderのテストクラス"""
+
+    def make_timer(self, **spans):
+        """指定した所要時間を持つRecordTimerを作成する"""
+        timer = RecordTimer()
+        timer.spans.update(spans)
+        return timer
+
+    def test_summary_per_step(self):
+        """ステップごとにp50・p95・最大が集計されることを確認"""
+        recorder = StepTimingRecorder()
+        for seconds in [1.0, 2.0, 3.0, 10.0]:
+            recorder.add({'id': 'P1', 'eye': '右眼'}, self.make_timer(login=seconds, save_pdf=0.5), True)
+
+        summary = recorder.summary()
+
+        assert summary['login'] == {'count': 4, 'p50': 2.0, 'p95': 10.0, 'max': 10.0}
+        assert summary['save_pdf']['count'] == 4
+
+    def test_write_report_outputs_summary_and_records(self, tmp_path):
+        """集計とレコードごとの所要時間がJSONファイルに出力されることを確認"""
+        recorder = StepTimingRecorder()
+        recorder.add({'id': 'P1', 'eye': '両眼'}, self.make_timer(login=1.2345, calculate=0.5), False)
+
+        report_path = recorder.write_report(tmp_path / 'logs')
+
+        report = json.loads(report_path.read_text(encoding='utf-8'))
+        assert report['summary']['login']['max'] == 1.234
+        assert report['records'] == [{
+            'id': 'P1', 'eye': '両眼', 'success': False, 'total': 1.734,
+            'steps': {'login': 1.234, 'calculate': 0.5},
+        }]
+        assert recorder.summary() == {}
+
+    def test_write_report_skips_when_empty(self, tmp_path):
+        """記録がない場合はファイルを出力しないことを確認"""
+        assert StepTimingRecorder().write_report(tmp_path) is None
+        assert list(tmp_path.iterdir()) == []
+
+    def test_extend_merges_worker_records(self):
+        """ワーカープロセスから受け取った記録が集計に含まれることを確認"""
+        recorder = StepTimingRecorder()
+        recorder.extend([{'id': 'P1', 'eye': '右眼', 'success': True, 'total': 1.0, 'steps': {'login': 1.0}}])
+
+        assert recorder.summary()['login']['count'] == 1
+
+    def test_listeners_receive_added_and_merged_records(self):
+        """登録したリスナーに、追加した記録とワーカーから受け取った記録が通知されることを確認"""
+        recorder = StepTimingRecorder()
+        received = []
+        recorder.add_listener(received.append)
+
+        timer = self.make_timer(login=1.0)
+        timer.congestion = 'timeout'
+        recorder.add({'id': 'P1', 'eye': '右眼'}, timer, False)
+        recorder.extend([{'id': 'P2', 'eye': '右眼', 'success': True, 'total': 1.0, 'steps': {'login': 1.0}}])
+        recorder.remove_listener(received.append)
+        recorder.add({'id': 'P3', 'eye': '右眼'}, self.make_timer(login=1.0), True)
+
+        assert [record['id'] for record in received] == ['P1', 'P2']
+        assert received[0]['congestion'] == 'timeout'
+
+    def test_retry_counts_per_step(self):
+        """ステップごとの再試行回数が集計され、再試行のない記録にはretriesが含まれないことを確認"""
+        recorder = StepTimingRecorder()
+        retried = self.make_timer(save_pdf=1.0)
+        retried.record_retry('save_pdf', 2, RuntimeError("timeout"), False)
+        retried.record_retry('save_input', 2, RuntimeError("detached"), True)
+        recorder.add({'id': 'P1', 'eye': '右眼'}, retried, True)
+        recorder.add({'id': 'P2', 'eye': '左眼'}, self.make_timer(save_pdf=1.0), True)
+
+        assert recorder.retry_counts() == {'save_pdf': 1, 'save_input': 1}
+        assert 'retries' not in recorder.drain()[1]
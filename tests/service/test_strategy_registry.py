@@ -0,0 +1,105 @@
+import asyncio
+import json
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+
+from service.strategy_registry import StrategyRegistry
+
+
+class TestStrategyRegistry:
+    """StrategyRegistryのテストクラス"""
+
+    @pytest.fixture
+    def state_path(self, tmp_path):
+        """状態ファイルのパスを提供するフィクスチャ"""
+        return tmp_path / "cache" / "strategies.json"
+
+    def test_run_uses_declared_order_initially(self):
+        """記録がない場合は宣言順に試すことを確認"""
+        registry = StrategyRegistry()
+        primary = Mock(return_value='ok')
+        fallback = Mock()
+
+        name, result = registry.run('sex', {'select2': primary, 'label': fallback})
+
+        assert (name, result) == ('select2', 'ok')
+        fallback.assert_not_called()
+
+    def test_run_tries_last_successful_strategy_first(self):
+        """前回成功した方式を最初に試すことを確認"""
+        registry = StrategyRegistry()
+        primary = Mock(side_effect=Exception("Timeout 5000ms exceeded"))
+        fallback = Mock()
+
+        registry.run('sex', {'select2': primary, 'label': fallback})
+        registry.run('sex', {'select2': primary, 'label': fallback})
+
+        assert primary.call_count == 1
+        assert fallback.call_count == 2
+
+    def test_run_adapts_when_preferred_strategy_stops_working(self):
+        """記録した方式が失敗するようになった場合は他の方式に切り替えることを確認"""
+        registry = StrategyRegistry()
+        registry.record_success('sex', 'label')
+        label = Mock(side_effect=Exception("not found"))
+        select2 = Mock()
+
+        name, _ = registry.run('sex', {'select2': select2, 'label': label})
+
+        assert name == 'select2'
+        assert registry.preferred('sex') == 'select2'
+
+    def test_run_raises_last_error_when_all_fail(self):
+        """すべての方式が失敗した場合は最後の例外を送出することを確認"""
+        registry = StrategyRegistry()
+
+        with pytest.raises(ValueError, match="label failed"):
+            registry.run('sex', {
+                'select2': Mock(side_effect=RuntimeError("select2 failed")),
+                'label': Mock(side_effect=ValueError("label failed")),
+            })
+
+        assert registry.preferred('sex') is None
+
+    def test_state_persists_across_instances(self, state_path):
+        """成功した方式が状態ファイル経由で次回の実行に引き継がれることを確認"""
+        StrategyRegistry(state_path).record_success('surgery_date', 'name')
+
+        assert json.loads(state_path.read_text(encoding='utf-8')) == {'surgery_date': 'name'}
+        assert StrategyRegistry(state_path).order('surgery_date', ['label', 'name']) == ['name', 'label']
+
+    def test_unknown_preferred_strategy_is_ignored(self, state_path):
+        """記録された方式が存在しない場合は宣言順を使うことを確認"""
+        state_path.parent.mkdir(parents=True)
+        state_path.write_text(json.dumps({'sex': 'removed'}), encoding='utf-8')
+
+        assert StrategyRegistry(state_path).order('sex', ['select2', 'label']) == ['select2', 'label']
+
+    def test_corrupted_state_file_is_ignored(self, state_path):
+        """壊れた状態ファイルは無視されることを確認"""
+        state_path.parent.mkdir(parents=True)
+        state_path.write_text("{not json", encoding='utf-8')
+
+        assert StrategyRegistry(state_path).preferred('sex') is None
+
+    def test_from_config_resolves_relative_path(self, monkeypatch, tmp_path):
+        """相対パスがプロジェクトルート基準で解決されることを確認"""
+        monkeypatch.setattr('service.strategy_registry.get_project_root', lambda: tmp_path)
+        config = Mock()
+        config.get.return_value = 'cache/strategies.json'
+
+        registry = StrategyRegistry.from_config(config)
+
+        assert registry.state_path == tmp_path / 'cache' / 'strategies.json'
+
+    def test_run_async(self):
+        """非同期APIでも前回成功した方式を記録することを確認"""
+        registry = StrategyRegistry()
+        primary = AsyncMock(side_effect=Exception("Timeout"))
+        fallback = AsyncMock(return_value='keyboard')
+
+        name, result = asyncio.run(registry.run_async('surgery_date', {'label': primary, 'name': fallback}))
+
+        assert (name, result) == ('name', 'keyboard')
+        assert registry.preferred('surgery_date') == 'name'
@@ -0,0 +1,125 @@
+import configparser
+import threading
+from pathlib import Path
+from unittest.mock import Mock, PropertyMock
+
+from service.watch_service import WatchService
+
+
+def stop_after(stop_event, results):
+    """pollの結果を順に返し、最後の結果を返すときに停止要求を出す関数を作成する"""
+    results = list(results)
+
+    def poll():
+        if len(results) == 1:
+            stop_event.set()
+        return results.pop(0)
+
+    return poll
+
+
+class TestWatchService:
+    """WatchServiceのテストクラス"""
+
+    def make_automation(self):
+        """接続の遮断がなく、保留したファイルもない自動化サービスのモックを作成する"""
+        automation = Mock()
+        automation.circuit_open = False
+        automation.process_csv_files.return_value = []
+        return automation
+
+    def test_run_processes_detected_files_until_stopped(self):
+        """検出したファイルを処理し、停止要求で終了処理を行うことを確認"""
+        automation = self.make_automation()
+        watcher = Mock()
+        watcher.csv_dir = Path('csv')
+        stop_event = threading.Event()
+        csv_path = Path('csv/IPCLdata_001.csv')
+        watcher.poll.side_effect = stop_after(stop_event, [[csv_path], []])
+
+        service = WatchService(automation, watcher, poll_interval=0.01, keepalive_interval=600)
+        service.run(stop_event)
+
+        automation.start_session.assert_called_once_with()
+        automation.process_csv_files.assert_called_once_with([csv_path], park=True)
+        automation.finish_session.assert_called_once_with()
+
+    def test_run_keeps_session_alive_when_idle(self):
+        """新しいファイルがないまま維持間隔を過ぎるとログイン状態を確認することを確認"""
+        automation = self.make_automation()
+        watcher = Mock()
+        stop_event = threading.Event()
+        watcher.poll.side_effect = stop_after(stop_event, [[], [], []])
+
+        service = WatchService(automation, watcher, poll_interval=0.01, keepalive_interval=0)
+        service.run(stop_event)
+
+        # 開始時に1回、待機中のポーリングごとに1回
+        assert automation.keep_session_alive.call_count == 4
+
+    def test_run_continues_when_processing_raises(self):
+        """1つのファイルの処理で例外が発生しても監視を続け、次のファイルを処理することを確認"""
+        automation = self.make_automation()
+        watcher = Mock()
+        stop_event = threading.Event()
+        broken = Path('csv/IPCLdata_001.csv')
+        following = Path('csv/IPCLdata_002.csv')
+        watcher.poll.side_effect = stop_after(stop_event, [[broken], [following]])
+        automation.process_csv_files.side_effect = [OSError('report could not be written'), []]
+
+        WatchService(automation, watcher, poll_interval=0.01).run(stop_event)
+
+        assert [call.args[0] for call in automation.process_csv_files.call_args_list] == [[broken], [following]]
+        automation.finish_session.assert_called_once_with()
+
+    def test_run_finishes_session_when_starting_raises(self):
+        """監視の開始時に例外が発生しても終了処理を行うことを確認"""
+        automation = self.make_automation()
+        automation.keep_session_alive.side_effect = RuntimeError('browser crashed')
+
+        service = WatchService(automation, Mock(), poll_interval=0.01)
+        try:
+            service.run(threading.Event())
+        except RuntimeError:
+            pass
+
+        automation.finish_session.assert_called_once_with()
+
+    def test_run_releases_parked_files(self):
+        """接続先の障害で保留したファイルは、次のポーリングで再び処理できるようにすることを確認"""
+        automation = self.make_automation()
+        watcher = Mock()
+        stop_event = threading.Event()
+        csv_path = Path('csv/IPCLdata_001.csv')
+        watcher.poll.side_effect = stop_after(stop_event, [[csv_path], []])
+        automation.process_csv_files.return_value = [csv_path]
+
+        WatchService(automation, watcher, poll_interval=0.01).run(stop_event)
+
+        watcher.release.assert_called_once_with(csv_path)
+
+    def test_run_does_not_poll_while_circuit_open(self):
+        """接続が遮断されている間はファイルを取り出さないことを確認"""
+        automation = self.make_automation()
+        watcher = Mock()
+        stop_event = threading.Event()
+        type(automation).circuit_open = PropertyMock(side_effect=lambda: stop_event.set() or True)
+
+        WatchService(automation, watcher, poll_interval=0.01).run(stop_event)
+
+        watcher.poll.assert_not_called()
+        automation.process_csv_files.assert_not_called()
+
+    def test_from_config_reads_watch_settings(self, tmp_path):
+        """設定ファイルのWatchセクションから間隔と判定回数を読み込むことを確認"""
+        config = configparser.ConfigParser()
+        config.read_dict({'Watch': {'poll_interval_seconds': '5', 'stable_checks': '3', 'keepalive_minutes': '2'}})
+        automation = Mock()
+        automation.csv_dir = tmp_path
+
+        service = WatchService.from_config(automation, config)
+
+        assert service.poll_interval == 5.0
+        assert service.keepalive_interval == 120.0
+        assert service.watcher.stable_checks == 3
+        assert service.watcher.csv_dir == tmp_path
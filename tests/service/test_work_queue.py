@@ -0,0 +1,76 @@
+from pathlib import Path
+
+from service.patient_record import PatientRecord
+from service.work_queue import FileBatch, WorkQueue, arrival_time
+
+
+def record(patient_id: str, surgery_date: str) -> PatientRecord:
+    return PatientRecord.from_mapping({'id': patient_id, 'surgery_date': surgery_date})
+
+
+class TestFileBatch:
+    """FileBatchのテストクラス"""
+
+    def test_complete_reports_when_last_row_finishes(self):
+        """最後の行が終わった呼び出しでのみTrueを返すことを確認"""
+        batch = FileBatch(Path('a.csv'), 3, {3}, [1, 2])
+
+        assert batch.complete(1, True) is False
+        assert batch.complete(2, False) is True
+        assert batch.is_complete
+        assert batch.failed_rows == {2, 3}
+
+    def test_complete_ignores_rows_already_finished(self):
+        """同じ行の結果が重ねて通知されても無視することを確認"""
+        batch = FileBatch(Path('a.csv'), 1, set(), [1])
+
+        assert batch.complete(1, True) is True
+        assert batch.complete(1, False) is False
+        assert batch.failed_rows == set()
+
+    def test_complete_parks_row_instead_of_failing(self):
+        """保留した行は失敗した行に含めないことを確認"""
+        batch = FileBatch(Path('a.csv'), 2, set(), [1, 2])
+
+        batch.complete(1, False)
+        assert batch.complete(2, False, parked=True) is True
+        assert batch.failed_rows == {1}
+        assert batch.parked_rows == {2}
+
+    def test_batch_without_pending_rows_is_complete(self):
+        """処理待ちの行がないファイルは最初から完了扱いであることを確認"""
+        assert FileBatch(Path('a.csv'), 2, {1, 2}, []).is_complete
+
+
+class TestWorkQueue:
+    """WorkQueueのテストクラス"""
+
+    def test_drain_orders_by_surgery_date_then_arrival(self):
+        """手術日、ファイルの到着時刻、ファイル内の行の順に取り出すことを確認"""
+        work_queue = WorkQueue()
+        late_file = FileBatch(Path('late.csv'), 2, set(), [1, 2])
+        early_file = FileBatch(Path('early.csv'), 2, set(), [1, 2])
+        work_queue.add(late_file, {1: record('L1', '20240110'), 2: record('L2', '20240105')}, arrival=200)
+        work_queue.add(early_file, {1: record('E1', '20240110'), 2: record('E2', '20240110')}, arrival=100)
+
+        items = work_queue.drain()
+
+        assert [item.record.id for item in items] == ['L2', 'E1', 'E2', 'L1']
+        assert [item.position for item in items] == [2, 1, 2, 1]
+        assert items[1].batch is early_file
+        assert len(work_queue) == 0
+
+    def test_same_arrival_keeps_registration_order(self):
+        """到着時刻が同じファイルは登録順に取り出すことを確認"""
+        work_queue = WorkQueue()
+        first = FileBatch(Path('first.csv'), 1, set(), [1])
+        second = FileBatch(Path('second.csv'), 1, set(), [1])
+        work_queue.add(first, {1: record('F1', '20240110')}, arrival=0)
+        work_queue.add(second, {1: record('S1', '20240110')}, arrival=0)
+
+        assert work_queue.pop().record.id == 'F1'
+        assert work_queue.pop().record.id == 'S1'
+
+    def test_arrival_time_of_missing_file_is_zero(self, tmp_path):
+        """存在しないファイルの到着時刻は0として扱うことを確認"""
+        assert arrival_time(tmp_path / 'missing.csv') == 0
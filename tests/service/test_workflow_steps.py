@@ -0,0 +1,96 @@
+import pytest
+from playwright.sync_api import Error as PlaywrightError, TimeoutError as PlaywrightTimeoutError
+
+from service.workflow_steps import (
+    DEFAULT_RETRY_POLICIES,
+    STEP_NAMES,
+    RetryPolicy,
+    WorkflowState,
+    is_retryable,
+    step_message,
+)
+
+
+class TestRetryPolicy:
+    """RetryPolicyのテストクラス"""
+
+    def test_delay_doubles_per_failure(self):
+        """再試行前の待機時間が失敗ごとに倍になることを確認"""
+        policy = RetryPolicy(attempts=4, backoff_seconds=0.5)
+
+        assert [policy.delay(n) for n in (1, 2, 3)] == [0.5, 1.0, 2.0]
+
+    def test_default_policies_cover_all_steps(self):
+        """すべてのステップに既定の再試行ポリシーがあり、下書き保存は再試行しないことを確認"""
+        assert set(DEFAULT_RETRY_POLICIES) == set(STEP_NAMES)
+        assert DEFAULT_RETRY_POLICIES['save_draft'].attempts == 1
+
+
+class TestIsRetryable:
+    """is_retryableのテストクラス"""
+
+    @pytest.mark.parametrize("error,expected", [
+        (PlaywrightTimeoutError("Timeout 5000ms exceeded"), True),
+        (PlaywrightError("Element is not attached to the DOM"), True),
+        (PlaywrightError("Target page, context or browser has been closed"), False),
+        (OSError("disk full"), True),
+        (ValueError("bad data"), False),
+    ])
+    def test_retryable_errors(self, error, expected):
+        """Playwrightの一時的なエラーとOSErrorだけを再試行の対象とすることを確認"""
+        assert is_retryable(error) is expected
+
+
+class TestWorkflowState:
+    """WorkflowStateのテストクラス"""
+
+    def test_step_message_formats_eye(self):
+        """眼の選択ステップの進捗表示に眼が入ることを確認"""
+        assert step_message('eye_tab', {'eye': '左眼'}) == '左眼タブを選択中...'
+
+    def test_advance_until_finished(self):
+        """すべてのステップを進めると完了になることを確認"""
+        state = WorkflowState()
+
+        for name in STEP_NAMES:
+            assert state.current_step == name
+            state.advance()
+
+        assert state.finished
+
+    def test_fail_resumes_idempotent_step(self):
+        """冪等なステップは同じステップから再開することを確認"""
+        state = WorkflowState({'login': RetryPolicy(3, 1.0)})
+        error = PlaywrightTimeoutError("Timeout")
+
+        first = state.fail(error)
+        second = state.fail(error)
+
+        assert (first.attempt, first.delay, first.renavigate) == (2, 1.0, False)
+        assert (second.attempt, second.delay) == (3, 2.0)
+        assert state.current_step == 'login'
+        assert state.fail(error) is None
+
+    def test_fail_restarts_from_login_for_non_idempotent_step(self):
+        """冪等でないステップはログイン確認からやり直すことを確認"""
+        state = WorkflowState({'patient_info': RetryPolicy(2, 0.0, idempotent=False)})
+        state.advance()
+
+        retry = state.fail(PlaywrightError("detached"))
+
+        assert retry.renavigate is True
+        assert state.current_step == 'login'
+
+    def test_fail_counts_failures_across_renavigation(self):
+        """ページを開き直しても、ステップの失敗回数は引き継がれることを確認"""
+        state = WorkflowState({'patient_info': RetryPolicy(2, 0.0, idempotent=False)})
+        state.advance()
+        state.fail(PlaywrightError("detached"))
+        state.advance()
+
+        assert state.fail(PlaywrightError("detached")) is None
+
+    def test_fail_without_policy_gives_up(self):
+        """ポリシーのないステップや再試行対象外のエラーは諦めることを確認"""
+        assert WorkflowState({}).fail(PlaywrightTimeoutError("Timeout")) is None
+        assert WorkflowState().fail(ValueError("bad data")) is None
@@ -347,3 +347,28 @@ class TestMain:
             call(['explorer', 'C:\\test1']),
             call(['explorer', 'C:\\test2'])
         ]
+
+    @patch('main.WatchService')
+    @patch('main.subprocess.Popen')
+    @patch('main.launch_draft_page')
+    @patch('main.IPCLOrderAutomation')
+    def test_main_watch_mode_runs_watch_service(
+        self,
+        mock_automation_class,
+        mock_launch_draft,
+        mock_popen,
+        mock_watch_service
+    ):
+        """--watch指定時は常駐処理を実行し、下書きページやエクスプローラーは開かない"""
+        mock_automation_instance = Mock()
+        mock_automation_class.return_value = mock_automation_instance
+
+        with patch('main.signal.signal'):
+            main(['--watch'])
+
+        mock_watch_service.from_config.assert_called_once()
+        assert mock_watch_service.from_config.call_args[0][0] is mock_automation_instance
+        mock_watch_service.from_config.return_value.run.assert_called_once()
+        mock_automation_instance.process_all_csv_files.assert_not_called()
+        mock_launch_draft.assert_not_called()
+        mock_popen.assert_not_called()
@@ -1,3 +1,4 @@
+import threading
 from unittest.mock import Mock, patch
 
 import pytest
@@ -210,37 +211,101 @@ class TestProgressWindow:
         mock_window.update.assert_called()
         mock_window.update_idletasks.assert_called_once()
 
-    def test_update_changes_label_text(self):
-        """updateメソッドがラベルのテキストを変更することを確認"""
+    def test_update_only_enqueues_message(self):
+        """updateはウィンドウを操作せず、メッセージをキューに入れるだけであることを確認"""
         progress = ProgressWindow()
         progress.progress_label = Mock()
         progress.progress_window = Mock()
 
         progress.update("新しいメッセージ")
 
-        progress.progress_label.config.assert_called_once_with(text="新しいメッセージ")
+        progress.progress_label.config.assert_not_called()
+        progress.progress_window.update.assert_not_called()
 
-    def test_update_calls_window_update(self):
-        """updateメソッドがウィンドウのupdateを呼び出すことを確認"""
+    def test_render_shows_only_latest_message(self):
+        """1フレームの間に届いた更新は最新のものだけを表示することを確認"""
         progress = ProgressWindow()
+        progress.root = Mock()
         progress.progress_label = Mock()
-        progress.progress_window = Mock()
 
-        progress.update("テストメッセージ")
+        for message in ("1件目", "2件目", "3件目"):
+            progress.update(message)
+        progress._render()
 
-        progress.progress_window.update.assert_called_once()
+        progress.progress_label.config.assert_called_once_with(text="3件目")
 
-    def test_update_does_nothing_when_label_is_none(self):
-        """progress_labelがNoneの場合、updateメソッドが何もしないことを確認"""
+    def test_render_schedules_next_frame(self):
+        """描画後に次のフレームを予約することを確認"""
         progress = ProgressWindow()
-        progress.progress_label = None
-        progress.progress_window = Mock()
+        progress.root = Mock()
+        progress.progress_label = Mock()
 
-        # エラーが発生しないことを確認
-        progress.update("テストメッセージ")
+        progress._render()
 
-        # progress_windowのupdateが呼ばれないことを確認
-        progress.progress_window.update.assert_not_called()
+        progress.root.after.assert_called_once_with(progress.frame_interval_ms, progress._render)
+        progress.progress_label.config.assert_not_called()
+
+    def test_render_accepts_updates_from_other_threads(self):
+        """別スレッドからの更新も次のフレームで表示されることを確認"""
+        progress = ProgressWindow()
+        progress.root = Mock()
+        progress.progress_label = Mock()
+
+        thread = threading.Thread(target=progress.update, args=("ワーカーからの更新",))
+        thread.start()
+        thread.join()
+        progress._render()
+
+        progress.progress_label.config.assert_called_once_with(text="ワーカーからの更新")
+
+    @patch('widgets.progress_window.load_config')
+    def test_frame_interval_from_max_fps(self, mock_load_config):
+        """max_fpsの設定から描画間隔が決まることを確認"""
+        mock_config = Mock()
+        mock_config.getint.side_effect = lambda section, key, fallback=None: {
+            ('Appearance', 'max_fps'): 20,
+        }.get((section, key), fallback)
+        mock_load_config.return_value = mock_config
+
+        assert ProgressWindow().frame_interval_ms == 50
+
+    @patch('widgets.progress_window.tk.Tk')
+    @patch('widgets.progress_window.tk.Toplevel')
+    @patch('widgets.progress_window.tk.Label')
+    def test_close_stops_render_thread(self, mock_label, mock_toplevel, mock_tk):
+        """closeで描画スレッドのイベントループを終了し、作成したスレッドでウィンドウを破棄することを確認"""
+        quit_event = threading.Event()
+        destroyed_in = []
+        mock_root = Mock()
+        mock_root.mainloop.side_effect = quit_event.wait
+        mock_root.quit.side_effect = quit_event.set
+        mock_root.after.side_effect = lambda ms, callback: threading.Timer(ms / 1000, callback).start()
+        mock_root.destroy.side_effect = lambda: destroyed_in.append(threading.current_thread().name)
+        mock_tk.return_value = mock_root
+        mock_window = Mock()
+        mock_window.winfo_screenwidth.return_value = 1920
+        mock_window.winfo_screenheight.return_value = 1080
+        mock_window.winfo_width.return_value = 500
+        mock_window.winfo_height.return_value = 150
+        mock_toplevel.return_value = mock_window
+
+        progress = ProgressWindow()
+        progress.create()
+        progress.close()
+
+        mock_root.quit.assert_called_once()
+        assert destroyed_in == ["ProgressWindow"]
+        assert progress.root is None
+
+    @patch('widgets.progress_window.tk.Tk')
+    def test_create_raises_when_window_cannot_be_created(self, mock_tk):
+        """ウィンドウを作成できない場合は呼び出し元に例外を伝えることを確認"""
+        mock_tk.side_effect = RuntimeError("no display")
+
+        progress = ProgressWindow()
+
+        with pytest.raises(RuntimeError):
+            progress.create()
 
     def test_close_destroys_progress_window(self):
         """closeメソッドがprogress_windowを破棄することを確認"""
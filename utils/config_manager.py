@@ -23,6 +23,11 @@ def get_config_path():
 CONFIG_PATH = get_config_path()
 
 
+def get_active_config_path():
+    # ベンチマークなど別の設定で実行する場合は環境変数で設定ファイルを差し替える
+    return os.getenv('IPCLCALC_CONFIG') or CONFIG_PATH
+
+
 def load_environment_variables():
     current_dir = Path(__file__).parent.parent
     env_path = current_dir / '.env'
@@ -38,11 +43,12 @@ load_environment_variables()
 
 def load_config() -> configparser.ConfigParser:
     config = configparser.ConfigParser()
+    config_path = get_active_config_path()
     try:
-        with open(CONFIG_PATH, encoding='utf-8') as f:
+        with open(config_path, encoding='utf-8') as f:
             config.read_file(f)
     except FileNotFoundError:
-        logger.error(f"設定ファイルが見つかりません: {CONFIG_PATH}")
+        logger.error(f"設定ファイルが見つかりません: {config_path}")
         raise
     except configparser.Error as e:
         logger.error(f"設定ファイルの解析中にエラーが発生しました: {e}")
@@ -52,7 +58,7 @@ def load_config() -> configparser.ConfigParser:
 
 def save_config(config: configparser.ConfigParser):
     try:
-        with open(CONFIG_PATH, 'w', encoding='utf-8') as configfile:
+        with open(get_active_config_path(), 'w', encoding='utf-8') as configfile:
             config.write(configfile)
     except IOError as e:
         logger.error(f"設定ファイルの保存中にエラーが発生しました: {e}")
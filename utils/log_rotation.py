@@ -50,7 +50,7 @@ def cleanup_old_logs(log_directory: Path, retention_days: int, log_name: str):
     now = datetime.now()
     main_log_file = f'{log_name}.log'
 
-    for file_path in log_directory.glob('*.log'):
+    for file_path in [*log_directory.glob('*.log'), *log_directory.glob('step_timings_*.json')]:
         if file_path.name != main_log_file:
             file_modification_time = datetime.fromtimestamp(file_path.stat().st_mtime)
             if now - file_modification_time > timedelta(days=retention_days):
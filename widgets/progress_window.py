@@ -1,21 +1,67 @@
+import queue
+import threading
+import time
 import tkinter as tk
 
 from utils.config_manager import load_config
 
+# close()で描画スレッドの終了を待つ時間(秒)。指定した表示時間に加えて待つ
+CLOSE_TIMEOUT_SECONDS = 2.0
+
 
 class ProgressWindow:
+    # Tkのウィンドウは専用のスレッドで動かし、update()はメッセージをキューに入れるだけにする。
+    # 描画スレッドは1フレームごとにキューを読み切り、最新のメッセージだけを表示する
     def __init__(self):
         self.root = None
         self.progress_window = None
         self.progress_label = None
+        self._messages: queue.SimpleQueue = queue.SimpleQueue()
+        self._thread = None
+        self._ready = threading.Event()
+        self._closing = threading.Event()
+        self._close_at = 0.0
+        self._error = None
 
         config = load_config()
 
         self.font_size = config.getint('Appearance', 'font_size', fallback=11)
         self.window_width = config.getint('Appearance', 'window_width', fallback=500)
         self.window_height = config.getint('Appearance', 'window_height', fallback=150)
+        max_fps = config.getint('Appearance', 'max_fps', fallback=10)
+        self.frame_interval_ms = max(1, 1000 // max(1, max_fps))
 
     def create(self):
+        self._ready.clear()
+        self._closing.clear()
+        self._error = None
+        self._thread = threading.Thread(target=self._run, name="ProgressWindow", daemon=True)
+        self._thread.start()
+        # ウィンドウができるまで待ち、作成に失敗した場合は呼び出し側に伝える
+        self._ready.wait()
+        if self._error is not None:
+            self._thread = None
+            raise self._error
+
+    def _run(self):
+        try:
+            self._build()
+        except Exception as e:
+            self._error = e
+            return
+        finally:
+            self._ready.set()
+
+        self.root.after(self.frame_interval_ms, self._render)
+        self.root.mainloop()
+        if self._closing.is_set():
+            # Tkのオブジェクトは作成したスレッドで破棄する
+            self._destroy()
+            self.root = None
+            self.progress_window = None
+            self.progress_label = None
+
+    def _build(self):
         self.root = tk.Tk()
         self.root.withdraw()
 
@@ -46,11 +92,47 @@ class ProgressWindow:
         self.progress_window.update()
 
     def update(self, message: str):
-        if self.progress_label:
-            self.progress_label.config(text=message)
-            self.progress_window.update()
+        # どのスレッドから呼んでもよく、描画を待たずに戻る
+        self._messages.put(message)
+
+    def _latest_message(self) -> str | None:
+        message = None
+        while True:
+            try:
+                message = self._messages.get_nowait()
+            except queue.Empty:
+                return message
+
+    def _render(self):
+        # 描画スレッドで1フレームごとに呼ばれる。前のフレーム以降の更新は最新のものだけを表示する
+        message = self._latest_message()
+        if message is not None and self.progress_label:
+            try:
+                self.progress_label.config(text=message)
+            except tk.TclError:
+                # ウィンドウが閉じられた後の更新は無視する
+                pass
+
+        if self._closing.is_set() and time.monotonic() >= self._close_at:
+            self.root.quit()
+            return
+        self.root.after(self.frame_interval_ms, self._render)
+
+    def close(self, delay: float = 0.0):
+        # delay秒間は最後のメッセージを表示してから閉じる
+        thread = self._thread
+        if thread is None:
+            # 描画スレッドを起動していない場合は、呼び出し元のスレッドで破棄する
+            self._destroy()
+            return
+
+        self._close_at = time.monotonic() + delay
+        self._closing.set()
+        if thread is not threading.current_thread():
+            thread.join(timeout=delay + CLOSE_TIMEOUT_SECONDS)
+        self._thread = None
 
-    def close(self):
+    def _destroy(self):
         if self.progress_window:
             self.progress_window.destroy()
         if self.root: